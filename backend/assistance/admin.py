@@ -6,7 +6,27 @@ from django.contrib import admin
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
+from orbe_platform.paginators import EstimatedCountPaginator
+from .downloads import attachment_download_url
 from .models import AssistanceCase, Attachment, CaseTimeline
+from .renditions import rendition_urls
+from .search import case_search_filter
+from .timeline import batch_events
+
+
+def thumbnail_url(attachment, original_fallback=True):
+    """
+    Small preview for the admin: the JPEG thumbnail rendition, or the
+    original image while renditions are not ready (unless
+    original_fallback is False, as in changelists). None for other files.
+    Links go through the protected download endpoint (session auth).
+    """
+    thumb = rendition_urls(attachment).get('thumb')
+    if thumb:
+        return thumb['jpeg']
+    if attachment.is_image and original_fallback:
+        return attachment_download_url(attachment)
+    return None
 
 
 class CaseTimelineInline(admin.TabularInline):
@@ -18,6 +38,9 @@ class CaseTimelineInline(admin.TabularInline):
     can_delete = False
     ordering = ['created_at']
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user')
+
     def has_add_permission(self, request, obj=None):
         """Prevent manual timeline entry creation"""
         return False
@@ -31,19 +54,23 @@ class AttachmentInline(admin.TabularInline):
     fields = ['file', 'attachment_type', 'file_preview', 'file_name', 'file_type', 'file_size_mb', 'uploaded_by', 'uploaded_at']
     can_delete = True
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('uploaded_by')
+
     def file_preview(self, obj):
-        """Show file preview or icon"""
+        """Show thumbnail or icon"""
         if obj.pk and obj.file:
-            if obj.is_image:
+            preview = thumbnail_url(obj, original_fallback=False)
+            if preview:
                 return format_html(
-                    '<a href="{}" target="_blank"><img src="{}" style="max-height: 50px; max-width: 100px;"/></a>',
-                    obj.file.url,
-                    obj.file.url
+                    '<a href="{}" target="_blank"><img src="{}" loading="lazy" style="max-height: 50px; max-width: 100px;"/></a>',
+                    attachment_download_url(obj),
+                    preview
                 )
             else:
                 return format_html(
                     '<a href="{}" target="_blank">📄 {}</a>',
-                    obj.file.url,
+                    attachment_download_url(obj),
                     obj.file_name
                 )
         return "-"
@@ -99,9 +126,14 @@ class CaseTimelineAdmin(admin.ModelAdmin):
         })
     )
 
-    date_hierarchy = 'created_at'
+    # Largest table: no date_hierarchy (it scans every row for the distinct
+    # dates); the created_at list filter covers date ranges
     ordering = ['-created_at']
 
+    list_select_related = ['case', 'user']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
     def has_add_permission(self, request):
         """Prevent manual timeline creation - only via signals"""
         return False
@@ -138,8 +170,8 @@ class CaseTimelineAdmin(admin.ModelAdmin):
 
     def case_link(self, obj):
         """Link to related case"""
-        if obj.case:
-            url = reverse('admin:assistance_assistancecase_change', args=[obj.case.id])
+        if obj.case_id:
+            url = reverse('admin:assistance_assistancecase_change', args=[obj.case_id])
             return format_html('<a href="{}">{}</a>', url, obj.case.title)
         return "-"
     case_link.short_description = "Caso"
@@ -203,17 +235,12 @@ class AssistanceCaseAdmin(admin.ModelAdmin):
         'reviewed_by__role'
     ]
 
+    # Case text (title, descriptions, beneficiary) is matched through the
+    # full-text index in get_search_results
     search_fields = [
-        'title',
-        'public_description',
-        'internal_description',
-        'beneficiary_name',
         'created_by__email',
         'created_by__first_name',
-        'created_by__last_name',
-        'member__email',
-        'member__first_name',
-        'member__last_name'
+        'created_by__last_name'
     ]
 
     readonly_fields = [
@@ -251,11 +278,27 @@ class AssistanceCaseAdmin(admin.ModelAdmin):
 
     inlines = [CaseTimelineInline, AttachmentInline]
 
+    # attachment_count is a denormalized column, so rows need no extra queries
+    list_select_related = ['created_by', 'reviewed_by']
+    autocomplete_fields = ['created_by', 'reviewed_by']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
     date_hierarchy = 'created_at'
     ordering = ['-created_at']
 
     actions = ['approve_cases', 'reject_cases', 'mark_as_pending']
 
+    def get_search_results(self, request, queryset, search_term):
+        """Combine creator lookups with full-text search over case text"""
+        creator_matches, may_have_duplicates = super().get_search_results(
+            request, queryset, search_term
+        )
+        text_condition = case_search_filter(search_term, include_internal=True, using=queryset.db)
+        if not search_term or not text_condition:
+            return creator_matches, may_have_duplicates
+        return creator_matches | queryset.filter(text_condition), may_have_duplicates
+
     def status_badge(self, obj):
         """Display colored status badge"""
         colors = {
@@ -277,8 +320,8 @@ class AssistanceCaseAdmin(admin.ModelAdmin):
 
     def creator_info(self, obj):
         """Show creator info with link"""
-        if obj.created_by:
-            url = reverse('admin:users_user_change', args=[obj.created_by.id])
+        if obj.created_by_id:
+            url = reverse('admin:users_user_change', args=[obj.created_by_id])
             return format_html(
                 '<a href="{}">{} ({})</a>',
                 url,
@@ -290,8 +333,8 @@ class AssistanceCaseAdmin(admin.ModelAdmin):
 
     def reviewer_info(self, obj):
         """Show reviewer info with link"""
-        if obj.reviewed_by:
-            url = reverse('admin:users_user_change', args=[obj.reviewed_by.id])
+        if obj.reviewed_by_id:
+            url = reverse('admin:users_user_change', args=[obj.reviewed_by_id])
             return format_html(
                 '<a href="{}">{} ({})</a>',
                 url,
@@ -301,6 +344,7 @@ class AssistanceCaseAdmin(admin.ModelAdmin):
         return "-"
     reviewer_info.short_description = "Revisado por (detalhes)"
 
+    @batch_events()
     def approve_cases(self, request, queryset):
         """Bulk approve pending cases"""
         pending_cases = queryset.filter(status='pending_approval')
@@ -311,6 +355,7 @@ class AssistanceCaseAdmin(admin.ModelAdmin):
         self.message_user(request, f"{count} caso(s) aprovado(s) com sucesso.")
     approve_cases.short_description = "Aprovar casos selecionados"
 
+    @batch_events()
     def reject_cases(self, request, queryset):
         """Bulk reject pending cases (requires reason)"""
         pending_cases = queryset.filter(status='pending_approval')
@@ -322,6 +367,7 @@ class AssistanceCaseAdmin(admin.ModelAdmin):
         self.message_user(request, f"{count} caso(s) rejeitado(s) com sucesso.")
     reject_cases.short_description = "Rejeitar casos selecionados"
 
+    @batch_events()
     def mark_as_pending(self, request, queryset):
         """Mark draft cases as pending"""
         draft_cases = queryset.filter(status='draft')
@@ -345,7 +391,7 @@ class AttachmentAdmin(admin.ModelAdmin):
         'case_link',
         'uploaded_by',
         'uploaded_at',
-        'file_preview'
+        'thumbnail'
     ]
 
     list_filter = [
@@ -384,30 +430,52 @@ class AttachmentAdmin(admin.ModelAdmin):
         })
     )
 
+    list_select_related = ['case', 'uploaded_by']
+    autocomplete_fields = ['case']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
     date_hierarchy = 'uploaded_at'
     ordering = ['-uploaded_at']
 
+    @batch_events()
+    def delete_queryset(self, request, queryset):
+        """Status rollbacks of the deleted attachments are logged with one INSERT"""
+        super().delete_queryset(request, queryset)
+
     def case_link(self, obj):
         """Link to related case"""
-        if obj.case:
-            url = reverse('admin:assistance_assistancecase_change', args=[obj.case.id])
+        if obj.case_id:
+            url = reverse('admin:assistance_assistancecase_change', args=[obj.case_id])
             return format_html('<a href="{}">{}</a>', url, obj.case.title)
         return "-"
     case_link.short_description = "Caso"
 
+    def thumbnail(self, obj):
+        """Changelist preview: the thumbnail rendition only, never the original"""
+        preview = thumbnail_url(obj, original_fallback=False)
+        if preview:
+            return format_html(
+                '<img src="{}" loading="lazy" style="max-height: 50px; max-width: 100px;"/>',
+                preview
+            )
+        return f"📄 {obj.file_type}" if obj.file else "-"
+    thumbnail.short_description = "Preview"
+
     def file_preview(self, obj):
         """Show file preview"""
         if obj.pk and obj.file:
-            if obj.is_image:
+            preview = thumbnail_url(obj)
+            if preview:
                 return format_html(
                     '<a href="{}" target="_blank"><img src="{}" style="max-height: 100px; max-width: 200px;"/></a>',
-                    obj.file.url,
-                    obj.file.url
+                    attachment_download_url(obj),
+                    preview
                 )
             else:
                 return format_html(
                     '<a href="{}" target="_blank" style="font-size: 14px;">📄 Baixar {}</a>',
-                    obj.file.url,
+                    attachment_download_url(obj),
                     obj.file_name
                 )
         return "-"
@@ -7,4 +7,7 @@ class AssistanceConfig(AppConfig):
 
     def ready(self):
         """Import signals when app is ready"""
+        from django.db.models.signals import post_migrate
         import assistance.signals  # noqa
+
+        post_migrate.connect(assistance.signals.reinstall_search_backend, sender=self)
@@ -0,0 +1,210 @@
+"""
+Content-addressed storage for attachment files.
+
+Every attachment file is stored once per SHA-256 of its content, as an
+AttachmentBlob:
+
+    assistance_blobs/<sha[:2]>/<sha[2:4]>/<sha><ext>
+
+Attachments with identical content (the same receipt sent for several
+cases, a photo uploaded twice) point at the same blob; Attachment.file
+holds the blob's file name, so URLs and downloads are unchanged. The blob
+counts its references and the stored file is deleted when the last
+attachment using it is deleted.
+
+The hash is computed while the content streams:
+- multipart uploads: by the upload handlers, as Django receives the request
+- resumable uploads: over the stored chunks, before they are assembled
+  (clients may also declare the hash up front and skip sending content
+  the platform already has, see AttachmentUpload.sha256)
+- direct-to-bucket uploads: by reading the uploaded object back once
+"""
+
+import hashlib
+import logging
+import os
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from .models import AttachmentBlob
+
+logger = logging.getLogger(__name__)
+
+BLOBS_DIR = 'assistance_blobs'
+
+# Bytes read at a time when hashing stored content
+READ_BUFFER_SIZE = 64 * 1024
+
+
+class _HashingUploadMixin:
+    """Hash each file of a multipart request while it is received"""
+
+    def new_file(self, *args, **kwargs):
+        self.sha256 = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        file = super().file_complete(file_size)
+        if file is not None:
+            file.sha256 = self.sha256.hexdigest()
+        return file
+
+
+class HashingMemoryFileUploadHandler(_HashingUploadMixin, MemoryFileUploadHandler):
+    pass
+
+
+class HashingTemporaryFileUploadHandler(_HashingUploadMixin, TemporaryFileUploadHandler):
+    pass
+
+
+def hashing_upload_handlers(request):
+    """Upload handlers for views receiving attachment files"""
+    return [
+        HashingMemoryFileUploadHandler(request),
+        HashingTemporaryFileUploadHandler(request),
+    ]
+
+
+def hash_stream(stream):
+    """
+    SHA-256 and size of a readable stream, read in small buffers.
+
+    Returns:
+        tuple: (hex digest, size in bytes)
+    """
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        data = stream.read(READ_BUFFER_SIZE)
+        if not data:
+            break
+        digest.update(data)
+        size += len(data)
+    return digest.hexdigest(), size
+
+
+def hash_file(file):
+    """SHA-256 of a django File, reusing the digest from the upload handlers"""
+    sha256 = getattr(file, 'sha256', None)
+    if sha256 is None:
+        digest = hashlib.sha256()
+        for chunk in file.chunks():
+            digest.update(chunk)
+        sha256 = digest.hexdigest()
+        file.seek(0)
+    return sha256
+
+
+def blob_name(sha256, file_name):
+    """Storage name of a blob (the extension keeps content types right)"""
+    _, ext = os.path.splitext(file_name)
+    return f'{BLOBS_DIR}/{sha256[:2]}/{sha256[2:4]}/{sha256}{ext.lower()}'
+
+
+def reference_blob(sha256):
+    """
+    Add a reference to an existing blob.
+
+    Returns:
+        AttachmentBlob, or None when no blob has this content
+    """
+    with transaction.atomic():
+        updated = AttachmentBlob.objects.filter(sha256=sha256).update(ref_count=F('ref_count') + 1)
+        if not updated:
+            return None
+        return AttachmentBlob.objects.get(sha256=sha256)
+
+
+def acquire_blob(sha256, size, file_name, write):
+    """
+    Reference the blob for `sha256`, storing the content if it is new.
+
+    Args:
+        sha256: Hex digest of the content
+        size: Content size in bytes
+        file_name: Original file name (for the extension)
+        write: Called with the blob name when the content is not stored
+            yet; stores it and returns the name actually used
+
+    Returns:
+        tuple: (AttachmentBlob, created)
+    """
+    blob = reference_blob(sha256)
+    if blob is not None:
+        return blob, False
+
+    # Written outside any lock: identical content from concurrent uploads
+    # lands on the same name, and the database decides which row wins
+    name = blob_name(sha256, file_name)
+    if not default_storage.exists(name):
+        name = write(name)
+
+    try:
+        with transaction.atomic():
+            blob = AttachmentBlob.objects.create(sha256=sha256, file=name, size=size, ref_count=1)
+    except IntegrityError:
+        blob = reference_blob(sha256)
+        if blob is None:
+            raise
+        if blob.file.name != name:
+            _delete_file(name)
+        return blob, False
+
+    return blob, True
+
+
+def store_file(file, file_name):
+    """
+    Reference the blob for an uploaded django File, storing it if new.
+
+    Returns:
+        AttachmentBlob
+    """
+    sha256 = hash_file(file)
+    blob, created = acquire_blob(
+        sha256, file.size, file_name,
+        lambda name: default_storage.save(name, file)
+    )
+    if not created:
+        logger.info(f"Deduplicated upload {file_name} (blob {sha256[:12]})")
+    return blob
+
+
+def release_blob(sha256):
+    """
+    Drop one reference; the blob and its file are deleted with the last one
+    (the file only after the transaction commits).
+    """
+    with transaction.atomic():
+        blob = AttachmentBlob.objects.select_for_update().filter(sha256=sha256).first()
+        if blob is None:
+            return
+
+        if blob.ref_count > 1:
+            AttachmentBlob.objects.filter(sha256=sha256).update(ref_count=F('ref_count') - 1)
+            return
+
+        name = blob.file.name
+        blob.delete()
+        transaction.on_commit(lambda: _delete_orphan_file(sha256, name), robust=True)
+
+
+def _delete_orphan_file(sha256, name):
+    # The same content may have been uploaded again in the meantime
+    if not AttachmentBlob.objects.filter(sha256=sha256, file=name).exists():
+        _delete_file(name)
+
+
+def _delete_file(name):
+    try:
+        default_storage.delete(name)
+    except Exception as e:
+        logger.warning(f"Could not delete blob file {name}: {e}")
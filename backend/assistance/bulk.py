@@ -0,0 +1,137 @@
+"""
+Bulk workflow actions for assistance cases.
+
+Applies one action (approve, reject, confirm_transfer, complete) to many
+cases in a single request:
+1. Lock every requested case (SELECT ... FOR UPDATE)
+2. Validate each one with the same serializer as the single-case endpoint
+3. Apply the valid transitions in memory and write them with bulk_update
+4. Write their timeline events with one bulk_create
+5. Publish completed cases to the feed (feed.publishing)
+
+Everything happens in one transaction; invalid cases are reported and left
+untouched.
+"""
+
+import logging
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import AssistanceCase, CaseTimeline
+from .serializers import (
+    CaseApprovalSerializer,
+    CaseRejectionSerializer,
+    ConfirmTransferSerializer,
+    CompleteCaseSerializer,
+    CaseTransitionSerializer
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _approve(case, user, data):
+    return case.approve(reviewer_user=user, commit=False)
+
+
+def _reject(case, user, data):
+    return case.reject(reviewer_user=user, reason=data['rejection_reason'], commit=False)
+
+
+def _confirm_transfer(case, user, data):
+    return case.confirm_transfer(admin_user=user, commit=False)
+
+
+def _complete(case, user, data):
+    return case.complete(reviewer_user=user, commit=False)
+
+
+# action -> (per-case validation serializer, in-memory transition)
+BULK_ACTIONS = {
+    'approve': (CaseApprovalSerializer, _approve),
+    'reject': (CaseRejectionSerializer, _reject),
+    'confirm_transfer': (ConfirmTransferSerializer, _confirm_transfer),
+    'complete': (CompleteCaseSerializer, _complete),
+}
+
+
+def apply_bulk_action(queryset, action, case_ids, data, request):
+    """
+    Apply `action` to the cases in `case_ids` visible through `queryset`.
+
+    Args:
+        queryset: Cases the user may act on (role filtering already applied)
+        action: Key of BULK_ACTIONS
+        case_ids: Case ids, in the order results should be returned
+        data: Action payload (e.g. {'rejection_reason': ...})
+        request: Current request (reviewer and serializer context)
+
+    Returns:
+        list: One {'id', 'success', 'case' | 'errors'} dict per case id
+    """
+    serializer_class, transition = BULK_ACTIONS[action]
+    results = {}
+    applied = []
+
+    with transaction.atomic():
+        cases = {
+            case.pk: case
+            for case in queryset.filter(pk__in=case_ids).select_related(
+                'created_by', 'reviewed_by'
+            ).select_for_update(of=('self',))
+        }
+
+        for case_id in case_ids:
+            case = cases.get(case_id)
+            if case is None:
+                results[case_id] = {'id': case_id, 'success': False, 'errors': ['Caso não encontrado.']}
+                continue
+
+            serializer = serializer_class(case, data=data, context={'request': request})
+            if not serializer.is_valid():
+                results[case_id] = {'id': case_id, 'success': False, 'errors': serializer.errors}
+                continue
+
+            before = CaseTransitionSerializer.snapshot(case)
+            if not transition(case, request.user, serializer.validated_data):
+                results[case_id] = {'id': case_id, 'success': False, 'errors': ['Transição inválida.']}
+                continue
+            applied.append((case, before))
+
+        if applied:
+            now = timezone.now()
+            update_fields = {'updated_at'}
+            for case, _ in applied:
+                case.updated_at = now
+                update_fields.update(case.get_dirty_fields())
+
+            AssistanceCase.objects.bulk_update(
+                [case for case, _ in applied], sorted(update_fields)
+            )
+            events = CaseTimeline.objects.bulk_create([
+                CaseTimeline.build_status_change(case, before['status'], case.status)
+                for case, before in applied
+            ])
+
+            # bulk_update sends no post_save: publish completed cases here
+            completed = [case for case, _ in applied if case.status == 'completed']
+            if completed:
+                from feed.publishing import publish_cases
+                publish_cases(completed)
+
+            for (case, before), event in zip(applied, events):
+                results[case.pk] = {
+                    'id': case.pk,
+                    'success': True,
+                    'case': CaseTransitionSerializer(case, context={
+                        'request': request,
+                        'before': before,
+                        'timeline_event': event
+                    }).data
+                }
+
+    logger.info(
+        f"Bulk {action} by {request.user.email}: "
+        f"{len(applied)} applied, {len(case_ids) - len(applied)} rejected"
+    )
+    return [results[case_id] for case_id in case_ids]
@@ -0,0 +1,205 @@
+"""
+Direct-to-bucket uploads (presigned POST) when USE_S3 is enabled.
+
+1. The API issues an upload policy for one new object: bucket URL, form
+   fields and conditions (exact key, content type, size range), plus a
+   signed token describing what the upload is for.
+2. The client POSTs the file straight to the bucket; no file bytes go
+   through a Django worker.
+3. The client confirms with the token. The object is checked with a HEAD
+   request (size, content type) and recorded: an Attachment row, or
+   VoluntaryDonation.payment_proof. Attachment objects are hashed and
+   become content-addressed blobs (see assistance.blobs).
+
+Works with any S3-compatible endpoint (AWS_S3_ENDPOINT_URL, e.g. MinIO).
+"""
+
+import os
+import uuid
+
+from botocore.exceptions import ClientError
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+TOKEN_SALT = 'assistance.direct_uploads'
+
+# Confirmation is accepted for a while after the policy expires: the policy
+# only limits when the upload may start, large files take longer to finish
+CONFIRM_GRACE_SECONDS = 60 * 60
+
+# Extension -> Content-Type required by the upload policy
+CONTENT_TYPES = {
+    '.pdf': 'application/pdf',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.doc': 'application/msword',
+    '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+}
+
+
+class DirectUploadError(Exception):
+    """Direct upload unavailable, invalid token or object rejected"""
+
+
+def direct_uploads_enabled():
+    return settings.USE_S3
+
+
+def content_type_for(file_name):
+    """Content-Type for an allowed file name, or None"""
+    _, ext = os.path.splitext(file_name)
+    return CONTENT_TYPES.get(ext.lower())
+
+
+def object_key(name):
+    """Bucket key for a storage name (applies the storage location)"""
+    from storages.utils import clean_name
+    return default_storage._normalize_name(clean_name(name))
+
+
+def _object_name(file_field, file_name):
+    """
+    Storage name for a new object: the field's upload_to directory, a
+    random directory (no collisions, no existence check needed) and the
+    original name, shortened to fit the column.
+    """
+    name = file_field.generate_filename(None, f'{uuid.uuid4().hex[:12]}/{file_name}')
+    excess = len(name) - file_field.max_length
+    if excess > 0:
+        root, ext = os.path.splitext(name)
+        name = root[:-excess] + ext
+    return name
+
+
+def s3_client():
+    """boto3 client of the S3 storage (USE_S3 only)"""
+    return default_storage.bucket.meta.client
+
+
+def issue_upload(file_field, file_name, max_size, purpose):
+    """
+    Create a presigned POST for a new object.
+
+    Args:
+        file_field: FileField the object is for (its upload_to is used)
+        file_name: Original file name
+        max_size: Largest accepted size in bytes
+        purpose: Dict stored in the token (kind, user, ...) and checked on
+            confirmation
+
+    Returns:
+        dict: {url, fields, token, expires_in}
+    """
+    if not direct_uploads_enabled():
+        raise DirectUploadError('Envio direto indisponível. Use o envio pelo servidor.')
+
+    content_type = content_type_for(file_name)
+    if content_type is None:
+        raise DirectUploadError(
+            f"Tipo de arquivo não permitido. Use: {', '.join(sorted(CONTENT_TYPES))}"
+        )
+
+    file_name = os.path.basename(file_name)
+    name = _object_name(file_field, file_name)
+    expires_in = settings.DIRECT_UPLOAD_EXPIRATION_SECONDS
+
+    post = s3_client().generate_presigned_post(
+        Bucket=default_storage.bucket_name,
+        Key=object_key(name),
+        Fields={'Content-Type': content_type},
+        Conditions=[
+            {'Content-Type': content_type},
+            ['content-length-range', 1, max_size],
+        ],
+        ExpiresIn=expires_in
+    )
+
+    token = signing.dumps({
+        **purpose,
+        'name': name,
+        'file_name': file_name,
+        'content_type': content_type,
+        'max_size': max_size,
+    }, salt=TOKEN_SALT)
+
+    return {
+        'url': post['url'],
+        'fields': post['fields'],
+        'token': token,
+        'expires_in': expires_in,
+    }
+
+
+def load_token(token, kind, user):
+    """
+    Decode a confirmation token issued to `user` for `kind`.
+
+    Raises:
+        DirectUploadError: invalid, expired or issued for something else
+    """
+    try:
+        data = signing.loads(
+            token, salt=TOKEN_SALT,
+            max_age=settings.DIRECT_UPLOAD_EXPIRATION_SECONDS + CONFIRM_GRACE_SECONDS
+        )
+    except signing.BadSignature:
+        raise DirectUploadError('Token de envio inválido ou expirado.')
+
+    if data.get('kind') != kind or data.get('user') != user.pk:
+        raise DirectUploadError('Token de envio inválido ou expirado.')
+    return data
+
+
+def verify_uploaded_object(data):
+    """
+    HEAD the uploaded object and check it against the issued policy.
+
+    Objects that do not match are deleted.
+
+    Returns:
+        int: Object size in bytes
+    """
+    if not direct_uploads_enabled():
+        raise DirectUploadError('Envio direto indisponível. Use o envio pelo servidor.')
+
+    try:
+        head = s3_client().head_object(Bucket=default_storage.bucket_name, Key=object_key(data['name']))
+    except ClientError as e:
+        if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+            raise DirectUploadError('Arquivo não encontrado. Envie o arquivo antes de confirmar.')
+        raise
+
+    size = head['ContentLength']
+    content_type = head.get('ContentType', '').split(';')[0].strip()
+
+    if not 0 < size <= data['max_size'] or content_type != data['content_type']:
+        default_storage.delete(data['name'])
+        raise DirectUploadError('O arquivo enviado não corresponde à política de envio.')
+
+    return size
+
+
+def store_uploaded_object(data, size):
+    """
+    Reference the blob for a verified attachment object.
+
+    The object is read back once to hash it. New content keeps its object
+    as the blob file (no copy); known content is deduplicated and the
+    uploaded object deleted once the transaction commits (a rolled back
+    confirmation can be retried).
+
+    Returns:
+        AttachmentBlob
+    """
+    from .blobs import acquire_blob, hash_stream
+
+    with default_storage.open(data['name'], 'rb') as file:
+        sha256, _ = hash_stream(file)
+
+    blob, _ = acquire_blob(sha256, size, data['file_name'], lambda name: data['name'])
+    if blob.file.name != data['name']:
+        transaction.on_commit(lambda: default_storage.delete(data['name']))
+    return blob
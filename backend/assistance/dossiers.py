@@ -0,0 +1,293 @@
+"""
+Accountability dossier ("dossiê") PDFs for completed cases.
+
+The dossier holds the case summary, public and internal descriptions,
+beneficiary bank data, the full CaseTimeline and a preview of each image /
+PDF attachment (their `medium` JPEG rendition, see assistance.renditions).
+
+Rendering is CPU-bound, so it only happens in the
+assistance.generate_case_dossier task (on the `media` queue, served by a
+prefork worker pool). The result is stored as a CaseDossier and served from
+storage afterwards. Its cache key is a hash of the case's updated_at and
+attachment set (ids, stored files, previews available): while it matches,
+the case is never rendered again.
+
+assistance.generate_monthly_dossiers renders every case completed in a
+month, one task per case.
+"""
+
+import calendar
+import hashlib
+import io
+import logging
+from datetime import date, datetime, time
+from xml.sax.saxutils import escape
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DOSSIERS_DIR = 'assistance_dossiers'
+
+# A render queued for a case version is not queued again for this long
+QUEUE_LOCK_SECONDS = 10 * 60
+
+# Rendition embedded as attachment preview
+PREVIEW_RENDITION = 'medium'
+
+
+class DossierError(Exception):
+    """The case cannot have a dossier (not completed)"""
+
+
+def dossier_cache_key(case):
+    """
+    Version of the case a dossier is rendered from.
+
+    Changes when the case is saved (updated_at, which covers status, bank
+    data and timeline-producing transitions) or when attachments or their
+    previews are added, replaced or removed.
+    """
+    from .models import Attachment
+
+    digest = hashlib.sha256(case.updated_at.isoformat().encode())
+    attachments = Attachment.objects.filter(case=case).order_by('pk').values_list(
+        'pk', 'file', 'renditions'
+    )
+    for pk, name, renditions in attachments:
+        preview = (renditions or {}).get(PREVIEW_RENDITION, {}).get('jpeg', '')
+        digest.update(f'|{pk}:{name}:{preview}'.encode())
+    return digest.hexdigest()
+
+
+def current_dossier(case, cache_key=None):
+    """The stored dossier of `case` when it is up to date, else None"""
+    from .models import CaseDossier
+
+    cache_key = cache_key or dossier_cache_key(case)
+    return CaseDossier.objects.filter(case=case, cache_key=cache_key).first()
+
+
+def request_dossier(case):
+    """
+    Stored, up-to-date dossier of a completed case, or queue its rendering.
+
+    Returns:
+        (CaseDossier or None, cache_key); None means a render is queued
+
+    Raises:
+        DossierError: case not completed
+    """
+    if case.status != 'completed':
+        raise DossierError('O dossiê só está disponível para casos concluídos.')
+
+    cache_key = dossier_cache_key(case)
+    dossier = current_dossier(case, cache_key)
+    if dossier is None and cache.add(f'assistance:dossier:{case.pk}:{cache_key}', 1, QUEUE_LOCK_SECONDS):
+        from .tasks import generate_case_dossier
+        generate_case_dossier.delay(case.pk)
+    return dossier, cache_key
+
+
+def month_range(year, month):
+    """First and last instant (aware) of a calendar month"""
+    last_day = calendar.monthrange(year, month)[1]
+    start = timezone.make_aware(datetime.combine(date(year, month, 1), time.min))
+    end = timezone.make_aware(datetime.combine(date(year, month, last_day), time.max))
+    return start, end
+
+
+def cases_completed_in(year, month):
+    """Completed cases whose completion falls in the given month"""
+    from .models import AssistanceCase
+
+    start, end = month_range(year, month)
+    return AssistanceCase.objects.filter(
+        status='completed', completed_at__range=(start, end)
+    ).order_by('completed_at', 'pk')
+
+
+def _format_datetime(value):
+    return timezone.localtime(value).strftime('%d/%m/%Y %H:%M') if value else '-'
+
+
+def _user_label(user):
+    if user is None:
+        return '-'
+    return user.get_full_name() or user.email
+
+
+def _preview_image(attachment, max_width, max_height):
+    """Flowable with the attachment's preview, or None when not rendered yet"""
+    from reportlab.lib.utils import ImageReader
+    from reportlab.platypus import Image
+
+    entry = (attachment.renditions or {}).get(PREVIEW_RENDITION)
+    if not entry or not entry.get('jpeg'):
+        return None
+
+    try:
+        with default_storage.open(entry['jpeg'], 'rb') as file:
+            data = io.BytesIO(file.read())
+    except FileNotFoundError:
+        return None
+
+    width, height = ImageReader(data).getSize()
+    scale = min(max_width / width, max_height / height, 1)
+    data.seek(0)
+    return Image(data, width=width * scale, height=height * scale)
+
+
+def render_dossier(case):
+    """
+    Render the dossier PDF of `case`.
+
+    Returns:
+        PDF bytes
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import cm
+    from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    from .models import Attachment, CaseTimeline
+
+    styles = getSampleStyleSheet()
+    body = styles['BodyText']
+    small = styles['BodyText'].clone('Small', fontSize=8, leading=10)
+
+    def text(value, style=body):
+        return Paragraph(escape(str(value or '-')).replace('\n', '<br/>'), style)
+
+    def table(rows, col_widths, header=False):
+        result = Table(rows, colWidths=col_widths, repeatRows=1 if header else 0)
+        commands = [
+            ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+        ]
+        if header:
+            commands.append(('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#e8eef5')))
+        else:
+            commands.append(('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#f3f5f7')))
+        result.setStyle(TableStyle(commands))
+        return result
+
+    buffer = io.BytesIO()
+    document = SimpleDocTemplate(
+        buffer, pagesize=A4, title=f'Dossiê do caso #{case.pk}',
+        leftMargin=2 * cm, rightMargin=2 * cm, topMargin=2 * cm, bottomMargin=2 * cm
+    )
+    width = document.width
+    label_width = 5 * cm
+
+    story = [
+        Paragraph(escape(f'Dossiê do caso #{case.pk}: {case.title}'), styles['Title']),
+        text(f'Gerado em {_format_datetime(timezone.now())}', small),
+        Spacer(1, 0.5 * cm),
+        table([
+            ['Status', text(case.get_status_display())],
+            ['Valor total', text(f'R$ {case.total_value:.2f}')],
+            ['Criado por', text(_user_label(case.created_by))],
+            ['Revisado por', text(_user_label(case.reviewed_by))],
+            ['Criado em', text(_format_datetime(case.created_at))],
+            ['Aprovado em', text(_format_datetime(case.approved_at))],
+            ['Transferência confirmada em', text(_format_datetime(case.transfer_confirmed_at))],
+            ['Comprovação enviada em', text(_format_datetime(case.member_proof_submitted_at))],
+            ['Concluído em', text(_format_datetime(case.completed_at))],
+        ], [label_width, width - label_width]),
+
+        Paragraph('Descrição pública', styles['Heading2']),
+        text(case.public_description),
+        Paragraph('Descrição interna', styles['Heading2']),
+        text(case.internal_description),
+
+        Paragraph('Dados bancários do beneficiário', styles['Heading2']),
+        table([
+            ['Nome', text(case.beneficiary_name)],
+            ['CPF', text(case.beneficiary_cpf)],
+            ['Banco', text(case.beneficiary_bank)],
+            ['Tipo de conta', text(case.get_beneficiary_account_type_display())],
+            ['Agência', text(case.beneficiary_agency)],
+            ['Conta', text(case.beneficiary_account)],
+            ['Chave PIX', text(case.beneficiary_pix_key)],
+        ], [label_width, width - label_width]),
+    ]
+
+    events = CaseTimeline.objects.filter(case=case).select_related('user').order_by('created_at', 'pk')
+    story.append(Paragraph('Histórico', styles['Heading2']))
+    story.append(table(
+        [['Data', 'Evento', 'Usuário', 'Descrição']] + [
+            [
+                text(_format_datetime(event.created_at), small),
+                text(event.get_event_type_display(), small),
+                text(_user_label(event.user), small),
+                text(event.description, small),
+            ]
+            for event in events.iterator()
+        ],
+        [3 * cm, 3.5 * cm, 3.5 * cm, width - 10 * cm], header=True
+    ))
+
+    attachments = list(
+        Attachment.objects.filter(case=case).select_related('uploaded_by').order_by('uploaded_at', 'pk')
+    )
+    story.append(Paragraph('Anexos', styles['Heading2']))
+    story.append(table(
+        [['Arquivo', 'Tipo', 'Tamanho', 'Enviado por', 'Enviado em']] + [
+            [
+                text(attachment.file_name, small),
+                text(attachment.get_attachment_type_display(), small),
+                text(f'{attachment.file_size_mb} MB', small),
+                text(_user_label(attachment.uploaded_by), small),
+                text(_format_datetime(attachment.uploaded_at), small),
+            ]
+            for attachment in attachments
+        ],
+        [width - 12 * cm, 3.5 * cm, 2 * cm, 3.5 * cm, 3 * cm], header=True
+    ))
+
+    previews = [
+        (attachment, _preview_image(attachment, width, document.height - 2 * cm))
+        for attachment in attachments if attachment.is_image or attachment.is_pdf
+    ]
+    for attachment, image in previews:
+        story.append(PageBreak())
+        story.append(Paragraph(escape(attachment.file_name), styles['Heading3']))
+        story.append(image if image is not None else text('Pré-visualização indisponível.'))
+
+    document.build(story)
+    return buffer.getvalue()
+
+
+def generate_dossier(case):
+    """
+    Render and store the dossier of `case` unless an up-to-date one exists.
+
+    Returns:
+        (CaseDossier, rendered): rendered is False when it was up to date
+    """
+    from .models import CaseDossier
+
+    cache_key = dossier_cache_key(case)
+    dossier = current_dossier(case, cache_key)
+    if dossier is not None:
+        return dossier, False
+
+    pdf = render_dossier(case)
+    name = default_storage.save(f'{DOSSIERS_DIR}/{case.pk}/{cache_key}.pdf', io.BytesIO(pdf))
+
+    with transaction.atomic():
+        previous = CaseDossier.objects.select_for_update().filter(case=case).first()
+        old_name = previous.file.name if previous else None
+        dossier, _ = CaseDossier.objects.update_or_create(
+            case=case, defaults={'cache_key': cache_key, 'file': name, 'file_size': len(pdf)}
+        )
+        if old_name and old_name != name:
+            transaction.on_commit(lambda: default_storage.delete(old_name), robust=True)
+
+    logger.info(f"Dossier for case {case.pk} rendered ({len(pdf)} bytes)")
+    return dossier, True
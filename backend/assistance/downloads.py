@@ -0,0 +1,242 @@
+"""
+Protected file downloads (attachments, renditions, donation payment proofs).
+
+Media is not public: the views check who may see the file, then hand the
+byte transfer off so no worker streams it:
+- USE_S3: redirect to a short-lived presigned GET URL
+- PROTECTED_MEDIA_BACKEND 'x-accel-redirect': nginx serves the file from an
+  internal location (X-Accel-Redirect header)
+- PROTECTED_MEDIA_BACKEND 'x-sendfile': Apache/lighttpd serve the file
+- PROTECTED_MEDIA_BACKEND 'django': the worker streams it (development)
+
+Range requests are answered by whoever sends the bytes (nginx, Apache, S3,
+or the development fallback below). Conditional GETs (If-None-Match) are
+answered here with a 304 before any hand-off: blob files are
+content-addressed, so their SHA-256 is a strong ETag; other files get a
+weak ETag from their storage name (a replaced file gets a new name).
+
+nginx configuration for x-accel-redirect:
+
+    location /protected-media/ {
+        internal;
+        alias /app/media/;
+    }
+
+API responses link to the download endpoints with a signed `token` query
+parameter (DOWNLOAD_LINK_EXPIRATION_SECONDS), so the links work in <img> and
+<a> tags, which cannot send the Authorization header.
+"""
+
+import hashlib
+import mimetypes
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.http import FileResponse, HttpResponse, HttpResponseRedirect, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header
+from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated
+
+TOKEN_SALT = 'assistance.downloads'
+
+# Presigned S3 URLs are followed right away by the redirected client
+S3_URL_EXPIRATION_SECONDS = 5 * 60
+
+READ_BUFFER_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def sign_download(kind, pk, user):
+    """Token for a download link issued to `user`"""
+    return signing.dumps({'kind': kind, 'id': str(pk), 'user': user.pk}, salt=TOKEN_SALT)
+
+
+def download_user(request, kind, pk):
+    """
+    The user a download is for: from the signed `token` query parameter,
+    or the authenticated request user.
+
+    Raises:
+        AuthenticationFailed: invalid or expired token
+        NotAuthenticated: no token and no authenticated user
+    """
+    token = request.query_params.get('token')
+    if not token:
+        if not request.user.is_authenticated:
+            raise NotAuthenticated()
+        return request.user
+
+    try:
+        data = signing.loads(token, salt=TOKEN_SALT, max_age=settings.DOWNLOAD_LINK_EXPIRATION_SECONDS)
+    except signing.BadSignature:
+        raise AuthenticationFailed('Link de download inválido ou expirado.')
+
+    if data.get('kind') != kind or data.get('id') != str(pk):
+        raise AuthenticationFailed('Link de download inválido ou expirado.')
+
+    user = get_user_model().objects.filter(pk=data.get('user'), is_active=True).first()
+    if user is None:
+        raise AuthenticationFailed('Link de download inválido ou expirado.')
+    return user
+
+
+def with_query(url, **params):
+    """Append query parameters to a download link"""
+    query = '&'.join(f'{key}={quote(str(value))}' for key, value in params.items())
+    if not query:
+        return url
+    return f"{url}{'&' if '?' in url else '?'}{query}"
+
+
+def download_url(path, kind, pk, request=None):
+    """
+    Download link for API responses: absolute and signed for the request
+    user when there is a request, the bare path otherwise (the admin, with
+    session authentication).
+
+    Args:
+        path: Endpoint path (from reverse())
+        kind, pk: What the token is valid for
+    """
+    if request is None:
+        return path
+    if request.user.is_authenticated:
+        path = with_query(path, token=sign_download(kind, pk, request.user))
+    return request.build_absolute_uri(path)
+
+
+def attachment_download_url(attachment, request=None):
+    return download_url(
+        reverse('attachment-download', args=[attachment.pk]), 'attachment', attachment.pk, request
+    )
+
+
+def file_etag(name, sha256=None):
+    """Strong ETag from the content hash, weak one from the storage name"""
+    if sha256:
+        return f'"{sha256}"'
+    return f'W/"{hashlib.sha256(name.encode()).hexdigest()[:32]}"'
+
+
+def _parse_range(header, size):
+    """
+    (start, end) of a single `bytes=` range, None to send the whole file.
+
+    Raises:
+        ValueError: the range cannot be satisfied
+    """
+    match = RANGE_RE.match(header or '')
+    if not match or not any(match.groups()):
+        return None
+
+    start, end = match.groups()
+    if start:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    else:
+        # Suffix range: the last N bytes
+        start = max(size - int(end), 0)
+        end = size - 1
+
+    if start > end or start >= size:
+        raise ValueError(header)
+    return start, end
+
+
+def _read_range(file, length):
+    try:
+        while length > 0:
+            data = file.read(min(READ_BUFFER_SIZE, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+    finally:
+        file.close()
+
+
+def _django_response(request, name, etag):
+    """Development fallback: stream the file, with single-range support"""
+    file = default_storage.open(name, 'rb')
+    size = file.size
+
+    byte_range = None
+    if_range = request.headers.get('If-Range')
+    # If-Range needs a strong validator; otherwise send the whole file
+    if not if_range or (if_range == etag and not etag.startswith('W/')):
+        try:
+            byte_range = _parse_range(request.headers.get('Range'), size)
+        except ValueError:
+            file.close()
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    if byte_range is None:
+        response = FileResponse(file)
+    else:
+        start, end = byte_range
+        file.seek(start)
+        response = StreamingHttpResponse(_read_range(file, end - start + 1), status=206)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def _presigned_url(name, file_name, content_type, as_attachment):
+    from .direct_uploads import object_key, s3_client
+
+    return s3_client().generate_presigned_url('get_object', Params={
+        'Bucket': default_storage.bucket_name,
+        'Key': object_key(name),
+        'ResponseContentType': content_type,
+        'ResponseContentDisposition': content_disposition_header(as_attachment, file_name),
+    }, ExpiresIn=S3_URL_EXPIRATION_SECONDS)
+
+
+def serve_file(request, name, file_name, etag=None, as_attachment=False):
+    """
+    Response for a permitted download of the stored file `name`.
+
+    Args:
+        request: The request (its conditional and Range headers are used)
+        name: Storage name
+        file_name: Name presented to the user
+        etag: ETag (see file_etag); defaults to the name-based one
+        as_attachment: Content-Disposition attachment instead of inline
+    """
+    etag = etag or file_etag(name)
+    not_modified = get_conditional_response(request, etag=etag)
+    if not_modified is not None:
+        return not_modified
+
+    content_type = mimetypes.guess_type(file_name)[0] or 'application/octet-stream'
+
+    if settings.USE_S3:
+        response = HttpResponseRedirect(_presigned_url(name, file_name, content_type, as_attachment))
+        response['Cache-Control'] = 'private, no-store'
+        return response
+
+    backend = settings.PROTECTED_MEDIA_BACKEND
+    if backend == 'x-accel-redirect':
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = settings.PROTECTED_MEDIA_INTERNAL_URL + quote(name)
+    elif backend == 'x-sendfile':
+        response = HttpResponse()
+        response['X-Sendfile'] = default_storage.path(name)
+    else:
+        response = _django_response(request, name, etag)
+
+    response['Content-Type'] = content_type
+    response['Content-Disposition'] = content_disposition_header(as_attachment, file_name)
+    response['Cache-Control'] = 'private, no-cache'
+    response['ETag'] = etag
+    return response
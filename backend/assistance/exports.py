@@ -0,0 +1,156 @@
+"""
+Streaming ZIP export of case attachments (fiscal council audits).
+
+The archive is produced while it is sent: each attachment is read from
+storage in READ_BUFFER_SIZE chunks and written into the ZIP, and whatever
+zipfile wrote so far is yielded to the response. Nothing is written to a
+temporary file and memory use does not grow with the export size:
+- the ZIP is written to an unseekable stream, so zipfile puts sizes and
+  CRCs in data descriptors after each entry instead of seeking back
+- files are stored (not deflated): photos and PDFs are already compressed
+- with USE_S3 objects are read from the GetObject body stream (the
+  storage's S3File would spool the whole object to a temporary file)
+
+A manifest.csv (file names, types, sizes, uploader) is added last, listing
+files missing from storage as well.
+"""
+
+import csv
+import io
+import zipfile
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from django.utils.text import get_valid_filename, slugify
+
+from .downloads import READ_BUFFER_SIZE
+
+MANIFEST_NAME = 'manifest.csv'
+
+MANIFEST_HEADER = [
+    'caso_id', 'caso', 'arquivo', 'nome_original', 'tipo_anexo', 'tipo_arquivo',
+    'tamanho_bytes', 'sha256', 'enviado_por', 'enviado_em', 'status',
+]
+
+# Rows fetched per query while iterating attachments
+ITERATOR_CHUNK_SIZE = 200
+
+
+class _ZipStream(io.RawIOBase):
+    """Write-only, unseekable buffer drained after every write"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        """Yield what was written since the last drain, if anything"""
+        if self._chunks:
+            data = b''.join(self._chunks)
+            self._chunks = []
+            yield data
+
+
+def _read_chunks(name):
+    """Contents of the stored file `name`, in chunks"""
+    if settings.USE_S3:
+        from .direct_uploads import object_key, s3_client
+
+        body = s3_client().get_object(Bucket=default_storage.bucket_name, Key=object_key(name))['Body']
+        try:
+            yield from body.iter_chunks(READ_BUFFER_SIZE)
+        finally:
+            body.close()
+        return
+
+    with default_storage.open(name, 'rb') as file:
+        while True:
+            data = file.read(READ_BUFFER_SIZE)
+            if not data:
+                break
+            yield data
+
+
+def archive_path(attachment):
+    """Path of an attachment in the archive: one directory per case"""
+    case = attachment.case
+    case_dir = f'{case.pk}-{slugify(case.title)[:50]}'.rstrip('-')
+    file_name = get_valid_filename(attachment.file_name) or 'arquivo'
+    return f'{case_dir}/{attachment.pk}-{file_name}'
+
+
+def _uploader(attachment):
+    user = attachment.uploaded_by
+    if user is None:
+        return ''
+    full_name = user.get_full_name()
+    return f'{full_name} <{user.email}>' if full_name else user.email
+
+
+def _manifest(rows):
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(MANIFEST_HEADER)
+    writer.writerows(rows)
+    # BOM so spreadsheet software reads the accents correctly
+    return '\ufeff' + output.getvalue()
+
+
+def stream_attachments_zip(attachments):
+    """
+    Generate a ZIP of `attachments` chunk by chunk.
+
+    Args:
+        attachments: Attachment queryset (already restricted to what the
+            user may see); iterated once, in batches
+
+    Yields:
+        bytes of the archive
+    """
+    attachments = attachments.select_related('case', 'uploaded_by').order_by('case_id', 'id')
+    stream = _ZipStream()
+    rows = []
+
+    with zipfile.ZipFile(stream, mode='w', compression=zipfile.ZIP_STORED) as archive:
+        for attachment in attachments.iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+            path = archive_path(attachment)
+            name = attachment.file.name
+            row = [
+                attachment.case_id, attachment.case.title, path, attachment.file_name,
+                attachment.get_attachment_type_display(), attachment.file_type,
+                attachment.file_size, attachment.blob_id or '', _uploader(attachment),
+                timezone.localtime(attachment.uploaded_at).isoformat(),
+            ]
+            if not name or not default_storage.exists(name):
+                rows.append(row + ['ausente'])
+                continue
+
+            info = zipfile.ZipInfo(path, date_time=timezone.localtime(attachment.uploaded_at).timetuple()[:6])
+            info.compress_type = zipfile.ZIP_STORED
+            # Declared up front so zipfile picks ZIP64 headers for large files
+            info.file_size = attachment.file_size or 0
+
+            with archive.open(info, mode='w') as entry:
+                for data in _read_chunks(name):
+                    entry.write(data)
+                    yield from stream.drain()
+            rows.append(row + ['ok'])
+            yield from stream.drain()
+
+        archive.writestr(MANIFEST_NAME, _manifest(rows), compress_type=zipfile.ZIP_DEFLATED)
+
+    yield from stream.drain()
+
+
+def export_file_name(case=None):
+    """Download name of the archive: one case or a dated multi-case export"""
+    if case is not None:
+        return f'caso-{case.pk}-anexos.zip'
+    return f'casos-anexos-{timezone.localdate():%Y%m%d}.zip'
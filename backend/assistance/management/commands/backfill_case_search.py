@@ -0,0 +1,43 @@
+"""
+Index existing assistance cases for full-text search.
+
+New and edited cases are indexed by database triggers; this command only
+catches up rows created before the search backend was installed. It works
+in small batches and can be interrupted and re-run safely.
+
+Usage:
+    python manage.py backfill_case_search [--batch-size 1000] [--reinstall]
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from assistance.search import backfill_search_index, install_search_backend
+
+
+class Command(BaseCommand):
+    help = 'Index existing assistance cases for full-text search'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--sleep', type=float, default=0,
+                            help='Seconds to pause between batches (eases load on production)')
+        parser.add_argument('--reinstall', action='store_true',
+                            help='Recreate the search triggers before backfilling')
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, **options):
+        if options['reinstall']:
+            install_search_backend(connections[options['database']])
+            self.stdout.write('Search triggers installed')
+
+        total = 0
+        for indexed in backfill_search_index(options['batch_size'], using=options['database']):
+            total += indexed
+            self.stdout.write(f'Indexed {indexed} cases ({total} total)')
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(f'Backfill complete: {total} cases indexed'))
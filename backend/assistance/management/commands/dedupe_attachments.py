@@ -0,0 +1,101 @@
+"""
+Move attachments stored before deduplication into content-addressed blobs,
+and verify blob reference counts.
+
+Each attachment without a blob is hashed (streamed from storage). New
+content keeps its file as the blob file; duplicates are pointed at the
+existing blob and their own file is deleted.
+
+Reference counts are then recounted from the attachments table and any
+drift is fixed; blobs no longer referenced are deleted.
+
+Usage:
+    python manage.py dedupe_attachments [--dry-run] [--batch-size 200]
+"""
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from assistance.blobs import acquire_blob, hash_stream, release_blob
+from assistance.models import Attachment, AttachmentBlob
+
+
+class Command(BaseCommand):
+    help = 'Store existing attachments by content hash and fix blob reference counts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report what would change')
+        parser.add_argument('--batch-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+
+        linked, duplicates, missing, freed = self._link_attachments(options['batch_size'], dry_run)
+        self.stdout.write(
+            f'{linked} attachments linked to blobs, {duplicates} duplicates '
+            f'({freed} bytes freed), {missing} files missing'
+        )
+
+        fixed = self._sync_ref_counts(dry_run)
+        summary = f'{fixed} blobs with wrong reference counts'
+        if dry_run:
+            summary += ' (dry run, nothing changed)'
+        self.stdout.write(self.style.SUCCESS(summary))
+
+    def _link_attachments(self, batch_size, dry_run):
+        linked = duplicates = missing = freed = 0
+        pending = Attachment.objects.filter(blob__isnull=True).exclude(file='').only('pk', 'file', 'file_name')
+        seen = set(AttachmentBlob.objects.values_list('sha256', flat=True))
+
+        for attachment in pending.iterator(chunk_size=batch_size):
+            name = attachment.file.name
+            try:
+                with default_storage.open(name, 'rb') as file:
+                    sha256, size = hash_stream(file)
+            except FileNotFoundError:
+                self.stderr.write(f'Attachment {attachment.pk}: file {name} not found')
+                missing += 1
+                continue
+
+            is_duplicate = sha256 in seen
+            seen.add(sha256)
+            linked += 1
+            if is_duplicate:
+                duplicates += 1
+                freed += size
+            if dry_run:
+                continue
+
+            with transaction.atomic():
+                blob, _ = acquire_blob(sha256, size, attachment.file_name, lambda blob_name: name)
+                Attachment.objects.filter(pk=attachment.pk).update(blob=blob, file=blob.file.name)
+
+            if blob.file.name != name and not Attachment.objects.filter(file=name).exists():
+                default_storage.delete(name)
+
+        return linked, duplicates, missing, freed
+
+    def _sync_ref_counts(self, dry_run):
+        """Recount references; returns the number of blobs fixed"""
+        fixed = 0
+        blobs = AttachmentBlob.objects.annotate(actual=Count('attachments')).order_by('pk')
+
+        for blob in blobs.iterator():
+            if blob.ref_count == blob.actual:
+                continue
+            self.stdout.write(f'Blob {blob.sha256[:12]}: stored {blob.ref_count}, actual {blob.actual}')
+            fixed += 1
+            if dry_run:
+                continue
+
+            if blob.actual:
+                AttachmentBlob.objects.filter(pk=blob.pk).update(ref_count=blob.actual)
+            else:
+                # release_blob deletes the row and the file with the last reference
+                AttachmentBlob.objects.filter(pk=blob.pk).update(ref_count=1)
+                release_blob(blob.pk)
+
+        return fixed
@@ -0,0 +1,50 @@
+"""
+Render the accountability dossiers of every case completed in a month.
+
+By default the renders are queued (assistance.generate_case_dossier, one
+task per case, on the `media` queue); --sync renders them in this process.
+Cases with an up-to-date dossier are skipped either way.
+
+Usage:
+    python manage.py generate_dossiers --month 2026-09 [--sync]
+"""
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from assistance.dossiers import cases_completed_in, generate_dossier
+from assistance.tasks import generate_monthly_dossiers
+
+
+class Command(BaseCommand):
+    help = 'Render the dossier PDFs of the cases completed in a month'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--month', required=True, help='Month as YYYY-MM')
+        parser.add_argument('--sync', action='store_true',
+                            help='Render here instead of queuing Celery tasks')
+
+    def handle(self, *args, **options):
+        try:
+            month = datetime.strptime(options['month'], '%Y-%m')
+        except ValueError:
+            raise CommandError('--month must be in the YYYY-MM format')
+
+        if not options['sync']:
+            result = generate_monthly_dossiers(month.year, month.month)
+            self.stdout.write(self.style.SUCCESS(
+                f"{result['queued']} dossiers queued, {result['current']} up to date"
+            ))
+            return
+
+        rendered = current = 0
+        cases = cases_completed_in(month.year, month.month).select_related('created_by', 'reviewed_by')
+        for case in cases.iterator():
+            _, was_rendered = generate_dossier(case)
+            if was_rendered:
+                rendered += 1
+            else:
+                current += 1
+
+        self.stdout.write(self.style.SUCCESS(f'{rendered} dossiers rendered, {current} up to date'))
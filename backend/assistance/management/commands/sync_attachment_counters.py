@@ -0,0 +1,96 @@
+"""
+Verify and repair the denormalized attachment counters on AssistanceCase.
+
+Counters are maintained by signals on Attachment create/update/delete; this
+command recounts them from the attachments table in batches and fixes any
+drift (for example after raw SQL maintenance).
+
+Usage:
+    python manage.py sync_attachment_counters [--check] [--batch-size 500]
+
+With --check nothing is written and the command exits with status 1 when
+mismatches are found.
+"""
+
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+
+from assistance.models import AssistanceCase, Attachment
+
+
+class Command(BaseCommand):
+    help = 'Verify (and repair) attachment counters on assistance cases'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true',
+                            help='Only report mismatches, do not fix them')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        check_only = options['check']
+
+        case_ids = AssistanceCase.objects.order_by('pk').values_list('pk', flat=True)
+        batch = []
+        checked = mismatched = 0
+
+        for case_id in case_ids.iterator(chunk_size=batch_size):
+            batch.append(case_id)
+            if len(batch) >= batch_size:
+                mismatched += self._sync_batch(batch, check_only)
+                checked += len(batch)
+                batch = []
+        if batch:
+            mismatched += self._sync_batch(batch, check_only)
+            checked += len(batch)
+
+        summary = f'{checked} cases checked, {mismatched} with wrong counters'
+        if check_only and mismatched:
+            raise CommandError(summary)
+        if not check_only and mismatched:
+            summary += ' (fixed)'
+        self.stdout.write(self.style.SUCCESS(summary))
+
+    def _actual_counts(self, case_ids):
+        counts = defaultdict(lambda: dict.fromkeys(AssistanceCase.COUNTER_FIELDS, 0))
+        rows = Attachment.objects.filter(case_id__in=case_ids).order_by().values(
+            'case_id', 'attachment_type'
+        ).annotate(total=Count('pk'))
+
+        for row in rows:
+            case_counts = counts[row['case_id']]
+            case_counts['attachment_count'] += row['total']
+            counter = AssistanceCase.ATTACHMENT_TYPE_COUNTERS.get(row['attachment_type'])
+            if counter:
+                case_counts[counter] += row['total']
+        return counts
+
+    def _sync_batch(self, case_ids, check_only):
+        """Compare stored and actual counters; returns the number of mismatches"""
+        with transaction.atomic():
+            cases = AssistanceCase.objects.filter(pk__in=case_ids).only(
+                'pk', *AssistanceCase.COUNTER_FIELDS
+            )
+            if not check_only:
+                # Block concurrent uploads to these cases while recounting
+                cases = cases.select_for_update()
+            cases = list(cases)
+
+            actual = self._actual_counts(case_ids)
+            wrong = []
+            for case in cases:
+                expected = actual[case.pk]
+                stored = {field: getattr(case, field) for field in AssistanceCase.COUNTER_FIELDS}
+                if stored != expected:
+                    self.stdout.write(f'Case {case.pk}: stored {stored}, actual {expected}')
+                    for field, value in expected.items():
+                        setattr(case, field, value)
+                    wrong.append(case)
+
+            if wrong and not check_only:
+                AssistanceCase.objects.bulk_update(wrong, AssistanceCase.COUNTER_FIELDS)
+
+        return len(wrong)
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:38
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+from assistance.search import install_search_backend, uninstall_search_backend
+
+
+def install(apps, schema_editor):
+    install_search_backend(schema_editor.connection)
+
+
+def uninstall(apps, schema_editor):
+    uninstall_search_backend(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assistance', '0008_remove_assistancecase_member_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assistancecase',
+            name='internal_search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='assistancecase',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='assistancecase',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='assistance__search__40e825_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='assistancecase',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['internal_search_vector'], name='assistance__interna_25c694_gin'),
+        ),
+        # Triggers only; existing rows are indexed by `manage.py backfill_case_search`
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:47
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    AssistanceCase = apps.get_model('assistance', 'AssistanceCase')
+    Attachment = apps.get_model('assistance', 'Attachment')
+
+    def count_of(**filters):
+        counts = Attachment.objects.filter(
+            case=OuterRef('pk'), **filters
+        ).order_by().values('case').annotate(total=Count('pk')).values('total')
+        return Coalesce(Subquery(counts[:1]), 0)
+
+    AssistanceCase.objects.update(
+        attachment_count=count_of(),
+        payment_proof_count=count_of(attachment_type='payment_proof'),
+        photo_evidence_count=count_of(attachment_type='photo_evidence')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assistance', '0009_assistancecase_search_vectors'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assistancecase',
+            name='attachment_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Anexos'),
+        ),
+        migrations.AddField(
+            model_name='assistancecase',
+            name='payment_proof_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Comprovantes de Pagamento'),
+        ),
+        migrations.AddField(
+            model_name='assistancecase',
+            name='photo_evidence_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Fotos da Doação'),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assistance', '0010_assistancecase_attachment_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attachment',
+            index=models.Index(fields=['case', 'uploaded_at'], name='assistance__case_id_5fd271_idx'),
+        ),
+    ]
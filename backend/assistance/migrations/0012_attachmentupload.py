@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-16 21:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('assistance', '0011_attachment_case_uploaded_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttachmentUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('attachment_type', models.CharField(choices=[('payment_proof', 'Comprovante de Pagamento'), ('photo_evidence', 'Foto da Doação'), ('other', 'Outro Documento')], default='other', max_length=20, verbose_name='Tipo de Anexo')),
+                ('file_name', models.CharField(max_length=255, verbose_name='Nome do Arquivo')),
+                ('file_size', models.PositiveBigIntegerField(help_text='Tamanho total declarado em bytes', verbose_name='Tamanho')),
+                ('offset', models.PositiveBigIntegerField(default=0, verbose_name='Bytes Recebidos')),
+                ('parts', models.JSONField(blank=True, default=list, help_text='Nomes dos chunks armazenados, em ordem', verbose_name='Partes')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Criado em')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+                ('attachment', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload', to='assistance.attachment', verbose_name='Anexo')),
+                ('case', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='uploads', to='assistance.assistancecase', verbose_name='Caso')),
+                ('uploaded_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='attachment_uploads', to=settings.AUTH_USER_MODEL, verbose_name='Enviado por')),
+            ],
+            options={
+                'verbose_name': 'Envio de Anexo',
+                'verbose_name_plural': 'Envios de Anexos',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
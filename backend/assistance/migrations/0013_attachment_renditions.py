@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-16 21:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assistance', '0012_attachmentupload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attachment',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Versões Reduzidas'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-16 21:11
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assistance', '0013_attachment_renditions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttachmentBlob',
+            fields=[
+                ('sha256', models.CharField(max_length=64, primary_key=True, serialize=False, verbose_name='SHA-256')),
+                ('file', models.FileField(max_length=255, upload_to='', verbose_name='Arquivo')),
+                ('size', models.PositiveBigIntegerField(help_text='Tamanho em bytes', verbose_name='Tamanho')),
+                ('ref_count', models.PositiveIntegerField(default=0, verbose_name='Referências')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+            ],
+            options={
+                'verbose_name': 'Conteúdo de Anexo',
+                'verbose_name_plural': 'Conteúdos de Anexos',
+            },
+        ),
+        migrations.AddField(
+            model_name='attachmentupload',
+            name='sha256',
+            field=models.CharField(blank=True, max_length=64, verbose_name='SHA-256'),
+        ),
+        migrations.AlterField(
+            model_name='attachment',
+            name='file',
+            field=models.FileField(help_text='PDF, imagem ou documento (máx. 5MB)', max_length=255, upload_to='assistance_attachments/%Y/%m/', verbose_name='Arquivo'),
+        ),
+        migrations.AddField(
+            model_name='attachment',
+            name='blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='attachments', to='assistance.attachmentblob', verbose_name='Conteúdo'),
+        ),
+    ]
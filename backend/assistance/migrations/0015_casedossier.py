@@ -0,0 +1,29 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assistance', '0014_attachment_blobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CaseDossier',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cache_key', models.CharField(help_text='Hash de updated_at e dos anexos do caso', max_length=64, verbose_name='Versão')),
+                ('file', models.FileField(max_length=255, upload_to='assistance_dossiers/', verbose_name='Arquivo')),
+                ('file_size', models.PositiveBigIntegerField(default=0, help_text='Tamanho em bytes', verbose_name='Tamanho')),
+                ('generated_at', models.DateTimeField(auto_now=True, verbose_name='Gerado em')),
+                ('case', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='dossier', to='assistance.assistancecase', verbose_name='Caso')),
+            ],
+            options={
+                'verbose_name': 'Dossiê do Caso',
+                'verbose_name_plural': 'Dossiês dos Casos',
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-16 23:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assistance', '0015_casedossier'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attachment',
+            name='upload_name',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255, verbose_name='Objeto Enviado'),
+        ),
+        migrations.AddConstraint(
+            model_name='attachment',
+            constraint=models.UniqueConstraint(condition=models.Q(('upload_name', ''), _negated=True), fields=('upload_name',), name='attachment_unique_upload_name'),
+        ),
+    ]
@@ -8,13 +8,85 @@ This module handles the core workflow of the ORBE platform:
 """
 
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator
 from django.utils import timezone
 from users.models import User
 import os
+import uuid
 
 
-class AssistanceCase(models.Model):
+class TrackedFieldsMixin:
+    """
+    Remember field values as loaded from (or last saved to) the database.
+
+    Lets signals detect what changed on save without re-fetching the row.
+    Instances that were never loaded or saved track nothing.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def _record_loaded_values(self, field_names=None):
+        if field_names is None:
+            fields = self._meta.concrete_fields
+        else:
+            fields = [self._meta.get_field(name) for name in field_names]
+
+        loaded = getattr(self, '_loaded_values', None)
+        if loaded is None:
+            loaded = self._loaded_values = {}
+
+        for field in fields:
+            # Deferred fields stay untracked instead of being fetched
+            if field.attname in self.__dict__:
+                loaded[field.attname] = getattr(self, field.attname)
+
+    def is_tracked(self, field_name):
+        """True if the loaded value of `field_name` is known"""
+        attname = self._meta.get_field(field_name).attname
+        return attname in getattr(self, '_loaded_values', {})
+
+    def get_loaded_value(self, field_name, default=None):
+        """Value of `field_name` when the instance was loaded or last saved"""
+        attname = self._meta.get_field(field_name).attname
+        return getattr(self, '_loaded_values', {}).get(attname, default)
+
+    def get_dirty_fields(self):
+        """
+        Fields whose current value differs from the loaded one.
+
+        Returns:
+            dict: {field_name: loaded_value}
+        """
+        loaded = getattr(self, '_loaded_values', {})
+        return {
+            field.name: loaded[field.attname]
+            for field in self._meta.concrete_fields
+            if field.attname in loaded
+            and field.attname in self.__dict__
+            and getattr(self, field.attname) != loaded[field.attname]
+        }
+
+    def has_changed(self, field_name):
+        return field_name in self.get_dirty_fields()
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        self._record_loaded_values(kwargs.get('update_fields'))
+
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using=using, fields=fields)
+        self._record_loaded_values(fields)
+
+
+class AssistanceCase(TrackedFieldsMixin, models.Model):
     """
     Represents a social assistance case tracking donation execution.
 
@@ -219,6 +291,31 @@ class AssistanceCase(models.Model):
         help_text='Explicação do Conselho Fiscal sobre a rejeição'
     )
 
+    # Attachment counters, kept in the same transaction as Attachment
+    # inserts/deletes by assistance.signals (see adjust_attachment_counters)
+    attachment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Anexos'
+    )
+
+    payment_proof_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Comprovantes de Pagamento'
+    )
+
+    photo_evidence_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Fotos da Doação'
+    )
+
+    # Full-text search (PostgreSQL only, maintained by a database trigger,
+    # see assistance/search.py)
+    search_vector = SearchVectorField(null=True, editable=False)
+    internal_search_vector = SearchVectorField(null=True, editable=False)
+
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Caso de Assistência'
@@ -226,11 +323,60 @@ class AssistanceCase(models.Model):
         indexes = [
             models.Index(fields=['-created_at']),
             models.Index(fields=['status', '-created_at']),
+            GinIndex(fields=['search_vector']),
+            GinIndex(fields=['internal_search_vector']),
         ]
 
+    COUNTER_FIELDS = ('attachment_count', 'payment_proof_count', 'photo_evidence_count')
+
+    # Attachment type -> per-type counter
+    ATTACHMENT_TYPE_COUNTERS = {
+        'payment_proof': 'payment_proof_count',
+        'photo_evidence': 'photo_evidence_count',
+    }
+
     def __str__(self):
         return f"{self.title} ({self.get_status_display()})"
 
+    def save(self, *args, **kwargs):
+        """
+        Full saves of existing cases never write the attachment counters,
+        which are only changed with atomic F() updates.
+        """
+        if kwargs.get('update_fields') is None and self.pk and not self._state.adding:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.COUNTER_FIELDS
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def adjust_attachment_counters(cls, case_id, attachment_type, delta, case=None):
+        """
+        Add `delta` to the total and per-type attachment counters.
+
+        Args:
+            case_id: Case to update
+            attachment_type: Attachment.attachment_type of the added/removed file
+            delta: +1 on upload, -1 on removal
+            case: Optional in-memory instance to keep in sync
+        """
+        fields = ['attachment_count']
+        if attachment_type in cls.ATTACHMENT_TYPE_COUNTERS:
+            fields.append(cls.ATTACHMENT_TYPE_COUNTERS[attachment_type])
+
+        cls.objects.filter(pk=case_id).update(**{
+            field: Greatest(F(field) + delta, Value(0)) for field in fields
+        })
+
+        if case is not None:
+            for field in fields:
+                setattr(case, field, max(getattr(case, field) + delta, 0))
+            case._record_loaded_values(fields)
+
     @property
     def is_draft(self):
         """Check if case is in draft status"""
@@ -287,18 +433,21 @@ class AssistanceCase(models.Model):
             return True
         return False
 
-    def approve(self, reviewer_user):
+    def approve(self, reviewer_user, commit=True):
         """
         Approve manual case by Admin.
         Sets approved status and timestamp.
         After approval, member must provide bank info.
+
+        With commit=False the fields are only changed in memory (bulk actions).
         """
         if self.status == 'pending_approval':
             self.status = 'awaiting_bank_info'
             self.reviewed_by = reviewer_user
             self.approved_at = timezone.now()
             self.rejection_reason = ''
-            self.save(update_fields=['status', 'reviewed_by', 'approved_at', 'rejection_reason', 'updated_at'])
+            if commit:
+                self.save(update_fields=['status', 'reviewed_by', 'approved_at', 'rejection_reason', 'updated_at'])
             return True
         return False
 
@@ -326,30 +475,36 @@ class AssistanceCase(models.Model):
             return True
         return False
 
-    def reject(self, reviewer_user, reason):
+    def reject(self, reviewer_user, reason, commit=True):
         """
         Reject case by Admin.
         Requires rejection reason.
+
+        With commit=False the fields are only changed in memory (bulk actions).
         """
         if self.status in ['pending_approval', 'pending_validation'] and reason:
             self.status = 'rejected'
             self.reviewed_by = reviewer_user
             self.rejection_reason = reason
             self.approved_at = None
-            self.save(update_fields=['status', 'reviewed_by', 'rejection_reason', 'approved_at', 'updated_at'])
+            if commit:
+                self.save(update_fields=['status', 'reviewed_by', 'rejection_reason', 'approved_at', 'updated_at'])
             return True
         return False
 
-    def confirm_transfer(self, admin_user):
+    def confirm_transfer(self, admin_user, commit=True):
         """
         STEP 2: Admin confirms they transferred/sent PIX to member.
         Must upload payment proof (bank transfer or PIX receipt).
         Changes status: awaiting_transfer → awaiting_member_proof
+
+        With commit=False the fields are only changed in memory (bulk actions).
         """
         if self.status == 'awaiting_transfer':
             self.status = 'awaiting_member_proof'
             self.transfer_confirmed_at = timezone.now()
-            self.save(update_fields=['status', 'transfer_confirmed_at', 'updated_at'])
+            if commit:
+                self.save(update_fields=['status', 'transfer_confirmed_at', 'updated_at'])
             return True
         return False
 
@@ -366,26 +521,24 @@ class AssistanceCase(models.Model):
             return True
         return False
 
-    def complete(self, reviewer_user):
+    def complete(self, reviewer_user, commit=True):
         """
         STEP 4: Admin validates all proofs and completes case.
         Admin reviews transfer proof + member application proof.
         If satisfied, marks case as completed and publishes to feed.
         Changes status: pending_validation → completed
+
+        With commit=False the fields are only changed in memory (bulk actions).
         """
         if self.status == 'pending_validation':
             self.status = 'completed'
             self.reviewed_by = reviewer_user
             self.completed_at = timezone.now()
-            self.save(update_fields=['status', 'reviewed_by', 'completed_at', 'updated_at'])
+            if commit:
+                self.save(update_fields=['status', 'reviewed_by', 'completed_at', 'updated_at'])
             return True
         return False
 
-    @property
-    def attachment_count(self):
-        """Get number of attachments"""
-        return self.attachments.count()
-
     @property
     def can_be_edited(self):
         """Check if case can be edited (only drafts and rejected)"""
@@ -402,9 +555,9 @@ class AssistanceCase(models.Model):
         if self.status == 'completed':
             return False
 
-        # Check critical attachments
-        has_payment_proof = self.attachments.filter(attachment_type='payment_proof').exists()
-        has_photo_evidence = self.attachments.filter(attachment_type='photo_evidence').exists()
+        # Check critical attachments (denormalized counters)
+        has_payment_proof = self.payment_proof_count > 0
+        has_photo_evidence = self.photo_evidence_count > 0
 
         changed = False
 
@@ -442,7 +595,50 @@ class AssistanceCase(models.Model):
         return False
 
 
-class Attachment(models.Model):
+class AttachmentBlob(models.Model):
+    """
+    Attachment content stored once per SHA-256 (see assistance.blobs).
+
+    Attachments with identical content share one blob; `ref_count` is the
+    number of attachments using it and the stored file is deleted when it
+    drops to zero.
+    """
+
+    sha256 = models.CharField(
+        max_length=64,
+        primary_key=True,
+        verbose_name='SHA-256'
+    )
+
+    file = models.FileField(
+        max_length=255,
+        verbose_name='Arquivo'
+    )
+
+    size = models.PositiveBigIntegerField(
+        verbose_name='Tamanho',
+        help_text='Tamanho em bytes'
+    )
+
+    ref_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Referências'
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Criado em'
+    )
+
+    class Meta:
+        verbose_name = 'Conteúdo de Anexo'
+        verbose_name_plural = 'Conteúdos de Anexos'
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.ref_count} refs)"
+
+
+class Attachment(TrackedFieldsMixin, models.Model):
     """
     File attachment for assistance cases.
 
@@ -459,6 +655,8 @@ class Attachment(models.Model):
 
     ALLOWED_EXTENSIONS = ['.pdf', '.jpg', '.jpeg', '.png', '.doc', '.docx']
     MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
+    # Photos from the field are larger; they go through resumable uploads
+    MAX_PHOTO_EVIDENCE_SIZE = 25 * 1024 * 1024  # 25MB
 
     case = models.ForeignKey(
         AssistanceCase,
@@ -477,10 +675,33 @@ class Attachment(models.Model):
 
     file = models.FileField(
         upload_to='assistance_attachments/%Y/%m/',
+        max_length=255,
         verbose_name='Arquivo',
         help_text='PDF, imagem ou documento (máx. 5MB)'
     )
 
+    # Shared content (the file above is the blob's file); null for
+    # attachments stored before deduplication
+    blob = models.ForeignKey(
+        AttachmentBlob,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='attachments',
+        verbose_name='Conteúdo'
+    )
+
+    # Object name issued for a direct upload (presign/), unique: confirming
+    # again finds the attachment by it, also when the object was
+    # deduplicated away and `file` points at an existing blob
+    upload_name = models.CharField(
+        max_length=255,
+        blank=True,
+        default='',
+        editable=False,
+        verbose_name='Objeto Enviado'
+    )
+
     file_name = models.CharField(
         max_length=255,
         verbose_name='Nome do Arquivo',
@@ -511,10 +732,31 @@ class Attachment(models.Model):
         verbose_name='Enviado por'
     )
 
+    # Resized copies for previews, filled in the background
+    # (see assistance.renditions)
+    renditions = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Versões Reduzidas'
+    )
+
     class Meta:
         ordering = ['uploaded_at']
         verbose_name = 'Anexo'
         verbose_name_plural = 'Anexos'
+        indexes = [
+            # Listing a case's attachments (?case=) in default order
+            models.Index(fields=['case', 'uploaded_at']),
+        ]
+        constraints = [
+            # One attachment per direct upload, also for concurrent confirms
+            models.UniqueConstraint(
+                fields=['upload_name'],
+                condition=~models.Q(upload_name=''),
+                name='attachment_unique_upload_name'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.file_name} ({self.case.title})"
@@ -536,12 +778,44 @@ class Attachment(models.Model):
             if hasattr(self.file, 'size'):
                 self.file_size = self.file.size
 
+        # Case counters and timeline events are written by post_save, in
+        # the caller's transaction: the upload views and admin actions run
+        # in batch_events() blocks (assistance.timeline)
+        replaced_blob_id = self._store_in_blob()
         super().save(*args, **kwargs)
+        if replaced_blob_id and replaced_blob_id != self.blob_id:
+            from .blobs import release_blob
+            release_blob(replaced_blob_id)
+
+    def _store_in_blob(self):
+        """
+        Store a newly assigned file by content hash (see assistance.blobs).
+
+        Returns:
+            The blob id this attachment pointed at before, if any
+        """
+        if not self.file or self.file._committed:
+            return None
+
+        from .blobs import store_file
+
+        previous_blob_id = self.blob_id
+        self.blob = store_file(self.file.file, self.file.name)
+        self.file.name = self.blob.file.name
+        self.file._committed = True
+        return previous_blob_id
+
+    @classmethod
+    def max_file_size(cls, attachment_type):
+        """Size limit (bytes) for an attachment type"""
+        if attachment_type == 'photo_evidence':
+            return cls.MAX_PHOTO_EVIDENCE_SIZE
+        return cls.MAX_FILE_SIZE
 
     @property
     def file_size_mb(self):
         """Get file size in megabytes"""
-        return round(self.file_size / (1024 * 1024), 2)
+        return round((self.file_size or 0) / (1024 * 1024), 2)
 
     @property
     def is_image(self):
@@ -566,6 +840,107 @@ class Attachment(models.Model):
             return 'mdi-file-document'
 
 
+class AttachmentUpload(models.Model):
+    """
+    Resumable upload session for an Attachment.
+
+    The client declares the file, sends it in chunks (each stored as a
+    separate object, see assistance.uploads) and commits; the commit
+    stores the chunks as the final Attachment's blob. `offset` is the number of
+    bytes received so far, so an interrupted client resumes from there.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+
+    case = models.ForeignKey(
+        AssistanceCase,
+        on_delete=models.CASCADE,
+        related_name='uploads',
+        verbose_name='Caso'
+    )
+
+    attachment_type = models.CharField(
+        max_length=20,
+        choices=Attachment.ATTACHMENT_TYPE_CHOICES,
+        default='other',
+        verbose_name='Tipo de Anexo'
+    )
+
+    file_name = models.CharField(
+        max_length=255,
+        verbose_name='Nome do Arquivo'
+    )
+
+    file_size = models.PositiveBigIntegerField(
+        verbose_name='Tamanho',
+        help_text='Tamanho total declarado em bytes'
+    )
+
+    # Optional, declared by the client: known content skips the transfer
+    # and received content is checked against it (see assistance.uploads)
+    sha256 = models.CharField(
+        max_length=64,
+        blank=True,
+        verbose_name='SHA-256'
+    )
+
+    offset = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Bytes Recebidos'
+    )
+
+    parts = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name='Partes',
+        help_text='Nomes dos chunks armazenados, em ordem'
+    )
+
+    attachment = models.OneToOneField(
+        Attachment,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='upload',
+        verbose_name='Anexo'
+    )
+
+    uploaded_by = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='attachment_uploads',
+        verbose_name='Enviado por'
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Criado em',
+        db_index=True
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Atualizado em'
+    )
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Envio de Anexo'
+        verbose_name_plural = 'Envios de Anexos'
+
+    def __str__(self):
+        return f"{self.file_name} ({self.offset}/{self.file_size})"
+
+    @property
+    def is_complete(self):
+        """All declared bytes received"""
+        return self.offset >= self.file_size
+
+    @property
+    def is_committed(self):
+        return self.attachment_id is not None
+
+
 class CaseTimeline(models.Model):
     """
     Timeline tracking all events and state changes for an AssistanceCase.
@@ -627,6 +1002,7 @@ class CaseTimeline(models.Model):
         help_text='Dados adicionais do evento (JSON)'
     )
 
+    # Stamped on INSERT, also for events written in batches (assistance.timeline)
     created_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Criado em',
@@ -645,6 +1021,109 @@ class CaseTimeline(models.Model):
     def __str__(self):
         return f"{self.get_event_type_display()} - {self.case.title} ({self.created_at.strftime('%d/%m/%Y %H:%M')})"
 
+    @classmethod
+    def build_status_change(cls, case, old_status, new_status):
+        """
+        Build (without saving) the timeline event for a status transition.
+
+        Used by the post_save signal and by bulk workflow actions, which
+        write the events with bulk_create.
+
+        Returns:
+            Unsaved CaseTimeline instance
+        """
+        # Map status transitions to timeline events
+        status_event_map = {
+            ('draft', 'pending_approval'): {
+                'event_type': 'submitted_for_approval',
+                'description': 'Caso enviado para aprovação do admin',
+                'user': case.created_by
+            },
+            ('pending_approval', 'awaiting_bank_info'): {
+                'event_type': 'approved',
+                'description': f'Caso aprovado por {case.reviewed_by.get_full_name() if case.reviewed_by else "Admin"}',
+                'user': case.reviewed_by
+            },
+            ('pending_approval', 'rejected'): {
+                'event_type': 'rejected',
+                'description': f'Caso rejeitado: {case.rejection_reason}',
+                'user': case.reviewed_by,
+                'metadata': {'rejection_reason': case.rejection_reason}
+            },
+            ('awaiting_bank_info', 'awaiting_transfer'): {
+                'event_type': 'bank_info_submitted',
+                'description': 'Dados bancários do beneficiário informados',
+                'user': case.created_by,
+                'metadata': {
+                    'beneficiary_name': case.beneficiary_name,
+                    'beneficiary_bank': case.beneficiary_bank,
+                    'beneficiary_pix_key': case.beneficiary_pix_key
+                }
+            },
+            ('awaiting_transfer', 'awaiting_member_proof'): {
+                'event_type': 'transfer_confirmed',
+                'description': 'Admin confirmou transferência para o membro',
+                'user': case.reviewed_by
+            },
+            ('awaiting_member_proof', 'pending_validation'): {
+                'event_type': 'member_proof_submitted',
+                'description': 'Membro enviou comprovantes da aplicação ao beneficiário',
+                'user': case.created_by
+            },
+            ('pending_validation', 'completed'): {
+                'event_type': 'completed',
+                'description': f'Caso concluído e validado por {case.reviewed_by.get_full_name() if case.reviewed_by else "Admin"}',
+                'user': case.reviewed_by
+            },
+            ('pending_validation', 'rejected'): {
+                'event_type': 'rejected',
+                'description': f'Comprovantes rejeitados: {case.rejection_reason}',
+                'user': case.reviewed_by,
+                'metadata': {'rejection_reason': case.rejection_reason}
+            },
+            # ROLLBACK TRANSITIONS (triggered by attachment deletion)
+            ('pending_validation', 'awaiting_transfer'): {
+                'event_type': 'status_rollback',
+                'description': 'Status revertido para "Aguardando Transferência" devido à remoção de anexos críticos',
+                'user': None,  # System action
+                'metadata': {'rollback_reason': 'payment_proof_deleted'}
+            },
+            ('pending_validation', 'awaiting_member_proof'): {
+                'event_type': 'status_rollback',
+                'description': 'Status revertido para "Aguardando Comprovante do Membro" devido à remoção de comprovantes',
+                'user': None,  # System action
+                'metadata': {'rollback_reason': 'photo_evidence_deleted'}
+            },
+            ('awaiting_member_proof', 'awaiting_transfer'): {
+                'event_type': 'status_rollback',
+                'description': 'Status revertido para "Aguardando Transferência" devido à remoção do comprovante de pagamento',
+                'user': None,  # System action
+                'metadata': {'rollback_reason': 'payment_proof_deleted'}
+            },
+        }
+
+        # Get event config for this transition
+        event_config = status_event_map.get((old_status, new_status))
+        if event_config is None:
+            # Generic status change (fallback)
+            return cls(
+                case=case,
+                event_type='status_changed',
+                description=f'Status alterado de "{old_status}" para "{new_status}"',
+                metadata={
+                    'old_status': old_status,
+                    'new_status': new_status
+                }
+            )
+
+        return cls(
+            case=case,
+            event_type=event_config['event_type'],
+            user=event_config.get('user'),
+            description=event_config['description'],
+            metadata=event_config.get('metadata', {})
+        )
+
     @classmethod
     def log_event(cls, case, event_type, user=None, description='', metadata=None):
         """
@@ -657,13 +1136,66 @@ class CaseTimeline(models.Model):
             description: Human-readable description (optional)
             metadata: Additional data as dict (optional)
 
+        Inside a batch_events() block the INSERT is deferred to the end of
+        the block and batched with its other events (assistance.timeline).
+
         Returns:
-            CaseTimeline instance
+            CaseTimeline instance (without pk while still buffered)
         """
-        return cls.objects.create(
+        from .timeline import record_event
+
+        return record_event(cls(
             case=case,
             event_type=event_type,
             user=user,
             description=description,
             metadata=metadata or {}
-        )
+        ))
+
+
+class CaseDossier(models.Model):
+    """
+    Accountability PDF ("dossiê") of a completed case, rendered in the
+    background and served from storage (see assistance.dossiers).
+
+    `cache_key` identifies the version of the case it was rendered from
+    (updated_at and attachment set); while it matches, the stored file is
+    served and the case is not rendered again.
+    """
+
+    case = models.OneToOneField(
+        AssistanceCase,
+        on_delete=models.CASCADE,
+        related_name='dossier',
+        verbose_name='Caso'
+    )
+
+    cache_key = models.CharField(
+        max_length=64,
+        verbose_name='Versão',
+        help_text='Hash de updated_at e dos anexos do caso'
+    )
+
+    file = models.FileField(
+        upload_to='assistance_dossiers/',
+        max_length=255,
+        verbose_name='Arquivo'
+    )
+
+    file_size = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name='Tamanho',
+        help_text='Tamanho em bytes'
+    )
+
+    generated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Gerado em'
+    )
+
+    class Meta:
+        verbose_name = 'Dossiê do Caso'
+        verbose_name_plural = 'Dossiês dos Casos'
+
+    def __str__(self):
+        return f"Dossiê - {self.case_id} ({self.generated_at:%d/%m/%Y %H:%M})"
@@ -0,0 +1,65 @@
+"""
+Pagination for the assistance module.
+
+Case listings default to the global PageNumberPagination. Clients can opt in
+to cursor pagination with `?pagination=cursor`, which avoids the COUNT(*)
+and the OFFSET scan on deep pages of the case archive.
+"""
+
+from rest_framework.pagination import CursorPagination
+
+
+CURSOR_PAGINATION_PARAM = 'pagination'
+CURSOR_PAGINATION_VALUE = 'cursor'
+
+
+class AssistanceCaseCursorPagination(CursorPagination):
+    """
+    Cursor pagination ordered by (created_at, id).
+
+    DRF's cursor holds the position of the first ordering field only, plus
+    an offset among the rows sharing that value: pages seek on created_at
+    (served by the `-created_at` and `status, -created_at` indexes) and `id`
+    is not part of the key. It is appended so cases with the same timestamp
+    keep a deterministic order and the offset always skips the same rows.
+    Ordering chosen through `?ordering=` (OrderingFilter) is respected.
+    """
+
+    ordering = ('-created_at', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+
+        if not any(field.lstrip('-') in ('id', 'pk') for field in ordering):
+            tiebreaker = '-id' if ordering[0].startswith('-') else 'id'
+            ordering = ordering + (tiebreaker,)
+
+        return ordering
+
+
+def wants_cursor_pagination(request):
+    """True when the client opted in to cursor pagination"""
+    params = request.query_params
+    return (
+        params.get(CURSOR_PAGINATION_PARAM) == CURSOR_PAGINATION_VALUE
+        or AssistanceCaseCursorPagination.cursor_query_param in params
+    )
+
+
+class CaseTimelineCursorPagination(CursorPagination):
+    """
+    Cursor pagination for a case timeline, oldest first.
+
+    Pages seek on created_at (the (case, created_at) index on CaseTimeline);
+    `id` only orders events sharing a timestamp, which the cursor skips by
+    offset. The ordering is fixed: the case viewset's OrderingFilter does
+    not apply to events.
+    """
+
+    ordering = ('created_at', 'id')
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def get_ordering(self, request, queryset, view):
+        return self.ordering
@@ -75,3 +75,33 @@ class CanViewInternalDescription(permissions.BasePermission):
 
         # Board, Fiscal Council, and Admin can view internal descriptions
         return request.user.role in ['BOARD', 'FISCAL_COUNCIL', 'SUPER_ADMIN']
+
+
+def can_upload_attachment(user, case, attachment_type):
+    """
+    Whether `user` may add an attachment of `attachment_type` to `case`.
+
+    Shared by direct uploads (AttachmentViewSet) and resumable uploads
+    (AttachmentUploadViewSet), which check again on commit.
+    """
+    # Admin can always upload
+    if user.role == 'SUPER_ADMIN':
+        return True
+
+    # Fiscal Council can upload to pending cases or awaiting transfer (payment_proof)
+    if user.role == 'FISCAL_COUNCIL':
+        if case.status == 'pending_approval':
+            return True
+        if case.status == 'awaiting_transfer' and attachment_type == 'payment_proof':
+            return True
+
+    # Member can upload to their own cases in specific statuses
+    if case.created_by_id == user.pk:
+        # Can edit drafts and rejected cases
+        if case.can_be_edited:
+            return True
+        # Can upload member proof when awaiting it
+        if case.status == 'awaiting_member_proof' and attachment_type == 'photo_evidence':
+            return True
+
+    return False
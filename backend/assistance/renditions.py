@@ -0,0 +1,180 @@
+"""
+Image renditions and PDF previews for attachments.
+
+Phone photos are several MB each; lists and thumbnails use these instead:
+- Images: orientation applied from EXIF, metadata stripped, resized to
+  each RENDITION_SIZES bound and saved as WebP and JPEG
+- PDFs: first page rasterized (pypdfium2, optional) and rendered the same way
+
+Generated by the assistance.generate_attachment_renditions task (on the
+`media` Celery queue) after an attachment is created, and stored as
+Attachment.renditions:
+
+    {'thumb': {'width': 320, 'height': 240, 'webp': <name>, 'jpeg': <name>}, ...}
+"""
+
+import io
+import logging
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+RENDITIONS_DIR = 'assistance_renditions'
+
+# Name -> longest side in pixels
+RENDITION_SIZES = {
+    'thumb': 320,
+    'medium': 1280,
+}
+
+# Format -> (extension, Pillow format, save options)
+RENDITION_FORMATS = {
+    'webp': ('webp', 'WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('jpg', 'JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+# PDF pages are rasterized at this width before resizing
+PDF_RENDER_WIDTH = max(RENDITION_SIZES.values())
+
+
+class RenditionError(Exception):
+    """The source file cannot be rendered"""
+
+
+def _open_image(file):
+    """Decode an image, with orientation from EXIF applied"""
+    try:
+        image = Image.open(file)
+        # JPEG sources are decoded at a reduced scale when much larger
+        image.draft('RGB', (PDF_RENDER_WIDTH, PDF_RENDER_WIDTH))
+        image.load()
+        image = ImageOps.exif_transpose(image)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError) as e:
+        raise RenditionError(f'Invalid image: {e}')
+    return image
+
+
+def _render_pdf_first_page(file):
+    """Rasterize the first page of a PDF"""
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        raise RenditionError('pypdfium2 is not installed, PDF previews are disabled')
+
+    try:
+        pdf = pdfium.PdfDocument(file.read())
+        try:
+            page = pdf[0]
+            width, _ = page.get_size()
+            image = page.render(scale=PDF_RENDER_WIDTH / width).to_pil()
+        finally:
+            pdf.close()
+    except pdfium.PdfiumError as e:
+        raise RenditionError(f'Invalid PDF: {e}')
+    return image
+
+
+def _to_rgb(image):
+    """Flatten transparency on white (JPEG has no alpha channel)"""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def render(source):
+    """
+    Encode every rendition of a decoded image.
+
+    Metadata (EXIF, GPS, comments) is not copied: only pixels are saved.
+
+    Returns:
+        dict: {size_name: {'width', 'height', format: bytes}}
+    """
+    source = _to_rgb(source)
+    renditions = {}
+
+    for size_name, bound in RENDITION_SIZES.items():
+        image = source.copy()
+        image.thumbnail((bound, bound), Image.LANCZOS)
+        entry = {'width': image.width, 'height': image.height}
+
+        for format_name, (_, pil_format, options) in RENDITION_FORMATS.items():
+            buffer = io.BytesIO()
+            image.save(buffer, pil_format, **options)
+            entry[format_name] = buffer.getvalue()
+
+        renditions[size_name] = entry
+
+    return renditions
+
+
+def generate_renditions(attachment):
+    """
+    Render and store the renditions of an image or PDF attachment.
+
+    Returns:
+        dict: Value for Attachment.renditions ({} for other file types)
+
+    Raises:
+        RenditionError: the file could not be decoded
+    """
+    if not (attachment.is_image or attachment.is_pdf):
+        return {}
+
+    try:
+        with attachment.file.open('rb') as file:
+            source = _render_pdf_first_page(file) if attachment.is_pdf else _open_image(file)
+    except FileNotFoundError:
+        raise RenditionError(f'File not found: {attachment.file.name}')
+
+    stored = {}
+    for size_name, entry in render(source).items():
+        stored[size_name] = {'width': entry['width'], 'height': entry['height']}
+        for format_name, (extension, _, _) in RENDITION_FORMATS.items():
+            name = f'{RENDITIONS_DIR}/{attachment.pk}/{size_name}.{extension}'
+            if default_storage.exists(name):
+                default_storage.delete(name)
+            stored[size_name][format_name] = default_storage.save(name, ContentFile(entry[format_name]))
+
+    return stored
+
+
+def delete_renditions(renditions):
+    """Remove stored rendition files"""
+    for entry in renditions.values():
+        for format_name in RENDITION_FORMATS:
+            name = entry.get(format_name)
+            if not name:
+                continue
+            try:
+                default_storage.delete(name)
+            except Exception as e:
+                logger.warning(f"Could not delete rendition {name}: {e}")
+
+
+def rendition_urls(attachment, request=None):
+    """
+    Download links of stored renditions, for serializers and the admin
+    (see assistance.downloads).
+
+    Returns:
+        dict: {size_name: {'width', 'height', 'webp': url, 'jpeg': url}}
+    """
+    from .downloads import attachment_download_url, with_query
+
+    if not attachment.renditions:
+        return {}
+
+    base_url = attachment_download_url(attachment, request)
+    urls = {}
+    for size_name, entry in attachment.renditions.items():
+        urls[size_name] = {'width': entry['width'], 'height': entry['height']}
+        for format_name in RENDITION_FORMATS:
+            urls[size_name][format_name] = with_query(base_url, rendition=size_name, format=format_name)
+    return urls
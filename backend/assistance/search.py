@@ -0,0 +1,281 @@
+"""
+Full-text search for assistance cases.
+
+PostgreSQL keeps two weighted tsvector columns up to date with a trigger:
+- search_vector: title (A) + public_description (B), used by the API
+- internal_search_vector: beneficiary_name (A) + internal_description (B),
+  only searched from the admin
+
+Both are GIN indexed and use the Portuguese text search configuration
+(stemming + stop words). Results are ranked with ts_rank.
+
+SQLite (development) falls back to an FTS5 virtual table maintained by
+triggers, with accent folding, prefix matching and bm25 ranking.
+
+Other backends degrade to icontains scans.
+
+Existing rows are indexed with `python manage.py backfill_case_search`.
+"""
+
+import logging
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import F, FloatField, Q
+from django.db.models.expressions import RawSQL
+
+logger = logging.getLogger(__name__)
+
+SEARCH_CONFIG = 'portuguese'
+
+CASE_TABLE = 'assistance_assistancecase'
+FTS_TABLE = 'assistance_case_fts'
+
+# FTS5 column order matters for the bm25() weights below
+FTS_COLUMNS = ['title', 'public_description', 'beneficiary_name', 'internal_description']
+FTS_PUBLIC_COLUMNS = ['title', 'public_description']
+FTS_WEIGHTS = '10.0, 5.0, 2.0, 1.0'
+
+PUBLIC_VECTOR = (
+    SearchVector('title', weight='A', config=SEARCH_CONFIG)
+    + SearchVector('public_description', weight='B', config=SEARCH_CONFIG)
+)
+INTERNAL_VECTOR = (
+    SearchVector('beneficiary_name', weight='A', config=SEARCH_CONFIG)
+    + SearchVector('internal_description', weight='B', config=SEARCH_CONFIG)
+)
+
+POSTGRES_INSTALL_SQL = [
+    f"""
+    CREATE OR REPLACE FUNCTION {CASE_TABLE}_search_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.public_description, '')), 'B');
+        NEW.internal_search_vector :=
+            setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.beneficiary_name, '')), 'A') ||
+            setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.internal_description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+    """,
+    f"DROP TRIGGER IF EXISTS {CASE_TABLE}_search_trigger ON {CASE_TABLE};",
+    f"""
+    CREATE TRIGGER {CASE_TABLE}_search_trigger
+    BEFORE INSERT OR UPDATE OF title, public_description, beneficiary_name, internal_description
+    ON {CASE_TABLE}
+    FOR EACH ROW EXECUTE PROCEDURE {CASE_TABLE}_search_update();
+    """,
+]
+
+POSTGRES_UNINSTALL_SQL = [
+    f"DROP TRIGGER IF EXISTS {CASE_TABLE}_search_trigger ON {CASE_TABLE};",
+    f"DROP FUNCTION IF EXISTS {CASE_TABLE}_search_update();",
+]
+
+_fts_columns = ', '.join(FTS_COLUMNS)
+_fts_new_values = ', '.join(f'new.{column}' for column in FTS_COLUMNS)
+
+SQLITE_INSTALL_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE}
+    USING fts5({_fts_columns}, tokenize = 'unicode61 remove_diacritics 2');
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON {CASE_TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, {_fts_columns}) VALUES (new.id, {_fts_new_values});
+    END;
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+    AFTER UPDATE OF {_fts_columns} ON {CASE_TABLE} BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+        INSERT INTO {FTS_TABLE}(rowid, {_fts_columns}) VALUES (new.id, {_fts_new_values});
+    END;
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON {CASE_TABLE} BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END;
+    """,
+]
+
+SQLITE_UNINSTALL_SQL = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_insert;",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_update;",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_delete;",
+    f"DROP TABLE IF EXISTS {FTS_TABLE};",
+]
+
+
+def _vendor(using):
+    return connections[using].vendor
+
+
+def _search_tokens(query):
+    return re.findall(r'\w+', query.lower())
+
+
+def _fts_query(tokens, columns):
+    """Quote tokens for FTS5 (prefix match, implicit AND) limited to columns"""
+    terms = ' '.join(f'"{token}"*' for token in tokens)
+    return f"{{{' '.join(columns)}}} : ({terms})"
+
+
+def install_search_backend(connection):
+    """Create the triggers (and FTS5 table on SQLite). Safe to run repeatedly."""
+    if connection.vendor == 'postgresql':
+        statements = POSTGRES_INSTALL_SQL
+    elif connection.vendor == 'sqlite':
+        statements = SQLITE_INSTALL_SQL
+    else:
+        return
+
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def uninstall_search_backend(connection):
+    if connection.vendor == 'postgresql':
+        statements = POSTGRES_UNINSTALL_SQL
+    elif connection.vendor == 'sqlite':
+        statements = SQLITE_UNINSTALL_SQL
+    else:
+        return
+
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
+
+
+def case_search_filter(query, include_internal=False, using=DEFAULT_DB_ALIAS):
+    """
+    Build a Q object matching cases against `query`.
+
+    Args:
+        query: Free text typed by the user
+        include_internal: Also match beneficiary_name and internal_description
+            (admin only: these fields are confidential)
+        using: Database alias, used to pick the search backend
+
+    Returns:
+        Q: Empty Q() when the query has no searchable terms
+    """
+    tokens = _search_tokens(query)
+    if not tokens:
+        return Q()
+
+    vendor = _vendor(using)
+
+    if vendor == 'postgresql':
+        search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type='websearch')
+        condition = Q(search_vector=search_query)
+        if include_internal:
+            condition |= Q(internal_search_vector=search_query)
+        return condition
+
+    if vendor == 'sqlite':
+        columns = FTS_COLUMNS if include_internal else FTS_PUBLIC_COLUMNS
+        return Q(pk__in=RawSQL(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            [_fts_query(tokens, columns)]
+        ))
+
+    fields = ['title', 'public_description']
+    if include_internal:
+        fields += ['beneficiary_name', 'internal_description']
+
+    condition = Q()
+    for token in tokens:
+        token_match = Q()
+        for field in fields:
+            token_match |= Q(**{f'{field}__icontains': token})
+        condition &= token_match
+    return condition
+
+
+def case_search_rank(query, using=DEFAULT_DB_ALIAS):
+    """Relevance expression for public search (higher is better), or None"""
+    tokens = _search_tokens(query)
+    if not tokens:
+        return None
+
+    vendor = _vendor(using)
+
+    if vendor == 'postgresql':
+        search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type='websearch')
+        return SearchRank(F('search_vector'), search_query)
+
+    if vendor == 'sqlite':
+        # bm25() is lower-is-better, negate it so every backend sorts descending
+        return RawSQL(
+            f'SELECT -bm25({FTS_TABLE}, {FTS_WEIGHTS}) FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid = "{CASE_TABLE}"."id"',
+            [_fts_query(tokens, FTS_PUBLIC_COLUMNS)],
+            output_field=FloatField()
+        )
+
+    return None
+
+
+def search_cases(queryset, query):
+    """
+    Filter cases by public full-text search and annotate `search_rank`.
+
+    Returns the queryset unchanged when the query has no searchable terms.
+    """
+    condition = case_search_filter(query, using=queryset.db)
+    if not condition:
+        return queryset
+
+    queryset = queryset.filter(condition)
+    rank = case_search_rank(query, using=queryset.db)
+    if rank is not None:
+        queryset = queryset.annotate(search_rank=rank)
+    return queryset
+
+
+def backfill_search_index(batch_size=1000, using=DEFAULT_DB_ALIAS):
+    """
+    Index cases created before the search backend was installed.
+
+    Works in batches of `batch_size` so it can be interrupted and resumed.
+
+    Yields:
+        int: Number of cases indexed in each batch
+    """
+    from .models import AssistanceCase
+
+    connection = connections[using]
+    cases = AssistanceCase.objects.using(using)
+
+    if connection.vendor == 'postgresql':
+        while True:
+            batch = list(
+                cases.filter(search_vector__isnull=True)
+                .order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not batch:
+                return
+            yield cases.filter(pk__in=batch).update(
+                search_vector=PUBLIC_VECTOR,
+                internal_search_vector=INTERNAL_VECTOR
+            )
+
+    elif connection.vendor == 'sqlite':
+        while True:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'INSERT INTO {FTS_TABLE}(rowid, {_fts_columns}) '
+                    f'SELECT id, {_fts_columns} FROM {CASE_TABLE} '
+                    f'WHERE id NOT IN (SELECT rowid FROM {FTS_TABLE}) '
+                    f'ORDER BY id LIMIT %s',
+                    [batch_size]
+                )
+                indexed = cursor.rowcount
+            if not indexed:
+                return
+            yield indexed
@@ -5,9 +5,13 @@ Handles serialization/deserialization of assistance cases and attachments
 for the REST API, including role-based field visibility.
 """
 
+import os
+import re
+
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from .models import AssistanceCase, Attachment, CaseTimeline
+from .models import AssistanceCase, Attachment, AttachmentUpload, CaseTimeline
+from .timeline import batch_events
 
 User = get_user_model()
 
@@ -29,6 +33,8 @@ class AttachmentSerializer(serializers.ModelSerializer):
     """Serializer for case attachments"""
     uploaded_by = UserBasicSerializer(read_only=True)
     file_url = serializers.SerializerMethodField()
+    renditions = serializers.SerializerMethodField()
+    sha256 = serializers.CharField(source='blob_id', read_only=True)
     file_size_mb = serializers.ReadOnlyField()
     is_image = serializers.ReadOnlyField()
     is_pdf = serializers.ReadOnlyField()
@@ -42,10 +48,12 @@ class AttachmentSerializer(serializers.ModelSerializer):
             'attachment_type',
             'file',
             'file_url',
+            'renditions',
             'file_name',
             'file_type',
             'file_size',
             'file_size_mb',
+            'sha256',
             'is_image',
             'is_pdf',
             'file_icon',
@@ -53,14 +61,21 @@ class AttachmentSerializer(serializers.ModelSerializer):
             'uploaded_by'
         ]
         read_only_fields = ['id', 'file_name', 'file_type', 'file_size', 'uploaded_at', 'uploaded_by']
+        extra_kwargs = {'file': {'write_only': True}}
+
+    def get_renditions(self, obj):
+        """
+        Preview URLs by size ({'thumb': {width, height, webp, jpeg}, ...}).
+        Empty until the background rendering finishes, and for non-image files.
+        """
+        from .renditions import rendition_urls
+        return rendition_urls(obj, self.context.get('request'))
 
     def get_file_url(self, obj):
-        """Get absolute URL for file"""
-        request = self.context.get('request')
-        if obj.file and hasattr(obj.file, 'url'):
-            if request:
-                return request.build_absolute_uri(obj.file.url)
-            return obj.file.url
+        """Protected download link, signed for the request user (see assistance.downloads)"""
+        from .downloads import attachment_download_url
+        if obj.file:
+            return attachment_download_url(obj, self.context.get('request'))
         return None
 
     def create(self, validated_data):
@@ -71,6 +86,83 @@ class AttachmentSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+def clean_attachment_file_name(value):
+    """Keep only the base name of an uploaded file and check its extension"""
+    value = os.path.basename(value.strip())
+    _, ext = os.path.splitext(value)
+    if ext.lower() not in Attachment.ALLOWED_EXTENSIONS:
+        raise serializers.ValidationError(
+            f"Tipo de arquivo não permitido. Use: {', '.join(Attachment.ALLOWED_EXTENSIONS)}"
+        )
+    return value
+
+
+class AttachmentPresignSerializer(serializers.Serializer):
+    """Request for a direct-to-bucket upload policy (see assistance.direct_uploads)"""
+    case = serializers.PrimaryKeyRelatedField(queryset=AssistanceCase.objects.all())
+    attachment_type = serializers.ChoiceField(choices=Attachment.ATTACHMENT_TYPE_CHOICES, default='other')
+    file_name = serializers.CharField(max_length=200)
+
+    def validate_file_name(self, value):
+        return clean_attachment_file_name(value)
+
+
+class DirectUploadConfirmSerializer(serializers.Serializer):
+    """Confirmation of a direct-to-bucket upload"""
+    token = serializers.CharField()
+
+
+class AttachmentUploadSerializer(serializers.ModelSerializer):
+    """
+    Resumable upload session (see assistance.uploads).
+
+    The client declares the file on creation; `offset` tells how many bytes
+    were received so far.
+    """
+    attachment = AttachmentSerializer(read_only=True)
+    max_chunk_size = serializers.SerializerMethodField()
+
+    class Meta:
+        model = AttachmentUpload
+        fields = [
+            'id',
+            'case',
+            'attachment_type',
+            'file_name',
+            'file_size',
+            'sha256',
+            'offset',
+            'max_chunk_size',
+            'attachment',
+            'created_at'
+        ]
+        read_only_fields = ['id', 'offset', 'attachment', 'created_at']
+
+    def get_max_chunk_size(self, obj):
+        from .uploads import max_chunk_size
+        return max_chunk_size()
+
+    def validate_file_name(self, value):
+        return clean_attachment_file_name(value)
+
+    def validate_sha256(self, value):
+        value = value.lower()
+        if value and not re.fullmatch(r'[0-9a-f]{64}', value):
+            raise serializers.ValidationError('Informe o SHA-256 em hexadecimal (64 caracteres).')
+        return value
+
+    def validate(self, attrs):
+        attachment_type = attrs.get('attachment_type', 'other')
+        max_size = Attachment.max_file_size(attachment_type)
+        if attrs['file_size'] <= 0:
+            raise serializers.ValidationError({'file_size': 'O arquivo está vazio.'})
+        if attrs['file_size'] > max_size:
+            raise serializers.ValidationError({
+                'file_size': f'Arquivo muito grande. Máximo: {max_size // (1024 * 1024)}MB.'
+            })
+        return attrs
+
+
 class AssistanceCaseListSerializer(serializers.ModelSerializer):
     """
     Lightweight serializer for case lists.
@@ -149,6 +241,8 @@ class AssistanceCaseDetailSerializer(serializers.ModelSerializer):
             'attachments',
             'timeline_events',
             'attachment_count',
+            'payment_proof_count',
+            'photo_evidence_count',
             'can_be_edited',
             'is_draft',
             'is_pending',
@@ -169,11 +263,31 @@ class AssistanceCaseDetailSerializer(serializers.ModelSerializer):
         ]
 
     def get_timeline_events(self, obj):
-        """Get timeline events for this case"""
-        # Import here to avoid circular import
-        events = obj.timeline_events.all()
+        """
+        Get timeline events for this case.
+
+        `?timeline_limit=N` embeds only the latest N events (0 omits them);
+        the full history is available from /cases/{id}/timeline/.
+        """
+        events = obj.timeline_events.select_related('user')
+
+        limit = self._get_timeline_limit()
+        if limit is not None:
+            # Latest N, still returned oldest first
+            events = list(events.order_by('-created_at', '-id')[:limit])[::-1]
+
         return CaseTimelineSerializer(events, many=True, context=self.context).data
 
+    def _get_timeline_limit(self):
+        request = self.context.get('request')
+        if request is None:
+            return None
+        try:
+            limit = int(request.query_params['timeline_limit'])
+        except (KeyError, ValueError):
+            return None
+        return max(limit, 0)
+
     def to_representation(self, instance):
         """
         Hide internal_description from regular members.
@@ -352,8 +466,7 @@ class ConfirmTransferSerializer(serializers.Serializer):
             )
 
         # Check if payment proof was uploaded
-        payment_proofs = case.attachments.filter(attachment_type='payment_proof')
-        if not payment_proofs.exists():
+        if case.payment_proof_count == 0:
             raise serializers.ValidationError(
                 "É necessário enviar o comprovante de transferência (PIX ou transferência bancária) "
                 "antes de confirmar a transferência."
@@ -448,10 +561,12 @@ class DirectDonationSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("A descrição pública deve ter pelo menos 30 caracteres.")
         return value
 
+    @batch_events()
     def create(self, validated_data):
         """
         Create direct donation case.
         Sets status to 'completed' immediately and logs it.
+        Both timeline events are written with one INSERT, in the same transaction.
         """
         request = self.context.get('request')
         linked_member_ids = validated_data.pop('linked_member_ids', [])
@@ -480,7 +595,7 @@ class DirectDonationSerializer(serializers.ModelSerializer):
             member_names = ", ".join([m.get_full_name() for m in members])
             member_info = f" vinculado aos membros: {member_names}"
 
-        CaseTimeline.objects.create(
+        CaseTimeline.log_event(
             case=case,
             user=request.user,
             event_type='case_created',
@@ -541,8 +656,8 @@ class CompleteCaseSerializer(serializers.Serializer):
             )
 
         # Ensure case has required attachments
-        transfer_proofs = case.attachments.filter(attachment_type='payment_proof').count()
-        member_proofs = case.attachments.filter(attachment_type='photo_evidence').count()
+        transfer_proofs = case.payment_proof_count
+        member_proofs = case.photo_evidence_count
 
         if transfer_proofs == 0:
             raise serializers.ValidationError(
@@ -731,3 +846,95 @@ class CaseTimelineSerializer(serializers.ModelSerializer):
             'comment_added': 'grey',
         }
         return color_map.get(obj.event_type, 'grey')
+
+
+class CaseTransitionSerializer(serializers.ModelSerializer):
+    """
+    Minimal response for workflow actions (`Prefer: return=minimal`).
+
+    Returns the new status, the workflow timestamps changed by the action
+    and the timeline event it produced, instead of the full case detail.
+
+    Context:
+        before: {'status': ..., <timestamp field>: ...} captured before the action
+        timeline_event: Optional event already in memory (skips the lookup)
+    """
+    TIMESTAMP_FIELDS = [
+        'approved_at',
+        'bank_info_submitted_at',
+        'transfer_confirmed_at',
+        'member_proof_submitted_at',
+        'completed_at',
+    ]
+
+    status_display = serializers.CharField(source='get_status_display', read_only=True)
+    changed = serializers.SerializerMethodField()
+    timeline_event = serializers.SerializerMethodField()
+
+    class Meta:
+        model = AssistanceCase
+        fields = ['id', 'status', 'status_display', 'updated_at', 'changed', 'timeline_event']
+        read_only_fields = fields
+
+    @classmethod
+    def snapshot(cls, case):
+        """Capture the fields compared after the action"""
+        return {field: getattr(case, field) for field in ['status', *cls.TIMESTAMP_FIELDS]}
+
+    def get_changed(self, obj):
+        before = self.context.get('before', {})
+        changed = {}
+        for field in self.TIMESTAMP_FIELDS:
+            value = getattr(obj, field)
+            if field in before and before[field] != value:
+                changed[field] = serializers.DateTimeField().to_representation(value) if value else None
+        return changed
+
+    def get_timeline_event(self, obj):
+        before = self.context.get('before', {})
+        if before.get('status') == obj.status:
+            return None
+        if 'timeline_event' in self.context:
+            event = self.context['timeline_event']
+        else:
+            event = obj.timeline_events.select_related('user').order_by('-created_at', '-id').first()
+        if event is None:
+            return None
+        return CaseTimelineSerializer(event, context=self.context).data
+
+
+class BulkCaseActionSerializer(serializers.Serializer):
+    """
+    Input for bulk workflow actions (Fiscal Council review sessions).
+
+    Each case is still validated by the single-case action serializer;
+    this only checks the request shape.
+    """
+    ACTION_CHOICES = ['approve', 'reject', 'confirm_transfer', 'complete']
+    MAX_CASES = 100
+
+    action = serializers.ChoiceField(choices=ACTION_CHOICES)
+    case_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=MAX_CASES,
+        help_text=f'IDs dos casos (máximo {MAX_CASES})'
+    )
+    rejection_reason = serializers.CharField(
+        required=False,
+        allow_blank=False,
+        min_length=20,
+        max_length=1000,
+        help_text='Obrigatório para a ação reject (mínimo 20 caracteres)'
+    )
+
+    def validate_case_ids(self, value):
+        """Drop duplicates, keeping the request order"""
+        return list(dict.fromkeys(value))
+
+    def validate(self, attrs):
+        if attrs['action'] == 'reject' and not attrs.get('rejection_reason'):
+            raise serializers.ValidationError({
+                'rejection_reason': 'O motivo da rejeição é obrigatório para rejeitar casos.'
+            })
+        return attrs
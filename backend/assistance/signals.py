@@ -5,9 +5,11 @@ Every significant action on AssistanceCase creates a timeline event automaticall
 This ensures complete audit trail without manual logging in views.
 """
 
+from django.db import transaction
 from django.db.models.signals import post_save, pre_save, post_delete
 from django.dispatch import receiver
-from .models import AssistanceCase, Attachment, CaseTimeline
+from .models import AssistanceCase, Attachment, CaseDossier, CaseTimeline
+from .timeline import record_event, discard_pending_events
 
 
 def _cleanup_timeline_after_rollback(case, old_status, new_status):
@@ -47,12 +49,21 @@ def _cleanup_timeline_after_rollback(case, old_status, new_status):
             'rejected'
         ]
         # Also remove photo_evidence attachments specifically
+        discard_pending_events(lambda event: (
+            event.case_id == case.pk
+            and event.event_type == 'attachment_uploaded'
+            and event.metadata.get('attachment_type') == 'photo_evidence'
+        ))
         case.timeline_events.filter(
             event_type='attachment_uploaded',
             metadata__attachment_type='photo_evidence'
         ).delete()
 
-    # Delete events that are no longer valid
+    # Delete events that are no longer valid (including the ones logged in
+    # this transaction and not yet written)
+    discard_pending_events(
+        lambda event: event.case_id == case.pk and event.event_type in events_to_remove
+    )
     case.timeline_events.filter(event_type__in=events_to_remove).delete()
 
 
@@ -76,23 +87,33 @@ def log_case_creation(sender, instance, created, **kwargs):
 def track_status_changes(sender, instance, **kwargs):
     """
     Track all status changes and create appropriate timeline events.
-    Uses pre_save to compare old vs new status.
+    Uses pre_save to compare the loaded status with the new one.
+
+    The loaded status comes from the instance itself (TrackedFieldsMixin),
+    so no query is needed. Instances built by hand with a pk fall back to
+    reading the stored status.
     """
     if instance.pk:  # Only for existing instances
-        try:
-            old_instance = AssistanceCase.objects.get(pk=instance.pk)
-            old_status = old_instance.status
-            new_status = instance.status
-
-            # Status changed - log it after save
-            if old_status != new_status:
-                # Store the change for post_save signal
-                instance._status_changed = {
-                    'old_status': old_status,
-                    'new_status': new_status
-                }
-        except AssistanceCase.DoesNotExist:
-            pass
+        if instance.is_tracked('status'):
+            old_status = instance.get_loaded_value('status')
+        else:
+            old_status = AssistanceCase.objects.filter(
+                pk=instance.pk
+            ).values_list('status', flat=True).first()
+            if old_status is None:
+                return
+            # Keep it as the loaded value for the other post_save receivers
+            instance._loaded_values = {**getattr(instance, '_loaded_values', {}), 'status': old_status}
+
+        new_status = instance.status
+
+        # Status changed - log it after save
+        if old_status != new_status:
+            # Store the change for post_save signal
+            instance._status_changed = {
+                'old_status': old_status,
+                'new_status': new_status
+            }
 
 
 @receiver(post_save, sender=AssistanceCase)
@@ -110,103 +131,41 @@ def log_status_change_events(sender, instance, created, **kwargs):
         old_status = change_data['old_status']
         new_status = change_data['new_status']
 
-        # Map status transitions to timeline events
-        status_event_map = {
-            ('draft', 'pending_approval'): {
-                'event_type': 'submitted_for_approval',
-                'description': 'Caso enviado para aprovação do admin',
-                'user': instance.created_by
-            },
-            ('pending_approval', 'awaiting_bank_info'): {
-                'event_type': 'approved',
-                'description': f'Caso aprovado por {instance.reviewed_by.get_full_name() if instance.reviewed_by else "Admin"}',
-                'user': instance.reviewed_by
-            },
-            ('pending_approval', 'rejected'): {
-                'event_type': 'rejected',
-                'description': f'Caso rejeitado: {instance.rejection_reason}',
-                'user': instance.reviewed_by,
-                'metadata': {'rejection_reason': instance.rejection_reason}
-            },
-            ('awaiting_bank_info', 'awaiting_transfer'): {
-                'event_type': 'bank_info_submitted',
-                'description': 'Dados bancários do beneficiário informados',
-                'user': instance.created_by,
-                'metadata': {
-                    'beneficiary_name': instance.beneficiary_name,
-                    'beneficiary_bank': instance.beneficiary_bank,
-                    'beneficiary_pix_key': instance.beneficiary_pix_key
-                }
-            },
-            ('awaiting_transfer', 'awaiting_member_proof'): {
-                'event_type': 'transfer_confirmed',
-                'description': 'Admin confirmou transferência para o membro',
-                'user': instance.reviewed_by
-            },
-            ('awaiting_member_proof', 'pending_validation'): {
-                'event_type': 'member_proof_submitted',
-                'description': 'Membro enviou comprovantes da aplicação ao beneficiário',
-                'user': instance.created_by
-            },
-            ('pending_validation', 'completed'): {
-                'event_type': 'completed',
-                'description': f'Caso concluído e validado por {instance.reviewed_by.get_full_name() if instance.reviewed_by else "Admin"}',
-                'user': instance.reviewed_by
-            },
-            ('pending_validation', 'rejected'): {
-                'event_type': 'rejected',
-                'description': f'Comprovantes rejeitados: {instance.rejection_reason}',
-                'user': instance.reviewed_by,
-                'metadata': {'rejection_reason': instance.rejection_reason}
-            },
-            # ROLLBACK TRANSITIONS (triggered by attachment deletion)
-            ('pending_validation', 'awaiting_transfer'): {
-                'event_type': 'status_rollback',
-                'description': 'Status revertido para "Aguardando Transferência" devido à remoção de anexos críticos',
-                'user': None,  # System action
-                'metadata': {'rollback_reason': 'payment_proof_deleted'}
-            },
-            ('pending_validation', 'awaiting_member_proof'): {
-                'event_type': 'status_rollback',
-                'description': 'Status revertido para "Aguardando Comprovante do Membro" devido à remoção de comprovantes',
-                'user': None,  # System action
-                'metadata': {'rollback_reason': 'photo_evidence_deleted'}
-            },
-            ('awaiting_member_proof', 'awaiting_transfer'): {
-                'event_type': 'status_rollback',
-                'description': 'Status revertido para "Aguardando Transferência" devido à remoção do comprovante de pagamento',
-                'user': None,  # System action
-                'metadata': {'rollback_reason': 'payment_proof_deleted'}
-            },
-        }
-
-        # Get event config for this transition
-        transition_key = (old_status, new_status)
-        if transition_key in status_event_map:
-            event_config = status_event_map[transition_key]
-            CaseTimeline.log_event(
-                case=instance,
-                event_type=event_config['event_type'],
-                user=event_config.get('user'),
-                description=event_config['description'],
-                metadata=event_config.get('metadata', {})
-            )
-        else:
-            # Generic status change (fallback)
-            CaseTimeline.log_event(
-                case=instance,
-                event_type='status_changed',
-                description=f'Status alterado de "{old_status}" para "{new_status}"',
-                metadata={
-                    'old_status': old_status,
-                    'new_status': new_status
-                }
-            )
+        record_event(CaseTimeline.build_status_change(instance, old_status, new_status))
 
         # Clean up temporary attribute
         delattr(instance, '_status_changed')
 
 
+def _adjust_counters(attachment, case_id, attachment_type, delta):
+    """Update case counters, syncing the attachment's cached case if any"""
+    case = None
+    if Attachment._meta.get_field('case').is_cached(attachment):
+        case = attachment.case if attachment.case.pk == case_id else None
+    AssistanceCase.adjust_attachment_counters(case_id, attachment_type, delta, case=case)
+
+
+@receiver(post_save, sender=Attachment)
+def update_counters_on_attachment_save(sender, instance, created, **kwargs):
+    """
+    Keep AssistanceCase attachment counters in sync.
+
+    Runs in the caller's transaction (batch_events() in the upload views).
+    """
+    if created:
+        _adjust_counters(instance, instance.case_id, instance.attachment_type, 1)
+        return
+
+    if not (instance.is_tracked('case') and instance.is_tracked('attachment_type')):
+        return
+
+    old_case_id = instance.get_loaded_value('case')
+    old_type = instance.get_loaded_value('attachment_type')
+    if (old_case_id, old_type) != (instance.case_id, instance.attachment_type):
+        _adjust_counters(instance, old_case_id, old_type, -1)
+        _adjust_counters(instance, instance.case_id, instance.attachment_type, 1)
+
+
 @receiver(post_save, sender=Attachment)
 def log_attachment_upload(sender, instance, created, **kwargs):
     """
@@ -230,6 +189,51 @@ def log_attachment_upload(sender, instance, created, **kwargs):
         )
 
 
+@receiver(post_save, sender=Attachment)
+def queue_attachment_renditions(sender, instance, created, **kwargs):
+    """
+    Generate previews for new image/PDF attachments in the background.
+    Queued after commit so the worker sees the row and the stored file.
+    """
+    if created and (instance.is_image or instance.is_pdf):
+        from .tasks import generate_attachment_renditions
+
+        attachment_id = instance.pk
+        transaction.on_commit(
+            lambda: generate_attachment_renditions.delay(attachment_id),
+            robust=True
+        )
+
+
+@receiver(post_delete, sender=Attachment)
+def delete_attachment_renditions(sender, instance, **kwargs):
+    """Remove the preview files once the deletion is committed"""
+    if instance.renditions:
+        from .renditions import delete_renditions
+
+        renditions = instance.renditions
+        transaction.on_commit(lambda: delete_renditions(renditions), robust=True)
+
+
+@receiver(post_delete, sender=Attachment)
+def release_attachment_blob(sender, instance, **kwargs):
+    """Drop the content reference; the file goes with the last one"""
+    if instance.blob_id:
+        from .blobs import release_blob
+        release_blob(instance.blob_id)
+
+
+@receiver(post_delete, sender=Attachment)
+def update_counters_on_attachment_delete(sender, instance, **kwargs):
+    """
+    Decrement case counters (runs inside the deletion transaction).
+
+    Registered before revalidate_case_on_attachment_delete, which relies on
+    the updated counters.
+    """
+    _adjust_counters(instance, instance.case_id, instance.attachment_type, -1)
+
+
 @receiver(post_delete, sender=Attachment)
 def revalidate_case_on_attachment_delete(sender, instance, **kwargs):
     """
@@ -261,3 +265,28 @@ def revalidate_case_on_attachment_delete(sender, instance, **kwargs):
         # Remove events that are no longer valid after rollback
         _cleanup_timeline_after_rollback(case, old_status, case.status)
     # NO logging of deletion events - history should only show current state
+
+
+def reinstall_search_backend(sender, using, **kwargs):
+    """
+    Recreate the full-text search triggers after migrations.
+
+    SQLite rebuilds a table (dropping its triggers) on most schema changes,
+    so the FTS5 triggers are reinstalled whenever migrations run.
+    """
+    from django.db import connections
+    from .search import install_search_backend
+
+    connection = connections[using]
+    if AssistanceCase._meta.db_table in connection.introspection.table_names():
+        install_search_backend(connection)
+
+
+@receiver(post_delete, sender=CaseDossier)
+def delete_dossier_file(sender, instance, **kwargs):
+    """Remove the stored PDF once the deletion is committed"""
+    if instance.file:
+        from django.core.files.storage import default_storage
+
+        name = instance.file.name
+        transaction.on_commit(lambda: default_storage.delete(name), robust=True)
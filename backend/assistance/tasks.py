@@ -0,0 +1,115 @@
+"""
+Celery tasks for the assistance module.
+"""
+
+from celery import shared_task
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(name='assistance.cleanup_expired_uploads')
+def cleanup_expired_uploads():
+    """
+    Remove abandoned resumable uploads and their stored chunks.
+    Runs hourly via Celery Beat.
+    """
+    from .uploads import cleanup_expired_uploads as cleanup
+
+    removed = cleanup()
+    if removed:
+        logger.info(f"Removed {removed} expired attachment uploads")
+    return {'removed': removed}
+
+
+@shared_task(
+    name='assistance.generate_attachment_renditions',
+    autoretry_for=(IOError,),
+    retry_backoff=True,
+    max_retries=3
+)
+def generate_attachment_renditions(attachment_id):
+    """
+    Create resized previews for an image or PDF attachment.
+    Queued on commit of a new attachment; runs on the `media` queue.
+    """
+    from .models import Attachment
+    from .renditions import RenditionError, delete_renditions, generate_renditions
+
+    attachment = Attachment.objects.filter(pk=attachment_id).first()
+    if attachment is None:
+        return {'status': 'deleted'}
+
+    try:
+        renditions = generate_renditions(attachment)
+    except RenditionError as e:
+        logger.warning(f"No renditions for attachment {attachment_id}: {e}")
+        return {'status': 'skipped'}
+
+    updated = Attachment.objects.filter(pk=attachment_id).update(renditions=renditions)
+    if not updated:
+        # Attachment deleted while rendering
+        delete_renditions(renditions)
+        return {'status': 'deleted'}
+
+    if attachment.attachment_type == 'photo_evidence':
+        # Published cases link the thumbnail from their feed snapshot
+        from feed.publishing import refresh_case
+        refresh_case(attachment.case_id)
+
+    return {'status': 'ok', 'sizes': list(renditions)}
+
+
+@shared_task(
+    name='assistance.generate_case_dossier',
+    autoretry_for=(IOError,),
+    retry_backoff=True,
+    max_retries=3,
+    soft_time_limit=5 * 60
+)
+def generate_case_dossier(case_id):
+    """
+    Render and store the dossier PDF of a completed case (see
+    assistance.dossiers). Up-to-date dossiers are not rendered again.
+    Runs on the `media` queue.
+    """
+    from .dossiers import generate_dossier
+    from .models import AssistanceCase
+
+    case = AssistanceCase.objects.select_related('created_by', 'reviewed_by').filter(
+        pk=case_id, status='completed'
+    ).first()
+    if case is None:
+        return {'status': 'skipped'}
+
+    dossier, rendered = generate_dossier(case)
+    return {'status': 'rendered' if rendered else 'current', 'size': dossier.file_size}
+
+
+@shared_task(name='assistance.generate_monthly_dossiers')
+def generate_monthly_dossiers(year=None, month=None):
+    """
+    Queue a dossier render for every case completed in a month (default:
+    the previous month), one task per case so the media worker pool renders
+    them in parallel. Cases with an up-to-date dossier are skipped.
+    Runs monthly via Celery Beat.
+    """
+    from datetime import timedelta
+    from django.utils import timezone
+    from .dossiers import cases_completed_in, current_dossier
+
+    if year is None or month is None:
+        first_of_month = timezone.localdate().replace(day=1)
+        previous = first_of_month - timedelta(days=1)
+        year, month = previous.year, previous.month
+
+    queued = current = 0
+    for case in cases_completed_in(year, month).iterator():
+        if current_dossier(case) is not None:
+            current += 1
+            continue
+        generate_case_dossier.delay(case.pk)
+        queued += 1
+
+    logger.info(f"Dossiers {year}-{month:02d}: {queued} queued, {current} up to date")
+    return {'month': f'{year}-{month:02d}', 'queued': queued, 'current': current}
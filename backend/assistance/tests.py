@@ -1,3 +1,1471 @@
-from django.test import TestCase
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from users.models import User
+
+try:
+    from moto import mock_s3
+except ImportError:  # optional test dependency
+    mock_s3 = None
+from .models import AssistanceCase, Attachment, AttachmentBlob, AttachmentUpload, CaseTimeline
+from .pagination import CaseTimelineCursorPagination
+from .serializers import AttachmentSerializer
+from .timeline import batch_events, record_event
+
+
+class CaseStatusTrackingTests(TestCase):
+    """
+    Workflow transitions detect status changes from the values loaded with
+    the instance, so each step costs one UPDATE plus one timeline INSERT.
+
+    Cases are loaded like AssistanceCaseViewSet does (creator and reviewer
+    joined), so the timeline signals do not fetch users either.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = User.objects.create_user(
+            email='membro@orbe.org', username='membro', password='x',
+            first_name='Maria', last_name='Silva'
+        )
+        cls.admin = User.objects.create_user(
+            email='admin@orbe.org', username='admin', password='x',
+            first_name='Ana', last_name='Souza', role='SUPER_ADMIN'
+        )
+
+    def create_case(self, status='draft'):
+        case = AssistanceCase.objects.create(
+            title='Cesta básica',
+            public_description='Alimentação',
+            internal_description='Notas',
+            total_value=100,
+            created_by=self.member,
+            status=status
+        )
+        return AssistanceCase.objects.select_related(
+            'created_by', 'reviewed_by'
+        ).get(pk=case.pk)
+
+    def latest_event(self, case):
+        return case.timeline_events.order_by('-created_at', '-id').first()
+
+    def test_dirty_field_tracking(self):
+        case = self.create_case()
+        self.assertEqual(case.get_dirty_fields(), {})
+
+        case.status = 'pending_approval'
+        self.assertEqual(case.get_dirty_fields(), {'status': 'draft'})
+        self.assertTrue(case.has_changed('status'))
+
+        case.save(update_fields=['status', 'updated_at'])
+        self.assertEqual(case.get_dirty_fields(), {})
+        self.assertEqual(case.get_loaded_value('status'), 'pending_approval')
+
+    def test_submit_for_approval(self):
+        case = self.create_case()
+
+        with self.assertNumQueries(2):
+            self.assertTrue(case.submit_for_approval())
+
+        event = self.latest_event(case)
+        self.assertEqual(event.event_type, 'submitted_for_approval')
+        self.assertEqual(event.user, self.member)
+
+    def test_approve(self):
+        case = self.create_case('pending_approval')
+
+        with self.assertNumQueries(2):
+            self.assertTrue(case.approve(self.admin))
+
+        event = self.latest_event(case)
+        self.assertEqual(event.event_type, 'approved')
+        self.assertEqual(event.description, 'Caso aprovado por Ana Souza')
+        self.assertEqual(event.user, self.admin)
+
+    def test_reject(self):
+        case = self.create_case('pending_approval')
+
+        with self.assertNumQueries(2):
+            self.assertTrue(case.reject(self.admin, 'Documentação incompleta'))
+
+        event = self.latest_event(case)
+        self.assertEqual(event.event_type, 'rejected')
+        self.assertEqual(event.metadata, {'rejection_reason': 'Documentação incompleta'})
+
+    def test_full_workflow(self):
+        case = self.create_case('awaiting_bank_info')
+
+        with self.assertNumQueries(2):
+            case.submit_bank_info({'beneficiary_name': 'José', 'beneficiary_pix_key': 'jose@orbe.org'})
+        with self.assertNumQueries(2):
+            case.confirm_transfer(self.admin)
+        with self.assertNumQueries(2):
+            case.submit_member_proof()
+        # Completing also publishes the case to the feed (one upsert)
+        with self.assertNumQueries(3):
+            case.complete(self.admin)
+
+        events = list(case.timeline_events.order_by('created_at', 'id').values_list('event_type', flat=True))
+        self.assertEqual(events, [
+            'case_created',
+            'bank_info_submitted',
+            'transfer_confirmed',
+            'member_proof_submitted',
+            'completed',
+        ])
+
+    def test_revalidate_status_rollback(self):
+        case = self.create_case('pending_validation')
+        Attachment.objects.create(
+            case=case, attachment_type='payment_proof', file='proof.pdf',
+            file_name='proof.pdf', file_type='PDF', file_size=10
+        )
+
+        # Attachment checks use the denormalized counters
+        with self.assertNumQueries(2):
+            self.assertTrue(case.revalidate_status())
+
+        self.assertEqual(case.status, 'awaiting_member_proof')
+        event = self.latest_event(case)
+        self.assertEqual(event.event_type, 'status_rollback')
+        self.assertEqual(event.metadata, {'rollback_reason': 'photo_evidence_deleted'})
+
+    def test_save_without_status_change_logs_nothing(self):
+        case = self.create_case()
+        case.title = 'Cesta básica (atualizado)'
+
+        with self.assertNumQueries(1):
+            case.save()
+
+        self.assertFalse(
+            CaseTimeline.objects.filter(case=case).exclude(event_type='case_created').exists()
+        )
+
+    def test_untracked_instance_falls_back_to_database(self):
+        case = self.create_case('pending_approval')
+        detached = AssistanceCase(
+            pk=case.pk, title=case.title, public_description=case.public_description,
+            internal_description=case.internal_description, total_value=case.total_value,
+            created_by=self.member, reviewed_by=self.admin, status='rejected',
+            rejection_reason='Motivo', created_at=case.created_at
+        )
+        self.assertFalse(detached.is_tracked('status'))
+
+        # One SELECT for the stored status, then the UPDATE and timeline INSERT
+        with self.assertNumQueries(3):
+            detached.save()
+
+        self.assertEqual(self.latest_event(case).event_type, 'rejected')
+
+
+class AttachmentCounterTests(TestCase):
+    """Denormalized attachment counters on AssistanceCase"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = User.objects.create_user(
+            email='membro@orbe.org', username='membro', password='x'
+        )
+
+    def setUp(self):
+        self.case = AssistanceCase.objects.create(
+            title='Cesta básica',
+            public_description='Alimentação',
+            internal_description='Notas',
+            total_value=100,
+            created_by=self.member,
+            status='awaiting_member_proof'
+        )
+
+    def attach(self, attachment_type):
+        return Attachment.objects.create(
+            case=self.case, attachment_type=attachment_type, file=f'{attachment_type}.pdf',
+            file_name=f'{attachment_type}.pdf', file_type='PDF', file_size=10
+        )
+
+    def assertCounters(self, total, payment_proofs, photos):
+        self.case.refresh_from_db()
+        self.assertEqual(
+            (self.case.attachment_count, self.case.payment_proof_count, self.case.photo_evidence_count),
+            (total, payment_proofs, photos)
+        )
+
+    def test_counters_follow_create_update_and_delete(self):
+        proof = self.attach('payment_proof')
+        self.attach('photo_evidence')
+        other = self.attach('other')
+        self.assertCounters(3, 1, 1)
+
+        other.attachment_type = 'photo_evidence'
+        other.save()
+        self.assertCounters(3, 1, 2)
+
+        proof.delete()
+        self.assertCounters(2, 0, 2)
+
+    def test_full_case_save_does_not_overwrite_counters(self):
+        stale = AssistanceCase.objects.get(pk=self.case.pk)
+        self.attach('payment_proof')
+
+        stale.title = 'Cesta básica (atualizado)'
+        stale.save()
+        self.assertCounters(1, 1, 0)
+
+    def test_deleting_payment_proof_rolls_back_without_counting(self):
+        proof = self.attach('payment_proof')
+
+        proof.delete()
+
+        self.case.refresh_from_db()
+        self.assertEqual(self.case.status, 'awaiting_transfer')
+
+    def test_sync_command_repairs_drift(self):
+        self.attach('payment_proof')
+        AssistanceCase.objects.filter(pk=self.case.pk).update(attachment_count=0, payment_proof_count=5)
+
+        with self.assertRaises(CommandError):
+            call_command('sync_attachment_counters', check=True, stdout=StringIO())
+
+        call_command('sync_attachment_counters', stdout=StringIO())
+        self.assertCounters(1, 1, 0)
+        call_command('sync_attachment_counters', check=True, stdout=StringIO())
+
+
+class CursorPaginationTests(TestCase):
+    """GET /api/assistance/cases/?pagination=cursor"""
+
+    url = '/api/assistance/cases/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            email='admin@orbe.org', username='admin', password='x', role='SUPER_ADMIN'
+        )
+        AssistanceCase.objects.bulk_create([
+            AssistanceCase(
+                title=f'Caso {index}', public_description='Alimentação', total_value=100,
+                created_by=cls.admin
+            )
+            for index in range(45)
+        ])
+        # Three timestamps only, so ties straddle the page boundaries
+        now = timezone.now()
+        ids = list(AssistanceCase.objects.order_by('id').values_list('id', flat=True))
+        for hours in range(3):
+            AssistanceCase.objects.filter(id__in=ids[hours::3]).update(created_at=now - timedelta(hours=hours))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def walk(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('count', response.data)
+            ids += [case['id'] for case in response.data['results']]
+            url = response.data['next']
+        return ids
+
+    def test_pages_cover_tied_timestamps_once_in_order(self):
+        ids = self.walk(f'{self.url}?pagination=cursor')
+
+        expected = list(AssistanceCase.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_ascending_ordering_gets_ascending_tiebreaker(self):
+        ids = self.walk(f'{self.url}?pagination=cursor&ordering=created_at')
+
+        expected = list(AssistanceCase.objects.order_by('created_at', 'id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_previous_page_returns_the_same_rows(self):
+        first = self.client.get(self.url, {'pagination': 'cursor'})
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+
+        self.assertEqual(
+            [case['id'] for case in back.data['results']],
+            [case['id'] for case in first.data['results']]
+        )
+
+    def test_page_number_pagination_stays_the_default(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.data['count'], 45)
+
+
+class CaseTimelineEndpointTests(TestCase):
+    """GET /api/assistance/cases/{id}/timeline/ and the timeline embedded in the case detail"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            email='admin@orbe.org', username='admin', password='x', role='SUPER_ADMIN'
+        )
+        cls.case = AssistanceCase.objects.create(
+            title='Cesta básica', public_description='Alimentação', total_value=100, created_by=cls.admin
+        )
+        CaseTimeline.objects.bulk_create([
+            CaseTimeline(case=cls.case, event_type='comment_added', description=f'Comentário {index}')
+            for index in range(11)
+        ])
+        # Pairs of events share a timestamp, one minute apart
+        cls.base = timezone.now() - timedelta(hours=1)
+        cls.ids = list(cls.case.timeline_events.order_by('id').values_list('id', flat=True))
+        for index, event_id in enumerate(cls.ids):
+            CaseTimeline.objects.filter(pk=event_id).update(created_at=cls.base + timedelta(minutes=index // 2))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        self.url = f'/api/assistance/cases/{self.case.pk}/timeline/'
+
+    def walk(self, **params):
+        ids = []
+        response = self.client.get(self.url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            ids += [event['id'] for event in response.data['results']]
+            if not response.data['next']:
+                return ids
+            response = self.client.get(response.data['next'])
+
+    def test_pages_walk_events_oldest_first(self):
+        self.assertEqual(self.walk(page_size=5), self.ids)
+
+    @mock.patch.object(CaseTimelineCursorPagination, 'max_page_size', 4)
+    def test_page_size_is_capped(self):
+        response = self.client.get(self.url, {'page_size': 1000})
+
+        self.assertEqual([event['id'] for event in response.data['results']], self.ids[:4])
+
+    def test_since_returns_only_later_events(self):
+        since = self.base + timedelta(minutes=2)
+
+        self.assertEqual(self.walk(since=since.isoformat(), page_size=3), self.ids[6:])
+        # Naive values are read in the current timezone
+        naive = timezone.make_naive(since).isoformat()
+        self.assertEqual(self.walk(since=naive), self.ids[6:])
+
+    def test_invalid_since_is_rejected(self):
+        response = self.client.get(self.url, {'since': 'ontem'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('since', response.data['error'])
+
+    def test_detail_embeds_latest_events_with_timeline_limit(self):
+        detail_url = f'/api/assistance/cases/{self.case.pk}/'
+
+        def embedded(**params):
+            response = self.client.get(detail_url, params)
+            self.assertEqual(response.status_code, 200)
+            return [event['id'] for event in response.data['timeline_events']]
+
+        self.assertEqual(embedded(), self.ids)
+        self.assertEqual(embedded(timeline_limit=3), self.ids[-3:])
+        self.assertEqual(embedded(timeline_limit=0), [])
+        self.assertEqual(embedded(timeline_limit='-1'), [])
+        self.assertEqual(embedded(timeline_limit='todos'), self.ids)
+
+
+class MinimalTransitionResponseTests(TestCase):
+    """Workflow actions with `Prefer: return=minimal` / `?return=minimal`"""
+
+    MINIMAL_FIELDS = {'id', 'status', 'status_display', 'updated_at', 'changed', 'timeline_event'}
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            email='admin@orbe.org', username='admin', password='x',
+            first_name='Ana', last_name='Souza', role='SUPER_ADMIN'
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def create_case(self, status):
+        return AssistanceCase.objects.create(
+            title='Cesta básica', public_description='Alimentação', total_value=100,
+            created_by=self.admin, status=status
+        )
+
+    def test_prefer_header_returns_status_delta(self):
+        case = self.create_case('pending_approval')
+
+        response = self.client.post(
+            f'/api/assistance/cases/{case.pk}/approve/', HTTP_PREFER='respond-async, return=minimal'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Preference-Applied'], 'return=minimal')
+        self.assertEqual(set(response.data), self.MINIMAL_FIELDS)
+        self.assertEqual(response.data['status'], 'awaiting_bank_info')
+        self.assertEqual(list(response.data['changed']), ['approved_at'])
+        self.assertEqual(response.data['timeline_event']['event_type'], 'approved')
+
+    def test_query_param_keeps_the_message_envelope(self):
+        case = self.create_case('awaiting_bank_info')
+
+        response = self.client.post(
+            f'/api/assistance/cases/{case.pk}/submit_bank_info/?return=minimal',
+            {'beneficiary_name': 'José', 'beneficiary_cpf': '000.000.000-00', 'beneficiary_pix_key': 'jose@orbe.org'},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data), {'message', 'case'})
+        self.assertEqual(set(response.data['case']), self.MINIMAL_FIELDS)
+        self.assertEqual(list(response.data['case']['changed']), ['bank_info_submitted_at'])
+        self.assertEqual(response.data['case']['timeline_event']['event_type'], 'bank_info_submitted')
+
+    def test_full_case_is_the_default(self):
+        case = self.create_case('draft')
+
+        response = self.client.post(f'/api/assistance/cases/{case.pk}/submit/')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Preference-Applied', response)
+        self.assertIn('timeline_events', response.data)
+        self.assertEqual(response.data['status'], 'pending_approval')
+
+    def test_validation_errors_are_unchanged(self):
+        case = self.create_case('pending_approval')
+
+        response = self.client.post(f'/api/assistance/cases/{case.pk}/reject/', HTTP_PREFER='return=minimal')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('rejection_reason', response.data)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'FTS5 backend')
+class CaseSearchTests(TestCase):
+    """Full-text search of cases on the SQLite FTS5 backend (see assistance.search)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            email='admin@orbe.org', username='admin', password='x', role='SUPER_ADMIN'
+        )
+
+        def create(title, description, beneficiary='', internal=''):
+            return AssistanceCase.objects.create(
+                title=title, public_description=description, beneficiary_name=beneficiary,
+                internal_description=internal, total_value=100, created_by=cls.admin
+            )
+
+        cls.title_match = create('Medicamentos para tratamento', 'Compra mensal')
+        cls.description_match = create('Ajuda emergencial', 'Compra de medicamentos e fraldas')
+        cls.accented = create('Cesta básica', 'Alimentação para a família')
+        cls.confidential = create('Reforma', 'Telhado', beneficiary='José Carvalho', internal='Laudo médico')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def search(self, query):
+        response = self.client.get('/api/assistance/cases/', {'search': query})
+        self.assertEqual(response.status_code, 200)
+        return [case['id'] for case in response.data['results']]
+
+    def test_title_matches_rank_above_description_matches(self):
+        self.assertEqual(self.search('medicamentos'), [self.title_match.pk, self.description_match.pk])
+
+    def test_accents_and_prefixes_are_folded(self):
+        self.assertEqual(self.search('alimentacao'), [self.accented.pk])
+        self.assertEqual(self.search('basi'), [self.accented.pk])
+
+    def test_all_terms_must_match(self):
+        self.assertEqual(self.search('compra fraldas'), [self.description_match.pk])
+        self.assertEqual(self.search('medicamentos telhado'), [])
+
+    def test_internal_fields_are_only_searched_on_request(self):
+        from .search import case_search_filter
+
+        self.assertEqual(self.search('carvalho'), [])
+        self.assertEqual(
+            list(AssistanceCase.objects.filter(case_search_filter('carvalho', include_internal=True))),
+            [self.confidential]
+        )
+
+    def test_index_follows_updates(self):
+        self.accented.title = 'Kit higiene'
+        self.accented.save()
+
+        self.assertEqual(self.search('higiene'), [self.accented.pk])
+        self.assertEqual(self.search('basica'), [])
+
+    def test_symbols_only_query_returns_everything(self):
+        self.assertEqual(len(self.search('"*')), 4)
+
+
+class BulkActionTests(TestCase):
+    """POST /api/assistance/cases/bulk_action/"""
+
+    url = '/api/assistance/cases/bulk_action/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            email='admin@orbe.org', username='admin', password='x',
+            first_name='Ana', last_name='Souza', role='SUPER_ADMIN'
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def create_case(self, status):
+        return AssistanceCase.objects.create(
+            title='Cesta básica', public_description='Alimentação', total_value=100,
+            created_by=self.admin, status=status
+        )
+
+    def test_valid_cases_are_applied_and_invalid_ones_reported(self):
+        pending = [self.create_case('pending_approval') for _ in range(3)]
+        draft = self.create_case('draft')
+        case_ids = [case.pk for case in pending] + [draft.pk, 9999]
+
+        response = self.client.post(self.url, {'action': 'approve', 'case_ids': case_ids}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['succeeded'], response.data['failed']), (3, 2))
+        self.assertEqual([result['id'] for result in response.data['results']], case_ids)
+        self.assertEqual(
+            set(AssistanceCase.objects.filter(pk__in=[case.pk for case in pending]).values_list('status', flat=True)),
+            {'awaiting_bank_info'}
+        )
+        self.assertEqual(CaseTimeline.objects.filter(event_type='approved').count(), 3)
+        draft.refresh_from_db()
+        self.assertEqual(draft.status, 'draft')
+
+    def test_reject_requires_reason(self):
+        case = self.create_case('pending_approval')
+
+        response = self.client.post(self.url, {'action': 'reject', 'case_ids': [case.pk]}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('rejection_reason', response.data)
+
+
+class TimelineBufferTests(TestCase):
+    """Timeline events logged in a batch_events() block are written with one INSERT"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = User.objects.create_user(
+            email='membro@orbe.org', username='membro', password='x'
+        )
+        cls.case = AssistanceCase.objects.create(
+            title='Cesta básica', public_description='Alimentação', total_value=100,
+            created_by=cls.member
+        )
+
+    def log(self, description):
+        return CaseTimeline.log_event(
+            case=self.case, event_type='comment_added', user=self.member, description=description
+        )
+
+    def comments(self):
+        return list(
+            self.case.timeline_events.filter(event_type='comment_added')
+            .order_by('created_at', 'id').values_list('description', flat=True)
+        )
+
+    def test_events_are_written_in_one_insert_before_the_block_exits(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            with self.assertNumQueries(3):  # SAVEPOINT, INSERT, RELEASE
+                with batch_events():
+                    first = self.log('primeiro')
+                    self.log('segundo')
+                    record_event(CaseTimeline.build_status_change(self.case, 'draft', 'pending_approval'))
+                    self.assertIsNone(first.pk)
+
+        self.assertIsNotNone(first.pk)
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.comments(), ['primeiro', 'segundo'])
+
+    def test_events_outside_a_batch_are_saved_immediately(self):
+        with transaction.atomic():
+            event = self.log('imediato')
+            self.assertIsNotNone(event.pk)
+
+    def test_events_are_dropped_with_a_failed_batch(self):
+        with self.assertRaises(RuntimeError):
+            with batch_events():
+                self.log('descartado')
+                raise RuntimeError
+
+        self.assertEqual(self.comments(), [])
+
+    def test_events_from_rolled_back_savepoint_are_dropped(self):
+        with batch_events():
+            self.log('mantido')
+            try:
+                with transaction.atomic():
+                    self.log('descartado')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            self.log('depois')
+
+        self.assertEqual(self.comments(), ['mantido', 'depois'])
+
+    def test_nested_batches_write_once(self):
+        with self.assertNumQueries(5):  # 2 SAVEPOINT, 1 INSERT, 2 RELEASE
+            with batch_events():
+                self.log('externo')
+                with batch_events():
+                    self.log('interno')
+
+        self.assertEqual(self.comments(), ['externo', 'interno'])
+
+    def timeline_inserts(self, queries):
+        return [query for query in queries if query['sql'].startswith('INSERT INTO "assistance_casetimeline"')]
+
+    def test_admin_action_writes_its_events_with_one_insert(self):
+        from django.contrib import admin
+        from django.test import RequestFactory
+        from django.test.utils import CaptureQueriesContext
+        from .admin import AssistanceCaseAdmin
+
+        for _ in range(3):
+            AssistanceCase.objects.create(
+                title='Rascunho', public_description='Alimentação', total_value=100,
+                created_by=self.member, status='draft'
+            )
+        model_admin = AssistanceCaseAdmin(AssistanceCase, admin.site)
+        request = RequestFactory().post('/admin/')
+
+        with mock.patch.object(AssistanceCaseAdmin, 'message_user'):
+            with CaptureQueriesContext(connection) as queries:
+                model_admin.mark_as_pending(request, AssistanceCase.objects.filter(title='Rascunho'))
+
+        self.assertEqual(len(self.timeline_inserts(queries)), 1)
+        self.assertEqual(CaseTimeline.objects.filter(event_type='submitted_for_approval').count(), 3)
+
+    def test_attachment_deletion_cleans_up_its_rollback_before_writing(self):
+        from django.test.utils import CaptureQueriesContext
+
+        case = AssistanceCase.objects.create(
+            title='Cesta básica', public_description='Alimentação', total_value=100,
+            created_by=self.member, status='awaiting_member_proof'
+        )
+        attachment = Attachment.objects.create(
+            case=case, attachment_type='payment_proof', file='recibo.pdf',
+            file_name='recibo.pdf', file_type='PDF', file_size=10, uploaded_by=self.member
+        )
+        client = APIClient()
+        client.force_authenticate(self.member)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.delete(f'/api/assistance/attachments/{attachment.pk}/')
+
+        self.assertEqual(response.status_code, 204)
+        case.refresh_from_db()
+        self.assertEqual(case.status, 'awaiting_transfer')
+        # The rollback event is discarded by the timeline cleanup while
+        # still buffered, so nothing is inserted and deleted again
+        self.assertEqual(self.timeline_inserts(queries), [])
+        self.assertFalse(case.timeline_events.filter(event_type='status_rollback').exists())
+
+
+class VisibilityTests(TestCase):
+    """Cases and attachments share the role visibility rules"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user(email='dono@orbe.org', username='dono', password='x')
+        cls.other = User.objects.create_user(email='outro@orbe.org', username='outro', password='x')
+        cls.council = User.objects.create_user(
+            email='conselho@orbe.org', username='conselho', password='x', role='FISCAL_COUNCIL'
+        )
+        cls.own_case = cls.create_case(cls.owner, 'awaiting_transfer')
+        cls.public_case = cls.create_case(cls.other, 'completed')
+        cls.private_case = cls.create_case(cls.other, 'pending_validation')
+
+    @classmethod
+    def create_case(cls, user, status):
+        case = AssistanceCase.objects.create(
+            title='Cesta básica', public_description='Alimentação', total_value=100,
+            created_by=user, status=status
+        )
+        Attachment.objects.create(
+            case=case, attachment_type='other', file='f.pdf',
+            file_name='f.pdf', file_type='PDF', file_size=10
+        )
+        return case
+
+    def visible_case_ids(self, user, url):
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get(url)
+        return {
+            item['case'] if 'case' in item else item['id']
+            for item in response.data['results']
+        }
+
+    def test_member_sees_own_and_completed_cases(self):
+        expected = {self.own_case.pk, self.public_case.pk}
+        self.assertEqual(self.visible_case_ids(self.owner, '/api/assistance/cases/'), expected)
+        self.assertEqual(self.visible_case_ids(self.owner, '/api/assistance/attachments/'), expected)
+        self.assertEqual(
+            self.visible_case_ids(self.owner, f'/api/assistance/attachments/?case={self.private_case.pk}'),
+            set()
+        )
+
+    def test_fiscal_council_sees_all_attachments(self):
+        self.assertEqual(
+            self.visible_case_ids(self.council, '/api/assistance/attachments/'),
+            {self.own_case.pk, self.public_case.pk, self.private_case.pk}
+        )
+
+
+class TempMediaTestCase(TestCase):
+    """
+    Attachment tests: MEDIA_ROOT in a temporary directory, a member and
+    their "Cesta básica" case.
+
+    Subclasses add settings to override in `media_settings` and pick the
+    status of the case in `case_status`.
+    """
+
+    media_settings = {}
+    case_status = 'awaiting_member_proof'
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.settings_override = override_settings(MEDIA_ROOT=cls.media_root, **cls.media_settings)
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = User.objects.create_user(
+            email='membro@orbe.org', username='membro', password='x',
+            first_name='Maria', last_name='Silva'
+        )
+        cls.case = cls.create_case()
+
+    @classmethod
+    def create_case(cls, **fields):
+        fields = {
+            'title': 'Cesta básica', 'public_description': 'Alimentação', 'total_value': 100,
+            'created_by': cls.member, 'status': cls.case_status, **fields
+        }
+        return AssistanceCase.objects.create(**fields)
+
+
+class ResumableUploadTests(TempMediaTestCase):
+    """Chunked uploads through /api/assistance/uploads/"""
+
+    media_settings = {'ATTACHMENT_UPLOAD_CHUNK_SIZE': 4}
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.member)
+
+    def start(self, file_size=10, attachment_type='photo_evidence'):
+        response = self.client.post('/api/assistance/uploads/', {
+            'case': self.case.pk, 'attachment_type': attachment_type,
+            'file_name': 'foto.jpg', 'file_size': file_size
+        }, format='json')
+        self.assertEqual(response.status_code, 201, response.data)
+        return f"/api/assistance/uploads/{response.data['id']}/"
+
+    def put(self, url, offset, data):
+        return self.client.put(
+            url, data, content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset)
+        )
+
+    def test_chunked_upload_resume_and_commit(self):
+        url = self.start()
+
+        self.assertEqual(self.put(url, 0, b'0123').status_code, 200)
+        # Retried chunk at a stale offset: the client is told where to resume
+        response = self.put(url, 0, b'0123')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response['Upload-Offset'], '4')
+        self.assertEqual(self.put(url, 4, b'4567').status_code, 200)
+
+        self.assertEqual(self.client.head(url)['Upload-Offset'], '8')
+        self.assertEqual(self.client.post(f'{url}commit/').status_code, 409)
+        self.assertEqual(self.put(url, 8, b'89').status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'{url}commit/')
+        self.assertEqual(response.status_code, 201)
+
+        attachment = Attachment.objects.get(pk=response.data['id'])
+        with attachment.file.open('rb') as f:
+            self.assertEqual(f.read(), b'0123456789')
+        self.assertEqual((attachment.file_size, attachment.file_type), (10, 'JPG'))
+        self.assertTrue(
+            self.case.timeline_events.filter(event_type='attachment_uploaded').exists()
+        )
+        self.case.refresh_from_db()
+        self.assertEqual(self.case.photo_evidence_count, 1)
+
+        upload = AttachmentUpload.objects.get()
+        self.assertEqual(upload.parts, [])
+        # Committing again returns the same attachment
+        self.assertEqual(self.client.post(f'{url}commit/').data['id'], attachment.pk)
+
+    def test_limits(self):
+        url = self.start()
+        self.assertEqual(self.put(url, 0, b'01234').status_code, 413)
+
+        response = self.client.post('/api/assistance/uploads/', {
+            'case': self.case.pk, 'attachment_type': 'other',
+            'file_name': 'doc.pdf', 'file_size': Attachment.MAX_FILE_SIZE + 1
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('file_size', response.data)
+
+
+class DeduplicationTests(TempMediaTestCase):
+    """Content-addressed attachment storage (assistance.blobs)"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.member)
+
+    def upload(self, name, content):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/assistance/attachments/', {
+                'case': self.case.pk, 'attachment_type': 'photo_evidence',
+                'file': SimpleUploadedFile(name, content)
+            }, format='multipart')
+        self.assertEqual(response.status_code, 201, response.data)
+        return Attachment.objects.get(pk=response.data['id'])
+
+    def test_identical_content_shares_one_blob(self):
+        import hashlib
+
+        first = self.upload('foto.jpg', b'same bytes')
+        second = self.upload('copia.jpg', b'same bytes')
+        other = self.upload('outra.jpg', b'other bytes')
+
+        blob = AttachmentBlob.objects.get(pk=hashlib.sha256(b'same bytes').hexdigest())
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertEqual(first.file.name, blob.file.name)
+        self.assertEqual(second.file_name, 'copia.jpg')
+        self.assertNotEqual(other.blob_id, blob.pk)
+        self.assertEqual(AttachmentBlob.objects.count(), 2)
+
+        # The file stays until the last reference is deleted
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        blob.refresh_from_db()
+        self.assertEqual(blob.ref_count, 1)
+        self.assertTrue(default_storage.exists(blob.file.name))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(AttachmentBlob.objects.filter(pk=blob.pk).exists())
+        self.assertFalse(default_storage.exists(blob.file.name))
+
+    def test_resumable_upload_of_known_content_skips_transfer(self):
+        import hashlib
+
+        existing = self.upload('foto.jpg', b'0123456789')
+        response = self.client.post('/api/assistance/uploads/', {
+            'case': self.case.pk, 'attachment_type': 'photo_evidence', 'file_name': 'foto2.jpg',
+            'file_size': 10, 'sha256': hashlib.sha256(b'0123456789').hexdigest()
+        }, format='json')
+        self.assertEqual(response.data['offset'], 10)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f"/api/assistance/uploads/{response.data['id']}/commit/")
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(response.data['sha256'], existing.blob_id)
+        self.assertEqual(AttachmentBlob.objects.get().ref_count, 2)
+
+    def test_resumable_upload_checksum_mismatch_restarts(self):
+        response = self.client.post('/api/assistance/uploads/', {
+            'case': self.case.pk, 'attachment_type': 'photo_evidence', 'file_name': 'foto.jpg',
+            'file_size': 4, 'sha256': '0' * 64
+        }, format='json')
+        url = f"/api/assistance/uploads/{response.data['id']}/"
+        self.assertEqual(response.data['offset'], 0)
+        self.client.put(url, b'abcd', content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET='0')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'{url}commit/')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response['Upload-Offset'], '0')
+        self.assertEqual(AttachmentUpload.objects.get().parts, [])
+        self.assertFalse(Attachment.objects.exists())
+
+    def test_dedupe_command_links_existing_attachments(self):
+        from django.core.files.base import ContentFile
+
+        names = [default_storage.save(f'assistance_attachments/old{i}.pdf', ContentFile(b'receipt')) for i in range(2)]
+        for name in names:
+            Attachment.objects.bulk_create([Attachment(
+                case=self.case, file=name, file_name='recibo.pdf', file_type='PDF', file_size=7
+            )])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('dedupe_attachments', stdout=StringIO())
+
+        blob = AttachmentBlob.objects.get()
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual(set(Attachment.objects.values_list('file', flat=True)), {blob.file.name})
+        self.assertEqual(sum(default_storage.exists(name) for name in names), 1)
+
+
+@skipUnless(mock_s3, 'moto não instalado')
+@override_settings(
+    USE_S3=True,
+    STORAGES={
+        'default': {'BACKEND': 'storages.backends.s3boto3.S3Boto3Storage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    },
+    AWS_ACCESS_KEY_ID='testing',
+    AWS_SECRET_ACCESS_KEY='testing',
+    AWS_STORAGE_BUCKET_NAME='orbe-test',
+    AWS_S3_REGION_NAME='us-east-1',
+    AWS_S3_CUSTOM_DOMAIN=None,
+)
+class DirectUploadTests(TempMediaTestCase):
+    """Presigned POST uploads against a moto S3 stand-in"""
+
+    def setUp(self):
+        import boto3
+
+        s3 = mock_s3()
+        s3.start()
+        self.addCleanup(s3.stop)
+        boto3.client('s3', region_name='us-east-1').create_bucket(Bucket='orbe-test')
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.member)
+
+    def upload(self, policy, content):
+        import requests
+
+        response = requests.post(
+            policy['url'], data=policy['fields'], files={'file': ('foto.jpg', content)}
+        )
+        return response.status_code
+
+    def presign(self):
+        response = self.client.post('/api/assistance/attachments/presign/', {
+            'case': self.case.pk, 'attachment_type': 'photo_evidence', 'file_name': 'foto.jpg'
+        }, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_presign_upload_and_confirm(self):
+        policy = self.presign()
+        self.assertEqual(policy['fields']['Content-Type'], 'image/jpeg')
+        self.assertLess(self.upload(policy, b'imagem'), 300)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                '/api/assistance/attachments/confirm/', {'token': policy['token']}, format='json'
+            )
+        self.assertEqual(response.status_code, 201, response.data)
+
+        attachment = Attachment.objects.get(pk=response.data['id'])
+        self.assertEqual((attachment.file_size, attachment.file_type), (6, 'JPG'))
+        self.assertEqual(attachment.file.read(), b'imagem')
+        self.assertTrue(self.case.timeline_events.filter(event_type='attachment_uploaded').exists())
+
+        # Confirming again does not create a second attachment
+        response = self.client.post('/api/assistance/attachments/confirm/', {'token': policy['token']}, format='json')
+        self.assertEqual((response.status_code, response.data['id']), (200, attachment.pk))
+        self.assertEqual(Attachment.objects.count(), 1)
+
+        # Downloads redirect to a short-lived presigned URL
+        response = self.client.get(f'/api/assistance/attachments/{attachment.pk}/download/')
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('Signature=', response['Location'])
+
+    def confirm(self, policy):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                '/api/assistance/attachments/confirm/', {'token': policy['token']}, format='json'
+            )
+
+    def test_confirm_is_idempotent_for_deduplicated_content(self):
+        first = self.presign()
+        self.upload(first, b'imagem')
+        original = Attachment.objects.get(pk=self.confirm(first).data['id'])
+
+        policy = self.presign()
+        self.upload(policy, b'imagem')
+        response = self.confirm(policy)
+        self.assertEqual(response.status_code, 201, response.data)
+
+        attachment = Attachment.objects.get(pk=response.data['id'])
+        self.assertEqual(attachment.blob, original.blob)
+        self.assertNotEqual(attachment.file.name, attachment.upload_name)
+        self.assertFalse(default_storage.exists(attachment.upload_name))
+
+        # The retry finds the attachment although its object is gone
+        retry = self.confirm(policy)
+        self.assertEqual((retry.status_code, retry.data['id']), (200, attachment.pk))
+        self.assertEqual(Attachment.objects.count(), 2)
+        self.assertEqual(AttachmentBlob.objects.get().ref_count, 2)
+
+    def test_concurrent_confirm_returns_the_winning_attachment(self):
+        from .views import AttachmentViewSet
+
+        policy = self.presign()
+        self.upload(policy, b'imagem')
+        attachment = Attachment.objects.get(pk=self.confirm(policy).data['id'])
+
+        # The second confirm misses the lookup, as if both ran at once
+        lookup = AttachmentViewSet._confirmed_attachment
+        calls = []
+
+        def racing_lookup(view, upload_name):
+            calls.append(upload_name)
+            return None if len(calls) == 1 else lookup(view, upload_name)
+
+        with mock.patch.object(AttachmentViewSet, '_confirmed_attachment', racing_lookup):
+            response = self.confirm(policy)
+
+        self.assertEqual((response.status_code, response.data['id']), (200, attachment.pk))
+        self.assertEqual(Attachment.objects.count(), 1)
+        self.assertEqual(AttachmentBlob.objects.get().ref_count, 1)
+
+    def test_failed_confirm_keeps_no_blob_reference(self):
+        first = self.presign()
+        self.upload(first, b'imagem')
+        self.confirm(first)
+
+        policy = self.presign()
+        self.upload(policy, b'imagem')
+        with mock.patch.object(Attachment, 'save', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError), self.assertLogs('django.request', 'ERROR'):
+                self.confirm(policy)
+
+        self.assertEqual(AttachmentBlob.objects.get().ref_count, 1)
+        # The uploaded object is kept for the retry
+        response = self.confirm(policy)
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertEqual(AttachmentBlob.objects.get().ref_count, 2)
+
+    def test_confirm_requires_uploaded_object(self):
+        policy = self.presign()
+
+        response = self.client.post(
+            '/api/assistance/attachments/confirm/', {'token': policy['token']}, format='json'
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Attachment.objects.exists())
+
+    def test_token_is_bound_to_user(self):
+        policy = self.presign()
+        other = User.objects.create_user(email='outro@orbe.org', username='outro', password='x')
+        self.client.force_authenticate(other)
+
+        response = self.client.post(
+            '/api/assistance/attachments/confirm/', {'token': policy['token']}, format='json'
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+
+class RenditionTests(TempMediaTestCase):
+    """Background previews for image and PDF attachments"""
+
+    def attach(self, name, content):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        return Attachment.objects.create(
+            case=self.case, attachment_type='photo_evidence',
+            file=SimpleUploadedFile(name, content), uploaded_by=self.member
+        )
+
+    def test_photo_renditions_are_rotated_and_stripped(self):
+        from PIL import Image
+        from .tasks import generate_attachment_renditions
+
+        # Landscape sensor image shot in portrait (EXIF orientation 6) with GPS data
+        photo = Image.new('RGB', (2000, 1000), 'red')
+        exif = Image.Exif()
+        exif[0x0112] = 6
+        exif[0x8825] = {2: (23.0, 57.0, 0.0)}
+        buffer = BytesIO()
+        photo.save(buffer, 'JPEG', exif=exif.tobytes())
+        attachment = self.attach('foto.jpg', buffer.getvalue())
+
+        generate_attachment_renditions(attachment.pk)
+        attachment.refresh_from_db()
+
+        thumb = attachment.renditions['thumb']
+        self.assertEqual((thumb['width'], thumb['height']), (160, 320))
+        self.assertEqual(attachment.renditions['medium']['height'], 1280)
+        with default_storage.open(thumb['jpeg']) as f:
+            self.assertEqual(len(Image.open(f).getexif()), 0)
+        with default_storage.open(thumb['webp']) as f:
+            self.assertEqual(Image.open(f).format, 'WEBP')
+
+        data = AttachmentSerializer(attachment).data
+        self.assertTrue(data['renditions']['thumb']['webp'].endswith('rendition=thumb&format=webp'))
+
+    def test_pdf_first_page_preview(self):
+        from PIL import Image
+        from .tasks import generate_attachment_renditions
+
+        buffer = BytesIO()
+        Image.new('RGB', (600, 800), 'white').save(buffer, 'PDF')
+        attachment = self.attach('recibo.pdf', buffer.getvalue())
+
+        generate_attachment_renditions(attachment.pk)
+        attachment.refresh_from_db()
+
+        self.assertEqual(attachment.renditions['thumb']['height'], 320)
+
+    def test_unreadable_file_is_skipped(self):
+        from .tasks import generate_attachment_renditions
+
+        attachment = self.attach('foto.png', b'not an image')
+
+        self.assertEqual(generate_attachment_renditions(attachment.pk), {'status': 'skipped'})
+
+
+@override_settings(PROTECTED_MEDIA_BACKEND='django')
+class DownloadTests(TempMediaTestCase):
+    """Protected downloads (assistance.downloads)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.other = User.objects.create_user(email='outro@orbe.org', username='outro', password='x')
+
+    def setUp(self):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        with self.captureOnCommitCallbacks(execute=True):
+            self.attachment = Attachment.objects.create(
+                case=self.case, attachment_type='other', uploaded_by=self.member,
+                file=SimpleUploadedFile('recibo.pdf', b'0123456789')
+            )
+        self.client = APIClient()
+        self.url = f'/api/assistance/attachments/{self.attachment.pk}/download/'
+
+    def signed_url(self, user):
+        from rest_framework.test import APIRequestFactory
+        request = APIRequestFactory().get('/')
+        request.user = user
+        return AttachmentSerializer(self.attachment, context={'request': request}).data['file_url']
+
+    def test_signed_link_range_and_conditional_get(self):
+        url = self.signed_url(self.member)
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+        self.assertEqual(response['ETag'], f'"{self.attachment.blob_id}"')
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+
+        response = self.client.get(url, HTTP_RANGE='bytes=2-5')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 2-5/10')
+        self.assertEqual(b''.join(response.streaming_content), b'2345')
+        self.assertEqual(self.client.get(url, HTTP_RANGE='bytes=20-').status_code, 416)
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=f'"{self.attachment.blob_id}"')
+        self.assertEqual(response.status_code, 304)
+
+    def test_visibility_and_tokens(self):
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+        self.assertEqual(self.client.get(f'{self.url}?token=forged').status_code, 401)
+
+        # A link signed for someone who cannot see the case
+        self.assertEqual(self.client.get(self.signed_url(self.other)).status_code, 404)
+
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    @override_settings(PROTECTED_MEDIA_BACKEND='x-accel-redirect')
+    def test_transfer_handed_to_web_server(self):
+        self.client.force_authenticate(self.member)
+        response = self.client.get(f'{self.url}?download=1')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.attachment.file.name}')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="recibo.pdf"')
+
+
+class AttachmentExportTests(TempMediaTestCase):
+    """Streaming ZIP export (assistance.exports)"""
+
+    case_status = 'completed'
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.auditor = User.objects.create_user(
+            email='fiscal@orbe.org', username='fiscal', password='x', role='FISCAL_COUNCIL'
+        )
+        cls.other_case = cls.create_case(
+            title='Aluguel', public_description='Moradia', total_value=300,
+            created_by=cls.auditor, status='draft'
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.recibo = self.attach(self.case, 'recibo.pdf', b'%PDF-1.4 recibo')
+        self.foto = self.attach(self.case, 'foto.jpg', b'\xff\xd8' + b'x' * 200_000)
+        self.contrato = self.attach(self.other_case, 'contrato.pdf', b'%PDF-1.4 contrato')
+
+    def attach(self, case, name, content):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        with self.captureOnCommitCallbacks(execute=True):
+            return Attachment.objects.create(
+                case=case, attachment_type='other', uploaded_by=self.member,
+                file=SimpleUploadedFile(name, content)
+            )
+
+    def download(self, url):
+        import zipfile
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        chunks = list(response.streaming_content)
+        return response, chunks, zipfile.ZipFile(BytesIO(b''.join(chunks)))
+
+    def test_case_export_streams_files_and_manifest(self):
+        import csv
+
+        self.client.force_authenticate(self.member)
+        response, chunks, archive = self.download(f'/api/assistance/cases/{self.case.pk}/download_all/')
+
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        self.assertIn(f'caso-{self.case.pk}-anexos.zip', response['Content-Disposition'])
+        # Written as it is read, not as one buffer
+        self.assertGreater(len(chunks), 3)
+        self.assertIsNone(archive.testzip())
+
+        directory = f'{self.case.pk}-cesta-basica'
+        self.assertEqual(archive.read(f'{directory}/{self.recibo.pk}-recibo.pdf'), b'%PDF-1.4 recibo')
+        self.assertEqual(len(archive.read(f'{directory}/{self.foto.pk}-foto.jpg')), 200_002)
+
+        rows = list(csv.DictReader(archive.read('manifest.csv').decode('utf-8-sig').splitlines()))
+        self.assertEqual([row['nome_original'] for row in rows], ['recibo.pdf', 'foto.jpg'])
+        self.assertEqual(rows[0]['enviado_por'], 'Maria Silva <membro@orbe.org>')
+        self.assertEqual(rows[1]['tamanho_bytes'], '200002')
+        self.assertEqual({row['status'] for row in rows}, {'ok'})
+
+    def test_missing_file_is_listed_in_manifest(self):
+        default_storage.delete(self.recibo.file.name)
+
+        self.client.force_authenticate(self.member)
+        _, _, archive = self.download(f'/api/assistance/cases/{self.case.pk}/download_all/')
+
+        self.assertEqual(len(archive.namelist()), 2)
+        self.assertIn(',ausente', archive.read('manifest.csv').decode('utf-8-sig'))
+
+    def test_filtered_export_is_restricted_to_reviewers(self):
+        self.client.force_authenticate(self.member)
+        self.assertEqual(self.client.get('/api/assistance/cases/download_all/').status_code, 403)
+        self.assertEqual(
+            self.client.get(f'/api/assistance/cases/{self.other_case.pk}/download_all/').status_code, 404
+        )
+
+        self.client.force_authenticate(self.auditor)
+        _, _, archive = self.download('/api/assistance/cases/download_all/?status=draft')
+        self.assertEqual(
+            archive.namelist(), [f'{self.other_case.pk}-aluguel/{self.contrato.pk}-contrato.pdf', 'manifest.csv']
+        )
+
+        _, _, archive = self.download('/api/assistance/cases/download_all/')
+        self.assertEqual(len(archive.namelist()), 4)
+
+
+@override_settings(PROTECTED_MEDIA_BACKEND='django')
+class DossierTests(TempMediaTestCase):
+    """Case dossier PDFs (assistance.dossiers)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.auditor = User.objects.create_user(
+            email='fiscal@orbe.org', username='fiscal', password='x', role='FISCAL_COUNCIL'
+        )
+
+    def setUp(self):
+        from django.core.cache import cache
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        from PIL import Image
+
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.case = self.create_case(
+                internal_description='Notas <b>', status='completed',
+                beneficiary_name='João', beneficiary_pix_key='joao@email.com'
+            )
+        photo = BytesIO()
+        Image.new('RGB', (800, 600), 'green').save(photo, 'JPEG')
+        with self.captureOnCommitCallbacks(execute=True):
+            Attachment.objects.create(
+                case=self.case, attachment_type='photo_evidence', uploaded_by=self.member,
+                file=SimpleUploadedFile('foto.jpg', photo.getvalue())
+            )
+        self.client = APIClient()
+        self.url = f'/api/assistance/cases/{self.case.pk}/dossier/'
+
+    def test_rendered_in_background_then_served_from_storage(self):
+        from .models import CaseDossier
+
+        self.client.force_authenticate(self.auditor)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 202)
+
+        dossier = CaseDossier.objects.get(case=self.case)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        content = b''.join(response.streaming_content)
+        self.assertTrue(content.startswith(b'%PDF'))
+        self.assertEqual(len(content), dossier.file_size)
+        # The photo's preview is embedded
+        self.assertIn(b'/Subtype /Image', content)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+        # Unchanged case: not rendered again
+        from .tasks import generate_case_dossier
+        self.assertEqual(generate_case_dossier(self.case.pk)['status'], 'current')
+
+        # A new attachment invalidates the stored version; the old file is removed
+        from django.core.files.uploadedfile import SimpleUploadedFile
+        old_name = dossier.file.name
+        with self.captureOnCommitCallbacks(execute=True):
+            Attachment.objects.create(
+                case=self.case, attachment_type='other', uploaded_by=self.member,
+                file=SimpleUploadedFile('nota.pdf', b'%PDF-1.4 nota')
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.get(self.url).status_code, 202)
+        dossier.refresh_from_db()
+        self.assertNotEqual(dossier.file.name, old_name)
+        self.assertFalse(default_storage.exists(old_name))
+
+    def test_restricted_to_reviewers_and_completed_cases(self):
+        self.client.force_authenticate(self.member)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+        AssistanceCase.objects.filter(pk=self.case.pk).update(status='pending_validation')
+        self.client.force_authenticate(self.auditor)
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+
+    def test_monthly_batch(self):
+        from .models import CaseDossier
+
+        now = timezone.localtime()
+        AssistanceCase.objects.filter(pk=self.case.pk).update(completed_at=now)
+
+        out = StringIO()
+        call_command('generate_dossiers', month=f'{now:%Y-%m}', sync=True, stdout=out)
+        self.assertIn('1 dossiers rendered', out.getvalue())
+        self.assertTrue(CaseDossier.objects.filter(case=self.case).exists())
+
+        out = StringIO()
+        call_command('generate_dossiers', month=f'{now:%Y-%m}', stdout=out)
+        self.assertIn('0 dossiers queued, 1 up to date', out.getvalue())
+
+
+class AdminChangelistTests(TempMediaTestCase):
+    """Admin changelists cost the same number of queries for any page size"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            email='admin@orbe.org', username='admin', password='x', role='SUPER_ADMIN'
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def add_cases(self, count):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        for index in range(count):
+            member = User.objects.create_user(
+                email=f'membro{User.objects.count()}@orbe.org', username=f'membro{User.objects.count()}', password='x'
+            )
+            with self.captureOnCommitCallbacks(execute=True):
+                case = AssistanceCase.objects.create(
+                    title=f'Caso {index}', public_description='Descrição', total_value=100,
+                    created_by=member, reviewed_by=self.admin, status='pending_approval'
+                )
+                Attachment.objects.create(
+                    case=case, attachment_type='other', uploaded_by=member,
+                    file=SimpleUploadedFile('recibo.pdf', b'%PDF-1.4 recibo')
+                )
+
+    def changelist_queries(self, url):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_query_count_does_not_grow_with_rows(self):
+        urls = [
+            '/admin/assistance/assistancecase/',
+            '/admin/assistance/attachment/',
+            '/admin/assistance/casetimeline/',
+        ]
+        self.add_cases(2)
+        before = [self.changelist_queries(url) for url in urls]
+
+        self.add_cases(5)
+        after = [self.changelist_queries(url) for url in urls]
+
+        self.assertEqual(before, after)
+
+    def test_attachment_changelist_shows_thumbnails_only(self):
+        self.add_cases(1)
+        attachment = Attachment.objects.get()
+        Attachment.objects.filter(pk=attachment.pk).update(file_type='JPG', renditions={})
+
+        response = self.client.get('/admin/assistance/attachment/')
+        self.assertNotContains(response, 'loading="lazy"')
+        self.assertContains(response, '📄 JPG')
+
+        Attachment.objects.filter(pk=attachment.pk).update(renditions={
+            'thumb': {'width': 320, 'height': 240, 'jpeg': 'thumb.jpg', 'webp': 'thumb.webp'}
+        })
+        response = self.client.get('/admin/assistance/attachment/')
+        self.assertContains(response, 'rendition=thumb&amp;format=jpeg')
+
+    def test_user_fields_use_autocomplete(self):
+        self.add_cases(1)
+        case = AssistanceCase.objects.get()
+
+        response = self.client.get(f'/admin/assistance/assistancecase/{case.pk}/change/')
+        self.assertContains(response, 'admin-autocomplete')
+        # Only the selected users are rendered as options
+        self.assertLess(response.content.count(b'<option'), 20)
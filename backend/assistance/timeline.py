@@ -0,0 +1,132 @@
+"""
+Batched writes of CaseTimeline events.
+
+Signal handlers log several events while a single change is being saved
+(case creation, status transitions, attachment uploads, rollbacks). Inside
+a `batch_events()` block those events are collected and written with one
+bulk_create when the block exits, still inside its transaction: the audit
+trail commits (or rolls back) together with the change it describes.
+Everywhere else events are saved immediately, as before.
+
+Each write entry point runs in one block: attachment uploads (multipart,
+direct confirm, resumable commit) and deletions with the status rollbacks
+they cause, direct donations and the bulk admin actions. Bulk workflow
+actions write their events with their own bulk_create (assistance.bulk).
+
+Events keep the order they were logged in; created_at is stamped when the
+rows are inserted. Events logged inside a nested savepoint are saved
+immediately instead of buffered, so rolling back that savepoint also
+removes them.
+"""
+
+from contextlib import contextmanager
+
+from django.db import connections, router, transaction
+
+
+class _Batch:
+    """Events logged directly in one batch_events() block"""
+
+    def __init__(self, savepoint_ids):
+        self.savepoint_ids = savepoint_ids
+        self.events = []
+
+
+def _db_alias(using):
+    if using is not None:
+        return using
+    from .models import CaseTimeline
+    return router.db_for_write(CaseTimeline)
+
+
+def _batches(connection):
+    if not hasattr(connection, '_timeline_batches'):
+        connection._timeline_batches = []
+    return connection._timeline_batches
+
+
+def _savepoint_ids(connection):
+    # Blocks without a savepoint (atomic(savepoint=False), as in
+    # Model.delete) roll back with the enclosing one: they do not count
+    return tuple(sid for sid in connection.savepoint_ids if sid is not None)
+
+
+def _open_batch(connection):
+    """The innermost batch when the current savepoint is the one it opened"""
+    batches = _batches(connection)
+    if batches and batches[-1].savepoint_ids == _savepoint_ids(connection):
+        return batches[-1]
+    return None
+
+
+def _write(events, using):
+    if events:
+        from .models import CaseTimeline
+        CaseTimeline.objects.using(using).bulk_create(events)
+
+
+@contextmanager
+def batch_events(using=None):
+    """
+    Run the block atomically, writing the timeline events it logs with one
+    INSERT before the block exits.
+
+    Nested batches hand their events over to the enclosing one. Usable as
+    a decorator.
+    """
+    using = _db_alias(using)
+    connection = connections[using]
+    outer = _open_batch(connection)
+
+    with transaction.atomic(using=using):
+        batch = _Batch(_savepoint_ids(connection))
+        batches = _batches(connection)
+        batches.append(batch)
+        try:
+            yield
+        finally:
+            batches.remove(batch)
+
+        if outer is not None:
+            outer.events.extend(batch.events)
+        else:
+            _write(batch.events, using)
+
+
+def record_event(event, using=None):
+    """
+    Save a CaseTimeline event, or buffer it when logged directly inside a
+    batch_events() block.
+
+    Returns:
+        The event (without pk while it is still buffered)
+    """
+    using = _db_alias(using)
+    batch = _open_batch(connections[using])
+
+    if batch is None:
+        event.save(using=using)
+    else:
+        batch.events.append(event)
+    return event
+
+
+def discard_pending_events(predicate, using=None):
+    """
+    Drop buffered (not yet written) events matching `predicate`.
+
+    Used together with queryset deletes so a cleanup also covers events
+    logged earlier in the same batch.
+
+    Returns:
+        int: Number of events discarded
+    """
+    connection = connections[_db_alias(using)]
+    discarded = 0
+
+    for batch in _batches(connection):
+        kept = [event for event in batch.events if not predicate(event)]
+        discarded += len(batch.events) - len(kept)
+        batch.events = kept
+
+    return discarded
@@ -0,0 +1,312 @@
+"""
+Resumable (chunked) attachment uploads.
+
+Protocol (see AttachmentUploadViewSet):
+1. POST   /api/assistance/uploads/            declare case, type, name and size
+2. PUT    /api/assistance/uploads/{id}/       send the bytes at `Upload-Offset`
+3. HEAD   /api/assistance/uploads/{id}/       ask how many bytes were received
+4. POST   /api/assistance/uploads/{id}/commit/ create the Attachment
+
+Each chunk is streamed from the request into its own object in the default
+storage (local disk or S3), so a worker never holds more than a read buffer
+in memory and a dropped connection only loses the chunk in flight. The
+commit hashes the chunks, streams them in order into the content-addressed
+blob (see assistance.blobs) unless that content is already stored, and
+deletes them.
+
+A client may declare the file's SHA-256 when starting. If the platform
+already stores that content (in a case the user can see), the session
+starts complete and no bytes need to be sent; otherwise the received
+bytes are checked against the declared hash on commit.
+"""
+
+import logging
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from .blobs import acquire_blob, hash_stream, reference_blob
+from .models import Attachment, AttachmentUpload
+from .timeline import batch_events
+
+logger = logging.getLogger(__name__)
+
+# Storage prefix for chunks of unfinished uploads
+PARTS_PREFIX = 'attachment_uploads'
+
+# Bytes read from the request / chunk objects at a time
+READ_BUFFER_SIZE = 64 * 1024
+
+
+class UploadOffsetMismatch(Exception):
+    """The chunk does not start at the bytes received so far"""
+
+    def __init__(self, offset):
+        super().__init__(f'Expected offset {offset}')
+        self.offset = offset
+
+
+class IncompleteChunk(Exception):
+    """The request body ended before the announced length"""
+
+
+class ChecksumMismatch(Exception):
+    """The received bytes do not match the SHA-256 declared by the client"""
+
+
+class _LimitedReader:
+    """Reads at most `length` bytes from a stream, counting what was read"""
+
+    closed = False
+
+    def __init__(self, stream, length):
+        self.stream = stream
+        self.length = length
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        remaining = self.length - self.bytes_read
+        if remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        data = self.stream.read(size)
+        self.bytes_read += len(data)
+        return data
+
+    def seekable(self):
+        return False
+
+
+class _PartsReader:
+    """Reads the stored chunks of an upload one after the other"""
+
+    closed = False
+
+    def __init__(self, part_names, storage=default_storage):
+        self.part_names = list(part_names)
+        self.storage = storage
+        self.current = None
+
+    def read(self, size=-1):
+        chunks = []
+        while size is None or size < 0 or size > 0:
+            if self.current is None:
+                if not self.part_names:
+                    break
+                self.current = self.storage.open(self.part_names.pop(0), 'rb')
+
+            data = self.current.read(size if size and size > 0 else READ_BUFFER_SIZE)
+            if not data:
+                self.current.close()
+                self.current = None
+                continue
+
+            chunks.append(data)
+            if size is not None and size > 0:
+                size -= len(data)
+        return b''.join(chunks)
+
+    def seekable(self):
+        return False
+
+    def close(self):
+        if self.current is not None:
+            self.current.close()
+            self.current = None
+
+
+def max_chunk_size():
+    return settings.ATTACHMENT_UPLOAD_CHUNK_SIZE
+
+
+def expiration_cutoff():
+    """Uploads created before this are considered abandoned"""
+    return timezone.now() - timedelta(hours=settings.ATTACHMENT_UPLOAD_EXPIRATION_HOURS)
+
+
+def store_chunk(upload, offset, stream, length):
+    """
+    Stream `length` bytes from `stream` into a new chunk and advance the
+    upload offset.
+
+    The chunk is written before the upload row is locked, so slow clients
+    do not hold database locks. If another request advanced the offset in
+    the meantime, the chunk is discarded.
+
+    Raises:
+        UploadOffsetMismatch: `offset` is not the current upload offset
+        IncompleteChunk: the client sent fewer than `length` bytes
+
+    Returns:
+        AttachmentUpload with the new offset
+    """
+    if offset != upload.offset:
+        raise UploadOffsetMismatch(upload.offset)
+
+    reader = _LimitedReader(stream, length)
+    part_name = default_storage.save(
+        f'{PARTS_PREFIX}/{upload.pk}/{offset:012d}.part',
+        File(reader, name=f'{offset:012d}.part')
+    )
+
+    if reader.bytes_read != length:
+        default_storage.delete(part_name)
+        raise IncompleteChunk()
+
+    with transaction.atomic():
+        locked = AttachmentUpload.objects.select_for_update().get(pk=upload.pk)
+        if locked.offset != offset or locked.is_committed:
+            default_storage.delete(part_name)
+            raise UploadOffsetMismatch(locked.offset)
+
+        locked.parts = locked.parts + [part_name]
+        locked.offset = offset + length
+        locked.save(update_fields=['parts', 'offset', 'updated_at'])
+
+    return locked
+
+
+def _write_parts(part_names, name):
+    """Stream the chunks, in order, into one stored file"""
+    reader = _PartsReader(part_names)
+    try:
+        return default_storage.save(name, File(reader, name=os.path.basename(name)))
+    finally:
+        reader.close()
+
+
+def _upload_blob(upload):
+    """
+    Reference the blob holding the upload's content, storing it if new.
+
+    Raises:
+        ChecksumMismatch: the chunks do not hash to the declared SHA-256
+        UploadOffsetMismatch: the content the upload started from is gone
+            (start again from offset 0)
+    """
+    if not upload.parts:
+        # Started complete: the declared content was already stored
+        blob = reference_blob(upload.sha256)
+        if blob is None:
+            raise UploadOffsetMismatch(0)
+        return blob
+
+    reader = _PartsReader(upload.parts)
+    try:
+        sha256, _ = hash_stream(reader)
+    finally:
+        reader.close()
+
+    if upload.sha256 and sha256 != upload.sha256:
+        raise ChecksumMismatch()
+
+    blob, _ = acquire_blob(
+        sha256, upload.file_size, upload.file_name,
+        lambda name: _write_parts(upload.parts, name)
+    )
+    return blob
+
+
+def commit_upload(upload):
+    """
+    Create the Attachment from a fully received upload.
+
+    The stored chunks become the attachment's blob; the Attachment
+    post_save signals update the case counters and log the timeline
+    event. Committing twice returns the same attachment.
+
+    Raises:
+        ChecksumMismatch, UploadOffsetMismatch: the upload was reset to
+            offset 0 and must be sent again
+
+    Returns:
+        Attachment
+    """
+    try:
+        return _commit_upload(upload)
+    except (ChecksumMismatch, UploadOffsetMismatch):
+        restart_upload(upload)
+        raise
+
+
+def _commit_upload(upload):
+    with batch_events():
+        upload = AttachmentUpload.objects.select_for_update().get(pk=upload.pk)
+        if upload.is_committed:
+            return upload.attachment
+
+        blob = _upload_blob(upload)
+
+        _, ext = os.path.splitext(upload.file_name)
+        attachment = Attachment(
+            case_id=upload.case_id,
+            attachment_type=upload.attachment_type,
+            file=blob.file.name,
+            blob=blob,
+            file_name=upload.file_name,
+            file_type=ext.upper().replace('.', ''),
+            file_size=upload.file_size,
+            uploaded_by_id=upload.uploaded_by_id
+        )
+        attachment.save()
+
+        part_names = upload.parts
+        upload.attachment = attachment
+        upload.parts = []
+        upload.save(update_fields=['attachment', 'parts', 'updated_at'])
+
+        transaction.on_commit(lambda: delete_parts(part_names))
+
+    logger.info(f"Upload {upload.pk} committed as attachment {attachment.pk} ({upload.file_size} bytes)")
+    return attachment
+
+
+def delete_parts(part_names):
+    """Remove stored chunks (missing ones are ignored)"""
+    for name in part_names:
+        try:
+            default_storage.delete(name)
+        except Exception as e:
+            logger.warning(f"Could not delete upload chunk {name}: {e}")
+
+
+def restart_upload(upload):
+    """Discard what was received so the upload starts again from offset 0"""
+    with transaction.atomic():
+        upload = AttachmentUpload.objects.select_for_update().get(pk=upload.pk)
+        part_names = upload.parts
+        upload.parts = []
+        upload.offset = 0
+        upload.save(update_fields=['parts', 'offset', 'updated_at'])
+        transaction.on_commit(lambda: delete_parts(part_names))
+
+
+def abort_upload(upload):
+    """Delete an unfinished upload and its chunks"""
+    part_names = upload.parts
+    upload.delete()
+    delete_parts(part_names)
+
+
+def cleanup_expired_uploads():
+    """
+    Remove abandoned (uncommitted) uploads and committed sessions past the
+    expiration window.
+
+    Returns:
+        int: Number of upload sessions removed
+    """
+    removed = 0
+    expired = AttachmentUpload.objects.filter(created_at__lt=expiration_cutoff())
+
+    for upload in expired.iterator():
+        abort_upload(upload)
+        removed += 1
+
+    return removed
@@ -4,11 +4,12 @@ URL configuration for the assistance module.
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import AssistanceCaseViewSet, AttachmentViewSet
+from .views import AssistanceCaseViewSet, AttachmentViewSet, AttachmentUploadViewSet
 
 router = DefaultRouter()
 router.register(r'cases', AssistanceCaseViewSet, basename='assistancecase')
 router.register(r'attachments', AttachmentViewSet, basename='attachment')
+router.register(r'uploads', AttachmentUploadViewSet, basename='attachmentupload')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -5,30 +5,48 @@ Implements REST API endpoints for assistance cases and attachments,
 including approval workflow and file uploads.
 """
 
-from rest_framework import viewsets, status, filters
+from rest_framework import viewsets, mixins, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
+from django.db import IntegrityError
+from django.http import Http404
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 import django_filters
+import os
 
-from .models import AssistanceCase, Attachment
+from .models import AssistanceCase, Attachment, AttachmentUpload, CaseTimeline
 from .serializers import (
     AssistanceCaseListSerializer,
     AssistanceCaseDetailSerializer,
     AssistanceCaseCreateSerializer,
     AttachmentSerializer,
+    AttachmentUploadSerializer,
+    AttachmentPresignSerializer,
+    DirectUploadConfirmSerializer,
     CaseApprovalSerializer,
     CaseRejectionSerializer,
     BankInfoSerializer,
     ConfirmTransferSerializer,
     SubmitMemberProofSerializer,
     CompleteCaseSerializer,
-    DirectDonationSerializer
+    DirectDonationSerializer,
+    CaseTimelineSerializer,
+    CaseTransitionSerializer,
+    BulkCaseActionSerializer
 )
-from .permissions import CanCreateCase, CanApproveCase, CanEditCase
+from .permissions import CanCreateCase, CanApproveCase, CanEditCase, can_upload_attachment
+from .timeline import batch_events
+from .pagination import (
+    AssistanceCaseCursorPagination,
+    CaseTimelineCursorPagination,
+    wants_cursor_pagination
+)
+from .search import search_cases
+from .visibility import visible_cases, visible_attachments
 
 
 class AssistanceCaseFilter(django_filters.FilterSet):
@@ -40,6 +58,32 @@ class AssistanceCaseFilter(django_filters.FilterSet):
         fields = ['status', 'created_by', 'exclude_status']
 
 
+class CaseSearchFilter(filters.SearchFilter):
+    """
+    `?search=` backed by the full-text index (see assistance/search.py).
+
+    Matches title and public_description only and annotates `search_rank`.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = ' '.join(self.get_search_terms(request))
+        if not query:
+            return queryset
+        return search_cases(queryset, query)
+
+
+class CaseOrderingFilter(filters.OrderingFilter):
+    """Order search results by relevance unless `?ordering=` is given"""
+
+    def get_ordering(self, request, queryset, view):
+        if (
+            not request.query_params.get(self.ordering_param)
+            and 'search_rank' in queryset.query.annotations
+        ):
+            return ['-search_rank', '-created_at']
+        return super().get_ordering(request, queryset, view)
+
+
 class AssistanceCaseViewSet(viewsets.ModelViewSet):
     """
     ViewSet for assistance cases.
@@ -55,19 +99,42 @@ class AssistanceCaseViewSet(viewsets.ModelViewSet):
     - POST /api/assistance/cases/{id}/approve/ - Approve case (Fiscal Council)
     - POST /api/assistance/cases/{id}/reject/ - Reject case (Fiscal Council)
     - POST /api/assistance/cases/{id}/submit/ - Submit draft for approval
+    - GET /api/assistance/cases/{id}/timeline/ - Paginated case history
+    - POST /api/assistance/cases/bulk_action/ - Apply one action to many cases
+    - GET /api/assistance/cases/{id}/download_all/ - ZIP of the case's attachments
+    - GET /api/assistance/cases/download_all/ - ZIP of a filtered set of cases
+    - GET /api/assistance/cases/{id}/dossier/ - Accountability PDF (completed cases)
+
+    Workflow actions (approve, reject, submit, submit_bank_info,
+    confirm_transfer, submit_member_proof, complete) return the full case by
+    default, or only the status delta with `Prefer: return=minimal` /
+    `?return=minimal`.
+
+    Listings (list, my_cases, pending) accept `?pagination=cursor` for
+    cursor pagination ordered by (created_at, id); page-number pagination
+    remains the default.
     """
 
+    # Listings use the denormalized attachment counters; attachments are
+    # only prefetched for detail responses (see get_queryset)
     queryset = AssistanceCase.objects.all().select_related(
         'created_by', 'reviewed_by'
-    ).prefetch_related('attachments')
+    )
 
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filter_backends = [DjangoFilterBackend, CaseSearchFilter, CaseOrderingFilter]
     filterset_class = AssistanceCaseFilter
-    search_fields = ['title', 'public_description']
+    search_fields = ['title', 'public_description']  # indexed by assistance.search
     ordering_fields = ['created_at', 'updated_at', 'total_value']
     ordering = ['-created_at']
 
+    @property
+    def paginator(self):
+        """Use cursor pagination when the client opts in via query parameter"""
+        if not hasattr(self, '_paginator') and wants_cursor_pagination(self.request):
+            self._paginator = AssistanceCaseCursorPagination()
+        return super().paginator
+
     def get_serializer_class(self):
         """Return appropriate serializer based on action"""
         if self.action == 'list':
@@ -84,7 +151,7 @@ class AssistanceCaseViewSet(viewsets.ModelViewSet):
         """Set permissions based on action"""
         if self.action == 'create':
             return [IsAuthenticated(), CanCreateCase()]
-        elif self.action in ['approve', 'reject']:
+        elif self.action in ['approve', 'reject', 'download_all_cases', 'dossier']:
             return [IsAuthenticated(), CanApproveCase()]
         elif self.action in ['update', 'partial_update', 'destroy']:
             return [IsAuthenticated(), CanEditCase()]
@@ -100,25 +167,48 @@ class AssistanceCaseViewSet(viewsets.ModelViewSet):
         - Admin: All cases
         """
         user = self.request.user
+        queryset = self.queryset
+        if self.action not in (
+            'list', 'timeline', 'bulk_action', 'download_all', 'download_all_cases', 'dossier'
+        ) and not self._wants_minimal_response(self.request):
+            queryset = queryset.prefetch_related('attachments')
 
-        # Admin sees everything
-        if user.role == 'SUPER_ADMIN':
-            return self.queryset
+        return visible_cases(queryset, user)
 
-        # Fiscal Council sees everything (need to approve/validate)
-        if user.role == 'FISCAL_COUNCIL':
-            return self.queryset
+    def _wants_minimal_response(self, request):
+        """
+        True for `Prefer: return=minimal` (RFC 7240) or `?return=minimal`.
+        """
+        if request.query_params.get('return') == 'minimal':
+            return True
+        preferences = request.headers.get('Prefer', '')
+        return any(
+            preference.strip().lower() == 'return=minimal'
+            for preference in preferences.split(',')
+        )
 
-        # Board sees their own + completed
-        if user.role == 'BOARD':
-            return self.queryset.filter(
-                Q(created_by=user) | Q(status='completed')
-            )
+    def _transition_response(self, request, case, before, message=None):
+        """
+        Respond to a workflow action.
 
-        # Regular members see their own cases + completed cases
-        return self.queryset.filter(
-            Q(created_by=user) | Q(status='completed')
-        )
+        Full case detail by default; only the new status, changed timestamps
+        and new timeline event when the client asks for a minimal response.
+        Actions that return a message keep their {message, case} envelope.
+        """
+        if self._wants_minimal_response(request):
+            data = CaseTransitionSerializer(
+                case, context={'request': request, 'before': before}
+            ).data
+        else:
+            data = AssistanceCaseDetailSerializer(case, context={'request': request}).data
+
+        if message is not None:
+            data = {'message': message, 'case': data}
+
+        response = Response(data, status=status.HTTP_200_OK)
+        if self._wants_minimal_response(request):
+            response['Preference-Applied'] = 'return=minimal'
+        return response
 
     @action(detail=True, methods=['post'], permission_classes=[IsAuthenticated, CanApproveCase])
     def approve(self, request, pk=None):
@@ -134,10 +224,9 @@ class AssistanceCaseViewSet(viewsets.ModelViewSet):
         serializer = CaseApprovalSerializer(case, data={}, context={'request': request})
 
         if serializer.is_valid():
+            before = CaseTransitionSerializer.snapshot(case)
             serializer.save()
-            # Return full case data
-            detail_serializer = AssistanceCaseDetailSerializer(case, context={'request': request})
-            return Response(detail_serializer.data, status=status.HTTP_200_OK)
+            return self._transition_response(request, case, before)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -157,10 +246,9 @@ class AssistanceCaseViewSet(viewsets.ModelViewSet):
         serializer = CaseRejectionSerializer(case, data=request.data, context={'request': request})
 
         if serializer.is_valid():
+            before = CaseTransitionSerializer.snapshot(case)
             serializer.save()
-            # Return full case data
-            detail_serializer = AssistanceCaseDetailSerializer(case, context={'request': request})
-            return Response(detail_serializer.data, status=status.HTTP_200_OK)
+            return self._transition_response(request, case, before)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -192,10 +280,10 @@ class AssistanceCaseViewSet(viewsets.ModelViewSet):
             )
 
         # Submit case
+        before = CaseTransitionSerializer.snapshot(case)
         success = case.submit_for_approval()
         if success:
-            serializer = AssistanceCaseDetailSerializer(case, context={'request': request})
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return self._transition_response(request, case, before)
 
         return Response(
             {'error': 'Falha ao enviar o caso para aprovação.'},
@@ -220,12 +308,12 @@ class AssistanceCaseViewSet(viewsets.ModelViewSet):
         serializer = BankInfoSerializer(case, data=request.data, context={'request': request})
 
         if serializer.is_valid():
+            before = CaseTransitionSerializer.snapshot(case)
             serializer.save()
-            detail_serializer = AssistanceCaseDetailSerializer(case, context={'request': request})
-            return Response({
-                'message': 'Dados bancários enviados com sucesso! Aguardando transferência do admin.',
-                'case': detail_serializer.data
-            }, status=status.HTTP_200_OK)
+            return self._transition_response(
+                request, case, before,
+                message='Dados bancários enviados com sucesso! Aguardando transferência do admin.'
+            )
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -242,12 +330,12 @@ class AssistanceCaseViewSet(viewsets.ModelViewSet):
         serializer = ConfirmTransferSerializer(case, data={}, context={'request': request})
 
         if serializer.is_valid():
+            before = CaseTransitionSerializer.snapshot(case)
             serializer.save()
-            detail_serializer = AssistanceCaseDetailSerializer(case, context={'request': request})
-            return Response({
-                'message': 'Transferência confirmada. Aguardando comprovação do membro.',
-                'case': detail_serializer.data
-            }, status=status.HTTP_200_OK)
+            return self._transition_response(
+                request, case, before,
+                message='Transferência confirmada. Aguardando comprovação do membro.'
+            )
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -264,12 +352,12 @@ class AssistanceCaseViewSet(viewsets.ModelViewSet):
         serializer = SubmitMemberProofSerializer(case, data={}, context={'request': request})
 
         if serializer.is_valid():
+            before = CaseTransitionSerializer.snapshot(case)
             serializer.save()
-            detail_serializer = AssistanceCaseDetailSerializer(case, context={'request': request})
-            return Response({
-                'message': 'Comprovantes enviados. Aguardando validação do administrador.',
-                'case': detail_serializer.data
-            }, status=status.HTTP_200_OK)
+            return self._transition_response(
+                request, case, before,
+                message='Comprovantes enviados. Aguardando validação do administrador.'
+            )
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -287,15 +375,136 @@ class AssistanceCaseViewSet(viewsets.ModelViewSet):
         serializer = CompleteCaseSerializer(case, data={}, context={'request': request})
 
         if serializer.is_valid():
+            before = CaseTransitionSerializer.snapshot(case)
             serializer.save()
-            detail_serializer = AssistanceCaseDetailSerializer(case, context={'request': request})
-            return Response({
-                'message': 'Caso validado e concluído com sucesso!',
-                'case': detail_serializer.data
-            }, status=status.HTTP_200_OK)
+            return self._transition_response(
+                request, case, before,
+                message='Caso validado e concluído com sucesso!'
+            )
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=True, methods=['get'])
+    def timeline(self, request, pk=None):
+        """
+        Cursor-paginated timeline of a case, oldest first.
+
+        Request: GET /api/assistance/cases/{id}/timeline/
+        Query params:
+        - since: ISO datetime, only events created after it (incremental fetch)
+        - page_size: Events per page (default: 50, max: 200)
+        Response: { next, previous, results }
+        """
+        case = self.get_object()
+        events = CaseTimeline.objects.filter(case=case).select_related('user')
+
+        since = request.query_params.get('since')
+        if since:
+            since_dt = parse_datetime(since)
+            if since_dt is None:
+                return Response(
+                    {'error': 'Parâmetro since inválido. Use o formato ISO 8601.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if timezone.is_naive(since_dt):
+                since_dt = timezone.make_aware(since_dt)
+            events = events.filter(created_at__gt=since_dt)
+
+        paginator = CaseTimelineCursorPagination()
+        page = paginator.paginate_queryset(events, request, view=self)
+        serializer = CaseTimelineSerializer(page, many=True, context={'request': request})
+        return paginator.get_paginated_response(serializer.data)
+
+    def _zip_response(self, attachments, file_name):
+        from django.http import StreamingHttpResponse
+        from django.utils.http import content_disposition_header
+        from .exports import stream_attachments_zip
+
+        response = StreamingHttpResponse(
+            stream_attachments_zip(attachments), content_type='application/zip'
+        )
+        response['Content-Disposition'] = content_disposition_header(True, file_name)
+        response['Cache-Control'] = 'private, no-store'
+        # Pass chunks through instead of buffering the archive in nginx
+        response['X-Accel-Buffering'] = 'no'
+        return response
+
+    @action(detail=True, methods=['get'])
+    def download_all(self, request, pk=None):
+        """
+        Stream a ZIP with every attachment of the case and a manifest.csv.
+
+        Files are read from storage in chunks and written to the response
+        as the archive is built (see assistance.exports).
+
+        Request: GET /api/assistance/cases/{id}/download_all/
+        Response: application/zip
+        """
+        from .exports import export_file_name
+
+        case = self.get_object()
+        return self._zip_response(
+            Attachment.objects.filter(case=case), export_file_name(case)
+        )
+
+    @action(
+        detail=False, methods=['get'], url_path='download_all', url_name='download-all-cases',
+        permission_classes=[IsAuthenticated, CanApproveCase]
+    )
+    def download_all_cases(self, request):
+        """
+        Stream a ZIP with the attachments of every case matching the listing
+        filters (status, created_by, exclude_status, search), one directory
+        per case.
+
+        Only Fiscal Council and Admin can export several cases at once.
+
+        Request: GET /api/assistance/cases/download_all/?status=completed
+        Response: application/zip
+        """
+        from .exports import export_file_name
+
+        cases = self.filter_queryset(self.get_queryset()).order_by()
+        return self._zip_response(
+            Attachment.objects.filter(case__in=cases.values('pk')),
+            export_file_name()
+        )
+
+    @action(detail=True, methods=['get'], permission_classes=[IsAuthenticated, CanApproveCase])
+    def dossier(self, request, pk=None):
+        """
+        Accountability PDF of a completed case (see assistance.dossiers).
+
+        It holds internal notes and bank data, so only Fiscal Council and
+        Admin can access it.
+
+        Served from storage while the case and its attachments are
+        unchanged; otherwise a background render is queued and 202 returned
+        (poll again shortly).
+
+        Request: GET /api/assistance/cases/{id}/dossier/
+        Query: download=1 (save instead of display)
+        Response: application/pdf, or 202 {status: 'generating'}
+        """
+        from .downloads import serve_file
+        from .dossiers import DossierError, request_dossier
+
+        case = self.get_object()
+        try:
+            dossier, cache_key = request_dossier(case)
+        except DossierError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if dossier is None:
+            response = Response({'status': 'generating'}, status=status.HTTP_202_ACCEPTED)
+            response['Retry-After'] = '10'
+            return response
+
+        return serve_file(
+            request, dossier.file.name, f'dossie-caso-{case.pk}.pdf',
+            etag=f'"{cache_key}"', as_attachment=request.query_params.get('download') == '1'
+        )
+
     @action(detail=False, methods=['get'])
     def my_cases(self, request):
         """
@@ -367,6 +576,46 @@ class AssistanceCaseViewSet(viewsets.ModelViewSet):
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['post'], permission_classes=[IsAuthenticated, CanApproveCase])
+    def bulk_action(self, request):
+        """
+        Apply one workflow action to several cases at once.
+
+        Each case is validated like the single-case action; valid cases are
+        updated in one transaction (batched UPDATE and timeline INSERT) and
+        invalid ones are reported without blocking the rest.
+
+        Request: POST /api/assistance/cases/bulk_action/
+        Body: {
+            "action": "approve" | "reject" | "confirm_transfer" | "complete",
+            "case_ids": [1, 2, 3],
+            "rejection_reason": "..."  (reject only)
+        }
+        Response: {action, succeeded, failed, results: [{id, success, case | errors}]}
+        """
+        from .bulk import apply_bulk_action
+
+        serializer = BulkCaseActionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        data = serializer.validated_data
+        results = apply_bulk_action(
+            self.get_queryset(),
+            data['action'],
+            data['case_ids'],
+            {'rejection_reason': data.get('rejection_reason', '')},
+            request
+        )
+        succeeded = sum(1 for result in results if result['success'])
+
+        return Response({
+            'action': data['action'],
+            'succeeded': succeeded,
+            'failed': len(results) - succeeded,
+            'results': results
+        }, status=status.HTTP_200_OK)
+
 
 class AttachmentViewSet(viewsets.ModelViewSet):
     """
@@ -379,6 +628,9 @@ class AttachmentViewSet(viewsets.ModelViewSet):
     - POST /api/assistance/attachments/ - Upload attachment
     - GET /api/assistance/attachments/{id}/ - Get attachment detail
     - DELETE /api/assistance/attachments/{id}/ - Delete attachment (creator only)
+    - POST /api/assistance/attachments/presign/ - Direct-to-bucket upload policy (USE_S3)
+    - POST /api/assistance/attachments/confirm/ - Record a direct upload
+    - GET /api/assistance/attachments/{id}/download/ - Protected download
     """
 
     queryset = Attachment.objects.all().select_related('case', 'uploaded_by')
@@ -388,37 +640,21 @@ class AttachmentViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['case']
 
+    def initialize_request(self, request, *args, **kwargs):
+        """Hash uploaded files while they are received (see assistance.blobs)"""
+        from .blobs import hashing_upload_handlers
+        request.upload_handlers = hashing_upload_handlers(request)
+        return super().initialize_request(request, *args, **kwargs)
+
     def get_queryset(self):
         """
         Filter attachments based on case visibility.
-        Users can only see attachments for cases they have access to.
+        Users can only see attachments for cases they have access to
+        (same rules as AssistanceCaseViewSet, see assistance.visibility).
         """
-        user = self.request.user
-
-        # Admin sees all attachments
-        if user.role == 'SUPER_ADMIN':
-            return self.queryset
-
-        # Filter based on visible cases
-        # Get case IDs user has access to
-        if user.role == 'FISCAL_COUNCIL':
-            visible_case_ids = AssistanceCase.objects.filter(
-                Q(status='pending_approval') | Q(status='approved')
-            ).values_list('id', flat=True)
-        elif user.role == 'BOARD':
-            visible_case_ids = AssistanceCase.objects.filter(
-                Q(created_by=user) | Q(status='approved')
-            ).values_list('id', flat=True)
-        else:
-            # Regular members see attachments from:
-            # 1. Their own cases (any status)
-            # 2. Approved cases (public)
-            visible_case_ids = AssistanceCase.objects.filter(
-                Q(created_by=user) | Q(status='approved')
-            ).values_list('id', flat=True)
-
-        return self.queryset.filter(case_id__in=visible_case_ids)
+        return visible_attachments(self.queryset, self.request.user)
 
+    @batch_events()
     def perform_create(self, serializer):
         """
         Validate case access before allowing upload.
@@ -428,35 +664,162 @@ class AttachmentViewSet(viewsets.ModelViewSet):
         attachment_type = serializer.validated_data.get('attachment_type', 'other')
         user = self.request.user
 
-        # Admin can always upload
-        if user.role == 'SUPER_ADMIN':
+        if can_upload_attachment(user, case, attachment_type):
             serializer.save(uploaded_by=user)
             return
 
-        # Fiscal Council can upload to pending cases or awaiting transfer (payment_proof)
-        if user.role == 'FISCAL_COUNCIL':
-            if case.status == 'pending_approval':
-                serializer.save(uploaded_by=user)
-                return
-            if case.status == 'awaiting_transfer' and attachment_type == 'payment_proof':
-                serializer.save(uploaded_by=user)
-                return
-
-        # Member can upload to their own cases in specific statuses
-        if case.created_by == user:
-            # Can edit drafts and rejected cases
-            if case.can_be_edited:
-                serializer.save(uploaded_by=user)
-                return
-            # Can upload member proof when awaiting it
-            if case.status == 'awaiting_member_proof' and attachment_type == 'photo_evidence':
-                serializer.save(uploaded_by=user)
-                return
-
         # Otherwise, deny
         from rest_framework.exceptions import PermissionDenied
         raise PermissionDenied("Você não tem permissão para adicionar anexos a este caso.")
 
+    @action(detail=False, methods=['post'])
+    def presign(self, request):
+        """
+        Upload policy for sending a file straight to the bucket (USE_S3).
+
+        Request: POST /api/assistance/attachments/presign/
+        Body: {case, attachment_type, file_name}
+        Response: {url, fields, token, expires_in}; POST the file to `url`
+        as multipart form data with `fields`, then call confirm/ with the token
+        """
+        from .direct_uploads import DirectUploadError, issue_upload
+
+        serializer = AttachmentPresignSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        case = serializer.validated_data['case']
+        attachment_type = serializer.validated_data['attachment_type']
+
+        if not can_upload_attachment(request.user, case, attachment_type):
+            from rest_framework.exceptions import PermissionDenied
+            raise PermissionDenied("Você não tem permissão para adicionar anexos a este caso.")
+
+        try:
+            policy = issue_upload(
+                Attachment._meta.get_field('file'),
+                serializer.validated_data['file_name'],
+                Attachment.max_file_size(attachment_type),
+                {'kind': 'attachment', 'user': request.user.pk,
+                 'case': case.pk, 'attachment_type': attachment_type}
+            )
+        except DirectUploadError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(policy, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'])
+    def confirm(self, request):
+        """
+        Record a file uploaded with a presign/ policy as an attachment.
+
+        The object is checked with a HEAD request (size and content type)
+        and hashed before the Attachment row is created; content already
+        stored is deduplicated and the uploaded object removed.
+
+        Request: POST /api/assistance/attachments/confirm/
+        Body: {token}
+        Response: Attachment data (201; 200 when the token was already confirmed)
+        """
+        from .direct_uploads import (
+            DirectUploadError, load_token, store_uploaded_object, verify_uploaded_object
+        )
+
+        serializer = DirectUploadConfirmSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            data = load_token(serializer.validated_data['token'], 'attachment', request.user)
+        except DirectUploadError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Confirming twice returns the attachment already created (200)
+        existing = self._confirmed_attachment(data['name'])
+        if existing is not None:
+            return Response(self.get_serializer(existing).data, status=status.HTTP_200_OK)
+
+        case = AssistanceCase.objects.filter(pk=data['case']).first()
+        if case is None or not can_upload_attachment(request.user, case, data['attachment_type']):
+            from rest_framework.exceptions import PermissionDenied
+            raise PermissionDenied("Você não tem permissão para adicionar anexos a este caso.")
+
+        try:
+            file_size = verify_uploaded_object(data)
+        except DirectUploadError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        _, ext = os.path.splitext(data['file_name'])
+        try:
+            # The blob reference is only kept if the attachment is saved
+            with batch_events():
+                blob = store_uploaded_object(data, file_size)
+                attachment = Attachment(
+                    case=case,
+                    attachment_type=data['attachment_type'],
+                    file=blob.file.name,
+                    blob=blob,
+                    upload_name=data['name'],
+                    file_name=data['file_name'],
+                    file_type=ext.upper().replace('.', ''),
+                    file_size=file_size,
+                    uploaded_by=request.user
+                )
+                attachment.save()
+        except IntegrityError:
+            # A concurrent confirm of the same token created it first
+            existing = self._confirmed_attachment(data['name'])
+            if existing is None:
+                raise
+            return Response(self.get_serializer(existing).data, status=status.HTTP_200_OK)
+
+        return Response(self.get_serializer(attachment).data, status=status.HTTP_201_CREATED)
+
+    def _confirmed_attachment(self, upload_name):
+        """
+        Attachment already created for a direct upload. Looked up by the
+        issued object name: deduplicated content is stored under another.
+        """
+        return self.queryset.filter(upload_name=upload_name).first()
+
+    @action(detail=True, methods=['get'], permission_classes=[AllowAny])
+    def download(self, request, pk=None):
+        """
+        Protected download of the file or one of its renditions.
+
+        Visibility is checked here; the bytes are sent by the web server or
+        S3 (see assistance.downloads), with Range and If-None-Match support.
+        Authenticate normally or with the signed `token` from file_url.
+
+        Request: GET /api/assistance/attachments/{id}/download/
+        Query: token, rendition (thumb, medium), format (webp, jpeg),
+               download=1 (save instead of display)
+        """
+        from rest_framework.generics import get_object_or_404
+        from .downloads import download_user, file_etag, serve_file
+        from .renditions import RENDITION_FORMATS
+
+        user = download_user(request, 'attachment', pk)
+        attachment = get_object_or_404(visible_attachments(Attachment.objects.all(), user), pk=pk)
+        as_attachment = request.query_params.get('download') == '1'
+
+        rendition = request.query_params.get('rendition')
+        if rendition is None:
+            return serve_file(
+                request, attachment.file.name, attachment.file_name,
+                etag=file_etag(attachment.file.name, attachment.blob_id),
+                as_attachment=as_attachment
+            )
+
+        format_name = request.query_params.get('format', 'jpeg')
+        entry = attachment.renditions.get(rendition)
+        if entry is None or format_name not in RENDITION_FORMATS:
+            raise Http404
+        stem, _ = os.path.splitext(attachment.file_name)
+        extension = RENDITION_FORMATS[format_name][0]
+        return serve_file(
+            request, entry[format_name], f'{stem}-{rendition}.{extension}',
+            as_attachment=as_attachment
+        )
+
+    @batch_events()
     def perform_destroy(self, instance):
         """
         Allow deletion only by uploader or admin.
@@ -488,3 +851,172 @@ class AttachmentViewSet(viewsets.ModelViewSet):
         # Otherwise, deny
         from rest_framework.exceptions import PermissionDenied
         raise PermissionDenied("Você só pode remover anexos que você mesmo enviou.")
+
+
+class AttachmentUploadViewSet(mixins.CreateModelMixin,
+                              mixins.RetrieveModelMixin,
+                              mixins.DestroyModelMixin,
+                              viewsets.GenericViewSet):
+    """
+    Resumable chunked uploads for case attachments (see assistance.uploads).
+
+    For large files and unstable connections: the file is sent in small
+    PUTs that can be retried from the last received byte, and each chunk
+    is streamed to storage instead of being buffered by the worker.
+
+    Endpoints:
+    - POST /api/assistance/uploads/ - Start upload {case, attachment_type, file_name, file_size}
+    - HEAD/GET /api/assistance/uploads/{id}/ - Bytes received (Upload-Offset header)
+    - PUT /api/assistance/uploads/{id}/ - Send a chunk (Upload-Offset header, raw body)
+    - POST /api/assistance/uploads/{id}/commit/ - Create the attachment
+    - DELETE /api/assistance/uploads/{id}/ - Abort the upload
+    """
+
+    serializer_class = AttachmentUploadSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        """Users only see their own upload sessions"""
+        return AttachmentUpload.objects.filter(
+            uploaded_by=self.request.user
+        ).select_related('case', 'attachment__uploaded_by')
+
+    def _offset_response(self, upload, status_code=status.HTTP_200_OK, data=None):
+        response = Response(
+            data if data is not None else {'id': str(upload.pk), 'offset': upload.offset},
+            status=status_code
+        )
+        response['Upload-Offset'] = str(upload.offset)
+        response['Upload-Length'] = str(upload.file_size)
+        response['Cache-Control'] = 'no-store'
+        return response
+
+    def perform_create(self, serializer):
+        """Check upload permission for the case before opening a session"""
+        case = serializer.validated_data['case']
+        attachment_type = serializer.validated_data.get('attachment_type', 'other')
+
+        if not can_upload_attachment(self.request.user, case, attachment_type):
+            from rest_framework.exceptions import PermissionDenied
+            raise PermissionDenied("Você não tem permissão para adicionar anexos a este caso.")
+
+        # Content the user can already see is not sent again
+        sha256 = serializer.validated_data.get('sha256')
+        offset = 0
+        if sha256:
+            known = Attachment.objects.filter(
+                blob_id=sha256, blob__size=serializer.validated_data['file_size']
+            )
+            if visible_attachments(known, self.request.user).exists():
+                offset = serializer.validated_data['file_size']
+
+        serializer.save(uploaded_by=self.request.user, offset=offset)
+
+    def retrieve(self, request, *args, **kwargs):
+        """Upload state; HEAD returns only the offset headers"""
+        upload = self.get_object()
+        serializer = self.get_serializer(upload)
+        return self._offset_response(upload, data=serializer.data)
+
+    def update(self, request, *args, **kwargs):
+        """
+        Receive one chunk.
+
+        Request: PUT /api/assistance/uploads/{id}/
+        Headers: Upload-Offset (bytes already received), Content-Length
+        Body: raw bytes
+        Response: {id, offset}; 409 with the current Upload-Offset when the
+        offset does not match (resume from there)
+        """
+        from .uploads import IncompleteChunk, UploadOffsetMismatch, max_chunk_size, store_chunk
+
+        upload = self.get_object()
+        if upload.is_committed:
+            return Response({'error': 'Este envio já foi concluído.'}, status=status.HTTP_409_CONFLICT)
+
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            return Response(
+                {'error': 'Cabeçalhos Upload-Offset e Content-Length são obrigatórios.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if length <= 0:
+            return Response({'error': 'Chunk vazio.'}, status=status.HTTP_400_BAD_REQUEST)
+        if length > max_chunk_size():
+            return Response(
+                {'error': f'Chunk muito grande. Máximo: {max_chunk_size()} bytes.'},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+        if offset + length > upload.file_size:
+            return Response(
+                {'error': 'O chunk ultrapassa o tamanho declarado do arquivo.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            upload = store_chunk(upload, offset, request.stream, length)
+        except UploadOffsetMismatch as e:
+            upload.offset = e.offset
+            return self._offset_response(upload, status.HTTP_409_CONFLICT, {
+                'error': 'Offset incorreto. Continue a partir do Upload-Offset informado.',
+                'offset': e.offset
+            })
+        except IncompleteChunk:
+            return self._offset_response(upload, status.HTTP_400_BAD_REQUEST, {
+                'error': 'Chunk incompleto. Reenvie a partir do Upload-Offset informado.',
+                'offset': upload.offset
+            })
+
+        return self._offset_response(upload)
+
+    @action(detail=True, methods=['post'])
+    def commit(self, request, pk=None):
+        """
+        Create the attachment once every byte was received.
+
+        Request: POST /api/assistance/uploads/{id}/commit/
+        Response: Attachment data (201); repeating the call returns the
+        same attachment. When the content does not match the declared
+        sha256 (400) or known content is gone (409), the upload restarts
+        at offset 0.
+        """
+        from .uploads import ChecksumMismatch, UploadOffsetMismatch, commit_upload
+
+        upload = self.get_object()
+
+        if not upload.is_committed:
+            if not upload.is_complete:
+                return self._offset_response(upload, status.HTTP_409_CONFLICT, {
+                    'error': 'Envio incompleto.',
+                    'offset': upload.offset
+                })
+            # The case may have moved on since the upload started
+            if not can_upload_attachment(request.user, upload.case, upload.attachment_type):
+                from rest_framework.exceptions import PermissionDenied
+                raise PermissionDenied("Você não tem permissão para adicionar anexos a este caso.")
+
+        try:
+            attachment = commit_upload(upload)
+        except ChecksumMismatch:
+            upload.offset = 0
+            return self._offset_response(upload, status.HTTP_400_BAD_REQUEST, {
+                'error': 'O conteúdo recebido não corresponde ao SHA-256 informado. Reenvie o arquivo.',
+                'offset': 0
+            })
+        except UploadOffsetMismatch:
+            upload.offset = 0
+            return self._offset_response(upload, status.HTTP_409_CONFLICT, {
+                'error': 'Arquivo não disponível no servidor. Reenvie o arquivo.',
+                'offset': 0
+            })
+
+        serializer = AttachmentSerializer(attachment, context={'request': request})
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def perform_destroy(self, instance):
+        """Abort the upload and delete its chunks"""
+        from .uploads import abort_upload
+        abort_upload(instance)
@@ -0,0 +1,49 @@
+"""
+Who can see which assistance cases (and everything attached to them).
+
+The rules are plain Q predicates on the case columns. Related models filter
+through their `case` join with a field prefix, so the database resolves
+visibility with the case primary key and the created_by / status indexes
+instead of an `IN (SELECT id FROM assistance_assistancecase ...)` subquery.
+
+- SUPER_ADMIN and FISCAL_COUNCIL: every case
+- BOARD and members: their own cases (any status) + completed (public) cases
+"""
+
+from django.db.models import Q
+
+
+# Roles that review / validate cases and therefore see all of them
+UNRESTRICTED_ROLES = ('SUPER_ADMIN', 'FISCAL_COUNCIL')
+
+# Completed cases are public (transparency feed)
+PUBLIC_STATUS = 'completed'
+
+
+def case_visibility_q(user, prefix=''):
+    """
+    Predicate for cases `user` can see.
+
+    Args:
+        user: Authenticated user
+        prefix: Lookup path to the case (e.g. 'case__' for attachments)
+
+    Returns:
+        Q, or None when the user's role sees every case
+    """
+    if user.role in UNRESTRICTED_ROLES:
+        return None
+
+    return Q(**{f'{prefix}created_by': user}) | Q(**{f'{prefix}status': PUBLIC_STATUS})
+
+
+def visible_cases(queryset, user):
+    """Restrict an AssistanceCase queryset to the cases `user` can see"""
+    predicate = case_visibility_q(user)
+    return queryset if predicate is None else queryset.filter(predicate)
+
+
+def visible_attachments(queryset, user):
+    """Restrict an Attachment queryset to attachments of cases `user` can see"""
+    predicate = case_visibility_q(user, prefix='case__')
+    return queryset if predicate is None else queryset.filter(predicate)
@@ -1,3 +1,35 @@
 from django.contrib import admin
+from orbe_platform.paginators import EstimatedCountPaginator
+from .models import Announcement, FeedEntry
 
-# Register your models here.
+
+@admin.register(Announcement)
+class AnnouncementAdmin(admin.ModelAdmin):
+    """Admin configuration for Announcement model"""
+    list_display = ['id', 'title', 'author', 'is_published', 'published_at', 'created_at']
+    list_filter = ['is_published', 'published_at']
+    search_fields = ['title', 'content']
+    list_select_related = ['author']
+    autocomplete_fields = ['author']
+    readonly_fields = ['published_at', 'created_at', 'updated_at']
+
+
+@admin.register(FeedEntry)
+class FeedEntryAdmin(admin.ModelAdmin):
+    """
+    Read-only view of the feed.
+
+    Entries are written by feed.publishing from their sources; editing the
+    case, donation or announcement refreshes them.
+    """
+    list_display = ['id', 'entry_type', 'source_id', 'published_at', 'like_count']
+    list_filter = ['entry_type']
+    readonly_fields = ['entry_type', 'source_id', 'published_at', 'payload', 'like_count']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
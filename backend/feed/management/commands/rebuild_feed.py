@@ -0,0 +1,24 @@
+"""
+Recompute the transparency feed from the source tables.
+
+Publishes every completed case, verified public donation and published
+announcement, and removes entries whose source is no longer public. Likes
+of entries that stay published are kept. Run it once after deploying the
+feed (backfill) or to repair it.
+
+Usage:
+    python manage.py rebuild_feed
+"""
+
+from django.core.management.base import BaseCommand
+
+from feed.publishing import rebuild_feed
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the feed entries from cases, donations and announcements'
+
+    def handle(self, *args, **options):
+        counts = rebuild_feed()
+        summary = ', '.join(f'{count} {entry_type}' for entry_type, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f'Feed rebuilt: {summary}'))
@@ -0,0 +1,85 @@
+# Generated by Django 4.2.7 on 2026-10-16 22:27
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Announcement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=200, verbose_name='Título')),
+                ('content', models.TextField(verbose_name='Conteúdo')),
+                ('is_published', models.BooleanField(default=False, verbose_name='Publicado')),
+                ('published_at', models.DateTimeField(blank=True, null=True, verbose_name='Publicado em')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Criado em')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Atualizado em')),
+            ],
+            options={
+                'verbose_name': 'Comunicado',
+                'verbose_name_plural': 'Comunicados',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='FeedEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entry_type', models.CharField(choices=[('assistance_case', 'Caso de Assistência Concluído'), ('donation', 'Doação Espontânea'), ('announcement', 'Comunicado')], max_length=20, verbose_name='Tipo')),
+                ('source_id', models.PositiveBigIntegerField(verbose_name='Origem')),
+                ('published_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Publicado em')),
+                ('payload', models.JSONField(default=dict, verbose_name='Conteúdo')),
+                ('like_count', models.PositiveIntegerField(default=0, editable=False, verbose_name='Curtidas')),
+            ],
+            options={
+                'verbose_name': 'Item do Feed',
+                'verbose_name_plural': 'Itens do Feed',
+                'ordering': ['-published_at', '-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='FeedLike',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Curtido em')),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='likes', to='feed.feedentry', verbose_name='Item')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='feed_likes', to=settings.AUTH_USER_MODEL, verbose_name='Usuário')),
+            ],
+            options={
+                'verbose_name': 'Curtida',
+                'verbose_name_plural': 'Curtidas',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(fields=['-published_at', '-id'], name='feed_feeden_publish_429a4e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='feedentry',
+            index=models.Index(fields=['entry_type', '-published_at', '-id'], name='feed_feeden_entry_t_dbf7c1_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='feedentry',
+            constraint=models.UniqueConstraint(fields=('entry_type', 'source_id'), name='feed_entry_unique_source'),
+        ),
+        migrations.AddField(
+            model_name='announcement',
+            name='author',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='announcements', to=settings.AUTH_USER_MODEL, verbose_name='Autor'),
+        ),
+        migrations.AddConstraint(
+            model_name='feedlike',
+            constraint=models.UniqueConstraint(fields=('user', 'entry'), name='feed_like_unique_user_entry'),
+        ),
+    ]
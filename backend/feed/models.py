@@ -1,3 +1,168 @@
+"""
+Transparency feed models.
+
+The feed is precomputed on write (fan-out-on-write): when something becomes
+public - an AssistanceCase is completed, a non-anonymous VoluntaryDonation
+is verified, an Announcement is published - a FeedEntry is written with a
+ready-to-render snapshot of it (see feed.publishing). Reading the timeline
+is one keyset-paginated query on FeedEntry, with no joins back to the
+source tables.
+"""
+
 from django.db import models
+from django.utils import timezone
+from users.models import User
+
+
+class Announcement(models.Model):
+    """
+    Announcement from the Board to all members.
+
+    Appears in the feed while `is_published` is set.
+    """
+
+    title = models.CharField(
+        max_length=200,
+        verbose_name='Título'
+    )
+
+    content = models.TextField(
+        verbose_name='Conteúdo'
+    )
+
+    author = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        related_name='announcements',
+        verbose_name='Autor'
+    )
+
+    is_published = models.BooleanField(
+        default=False,
+        verbose_name='Publicado'
+    )
+
+    # Set the first time the announcement is published
+    published_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Publicado em'
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Criado em'
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Atualizado em'
+    )
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = 'Comunicado'
+        verbose_name_plural = 'Comunicados'
+
+    def __str__(self):
+        return self.title
+
+    def save(self, *args, **kwargs):
+        if self.is_published and self.published_at is None:
+            self.published_at = timezone.now()
+        super().save(*args, **kwargs)
+
+
+class FeedEntry(models.Model):
+    """
+    One item of the transparency feed.
+
+    `payload` is the snapshot rendered by clients (title, text, amounts,
+    names, photo ids); it is refreshed when the source changes while public
+    and the entry is deleted when the source stops being public.
+    """
+
+    ENTRY_TYPE_CHOICES = [
+        ('assistance_case', 'Caso de Assistência Concluído'),
+        ('donation', 'Doação Espontânea'),
+        ('announcement', 'Comunicado'),
+    ]
+
+    entry_type = models.CharField(
+        max_length=20,
+        choices=ENTRY_TYPE_CHOICES,
+        verbose_name='Tipo'
+    )
+
+    # Primary key of the AssistanceCase / VoluntaryDonation / Announcement
+    source_id = models.PositiveBigIntegerField(
+        verbose_name='Origem'
+    )
+
+    published_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Publicado em'
+    )
+
+    payload = models.JSONField(
+        default=dict,
+        verbose_name='Conteúdo'
+    )
+
+    # Kept in sync by FeedLike writes (F() updates, see feed.views)
+    like_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Curtidas'
+    )
+
+    class Meta:
+        ordering = ['-published_at', '-id']
+        verbose_name = 'Item do Feed'
+        verbose_name_plural = 'Itens do Feed'
+        constraints = [
+            models.UniqueConstraint(fields=['entry_type', 'source_id'], name='feed_entry_unique_source'),
+        ]
+        indexes = [
+            # Timeline keyset pagination, all types and per type
+            models.Index(fields=['-published_at', '-id']),
+            models.Index(fields=['entry_type', '-published_at', '-id']),
+        ]
+
+    def __str__(self):
+        return f"{self.get_entry_type_display()} #{self.source_id}"
+
+
+class FeedLike(models.Model):
+    """A member's like on a feed entry"""
+
+    entry = models.ForeignKey(
+        FeedEntry,
+        on_delete=models.CASCADE,
+        related_name='likes',
+        verbose_name='Item'
+    )
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='feed_likes',
+        verbose_name='Usuário'
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Curtido em'
+    )
+
+    class Meta:
+        verbose_name = 'Curtida'
+        verbose_name_plural = 'Curtidas'
+        constraints = [
+            # Also serves "which of these entries did the user like" lookups
+            models.UniqueConstraint(fields=['user', 'entry'], name='feed_like_unique_user_entry'),
+        ]
 
-# Create your models here.
+    def __str__(self):
+        return f"{self.user_id} → {self.entry_id}"
@@ -0,0 +1,24 @@
+"""
+Pagination for the feed module.
+"""
+
+from rest_framework.pagination import CursorPagination
+
+
+class FeedCursorPagination(CursorPagination):
+    """
+    Cursor pagination ordered by (published_at, id), newest first.
+
+    Pages seek on published_at, served by the (-published_at, -id) and
+    (entry_type, -published_at, -id) indexes on FeedEntry; `id` is not part
+    of the cursor and only orders entries published at the same time, which
+    the cursor skips by offset. The ordering is fixed.
+    """
+
+    ordering = ('-published_at', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 50
+
+    def get_ordering(self, request, queryset, view):
+        return self.ordering
@@ -0,0 +1,204 @@
+"""
+Writing the transparency feed (fan-out-on-write).
+
+Each public event gets one FeedEntry holding a snapshot of what the feed
+shows, written in the same transaction as the change that made it public:
+- AssistanceCase reaches `completed`: title, public description, value,
+  completion date and the first photo evidence ids
+- VoluntaryDonation verified and not anonymous: donor name, amount, message
+- Announcement published: title, content, author name
+
+Entries are upserted on (entry_type, source_id), so publishing again only
+refreshes the snapshot (published_at and likes are kept), and deleted when
+the source stops being public (case reopened, donation unverified or made
+anonymous, announcement unpublished, source deleted).
+
+Callers: feed.signals for model saves and deletes; bulk writes that skip
+signals call publish_cases / publish_donations themselves
+(assistance.bulk, the donation admin).
+"""
+
+from django.utils import timezone
+
+from .models import FeedEntry
+
+# Photo evidence ids kept in a case snapshot
+SNAPSHOT_PHOTOS = 4
+
+# Source fields shown in case snapshots: editing them refreshes the entry
+CASE_SNAPSHOT_FIELDS = ('title', 'public_description', 'total_value', 'completed_at')
+
+BATCH_SIZE = 500
+
+
+def _upsert(entries):
+    """Insert entries, refreshing the payload of those already published"""
+    if entries:
+        FeedEntry.objects.bulk_create(
+            entries,
+            update_conflicts=True,
+            unique_fields=['entry_type', 'source_id'],
+            update_fields=['payload'],
+        )
+
+
+def retract(entry_type, source_ids):
+    """Remove the entries of sources that are no longer public"""
+    source_ids = list(source_ids)
+    if source_ids:
+        FeedEntry.objects.filter(entry_type=entry_type, source_id__in=source_ids).delete()
+
+
+def _case_photos(case_ids):
+    """{case_id: [{'id', 'thumb'}]} for the first photos of each case"""
+    from assistance.models import Attachment
+
+    photos = {}
+    if not case_ids:
+        return photos
+    attachments = Attachment.objects.filter(
+        case_id__in=case_ids, attachment_type='photo_evidence'
+    ).order_by('uploaded_at', 'pk').values_list('pk', 'case_id', 'renditions')
+    for pk, case_id, renditions in attachments:
+        case_photos = photos.setdefault(case_id, [])
+        if len(case_photos) < SNAPSHOT_PHOTOS:
+            case_photos.append({'id': pk, 'thumb': 'thumb' in (renditions or {})})
+    return photos
+
+
+def case_snapshot(case, photos):
+    return {
+        'title': case.title,
+        'description': case.public_description,
+        'total_value': str(case.total_value),
+        'completed_at': case.completed_at.isoformat() if case.completed_at else None,
+        'photo_count': case.photo_evidence_count,
+        'photos': photos,
+    }
+
+
+def publish_cases(cases):
+    """Publish (or refresh) completed cases; other cases are retracted"""
+    cases = list(cases)
+    completed = [case for case in cases if case.status == 'completed']
+    retract('assistance_case', [case.pk for case in cases if case.status != 'completed'])
+    if not completed:
+        return
+
+    # Counters are denormalized on the case: skip the lookup when none has photos
+    photos = _case_photos([case.pk for case in completed if case.photo_evidence_count])
+    _upsert([
+        FeedEntry(
+            entry_type='assistance_case',
+            source_id=case.pk,
+            published_at=case.completed_at or timezone.now(),
+            payload=case_snapshot(case, photos.get(case.pk, [])),
+        )
+        for case in completed
+    ])
+
+
+def refresh_case(case_id):
+    """Refresh the snapshot of a published case (its photos changed)"""
+    from assistance.models import AssistanceCase
+
+    if FeedEntry.objects.filter(entry_type='assistance_case', source_id=case_id).exists():
+        publish_cases(AssistanceCase.objects.filter(pk=case_id))
+
+
+def is_public_donation(donation):
+    return donation.is_verified and not donation.is_anonymous and donation.donor_id is not None
+
+
+def donation_snapshot(donation):
+    return {
+        'donor_name': donation.display_name or 'Membro ORBE',
+        'amount': str(donation.amount),
+        'message': donation.message,
+    }
+
+
+def publish_donations(donations):
+    """Publish (or refresh) public donations; the others are retracted"""
+    donations = list(donations)
+    retract('donation', [donation.pk for donation in donations if not is_public_donation(donation)])
+    _upsert([
+        FeedEntry(
+            entry_type='donation',
+            source_id=donation.pk,
+            published_at=donation.verified_at or timezone.now(),
+            payload=donation_snapshot(donation),
+        )
+        for donation in donations if is_public_donation(donation)
+    ])
+
+
+def announcement_snapshot(announcement):
+    author = announcement.author
+    return {
+        'title': announcement.title,
+        'content': announcement.content,
+        'author_name': (author.get_full_name() or 'ORBE') if author else 'ORBE',
+    }
+
+
+def publish_announcement(announcement):
+    """Publish (or refresh) an announcement, or retract it when unpublished"""
+    if not announcement.is_published:
+        retract('announcement', [announcement.pk])
+        return
+    _upsert([FeedEntry(
+        entry_type='announcement',
+        source_id=announcement.pk,
+        published_at=announcement.published_at,
+        payload=announcement_snapshot(announcement),
+    )])
+
+
+def _in_batches(queryset):
+    batch = []
+    for item in queryset.iterator(chunk_size=BATCH_SIZE):
+        batch.append(item)
+        if len(batch) == BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def rebuild_feed():
+    """
+    Recompute every entry from the source tables (initial backfill, repair).
+
+    Returns:
+        dict: {entry_type: number of published entries}
+    """
+    from assistance.models import AssistanceCase
+    from finance.models import VoluntaryDonation
+    from .models import Announcement
+
+    cases = AssistanceCase.objects.filter(status='completed')
+    donations = VoluntaryDonation.objects.filter(
+        verified_by__isnull=False, is_anonymous=False, donor__isnull=False
+    ).select_related('donor')
+    announcements = Announcement.objects.filter(is_published=True).select_related('author')
+
+    for batch in _in_batches(cases):
+        publish_cases(batch)
+    for batch in _in_batches(donations):
+        publish_donations(batch)
+    for announcement in announcements.iterator():
+        publish_announcement(announcement)
+
+    # Entries whose source is gone or no longer public
+    for entry_type, public in (
+        ('assistance_case', cases), ('donation', donations), ('announcement', announcements)
+    ):
+        FeedEntry.objects.filter(entry_type=entry_type).exclude(
+            source_id__in=public.values('pk')
+        ).delete()
+
+    return {
+        entry_type: FeedEntry.objects.filter(entry_type=entry_type).count()
+        for entry_type, _ in FeedEntry.ENTRY_TYPE_CHOICES
+    }
@@ -0,0 +1,84 @@
+"""
+Serializers for the feed module.
+
+Feed entries are rendered from their stored snapshot only; the one thing
+added at read time is the signed download links of case photos (they are
+bound to the requesting user, see assistance.downloads).
+"""
+
+from django.urls import reverse
+from rest_framework import serializers
+
+from assistance.downloads import download_url, with_query
+from .models import Announcement, FeedEntry
+
+
+def _photo_links(photo, request):
+    """Signed links of a case photo from the snapshot"""
+    url = download_url(reverse('attachment-download', args=[photo['id']]), 'attachment', photo['id'], request)
+    return {
+        'id': photo['id'],
+        'url': url,
+        'thumb_url': with_query(url, rendition='thumb', format='jpeg') if photo.get('thumb') else url,
+    }
+
+
+class FeedEntrySerializer(serializers.ModelSerializer):
+    """
+    Feed entry with its snapshot as `data`.
+
+    `liked` comes from the `liked_ids` context set (the requesting user's
+    likes among the serialized entries).
+    """
+    entry_display = serializers.CharField(source='get_entry_type_display', read_only=True)
+    liked = serializers.SerializerMethodField()
+    data = serializers.SerializerMethodField()
+
+    class Meta:
+        model = FeedEntry
+        fields = [
+            'id',
+            'entry_type',
+            'entry_display',
+            'source_id',
+            'published_at',
+            'like_count',
+            'liked',
+            'data'
+        ]
+        read_only_fields = fields
+
+    def get_liked(self, obj):
+        return obj.pk in self.context.get('liked_ids', ())
+
+    def get_data(self, obj):
+        data = dict(obj.payload)
+        if obj.entry_type == 'assistance_case':
+            request = self.context.get('request')
+            data['photos'] = [_photo_links(photo, request) for photo in data.get('photos', [])]
+        return data
+
+
+class AnnouncementSerializer(serializers.ModelSerializer):
+    """Announcements; publishing one (is_published) adds it to the feed"""
+    author_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Announcement
+        fields = [
+            'id',
+            'title',
+            'content',
+            'author',
+            'author_name',
+            'is_published',
+            'published_at',
+            'created_at',
+            'updated_at'
+        ]
+        read_only_fields = ['id', 'author', 'author_name', 'published_at', 'created_at', 'updated_at']
+
+    def get_author_name(self, obj):
+        if obj.author:
+            return obj.author.get_full_name() or obj.author.email
+        return None
@@ -0,0 +1,88 @@
+"""
+Fan-out-on-write triggers for the transparency feed (see feed.publishing).
+
+Entries are written inside the transaction of the change that made the
+source public (or not public anymore). AssistanceCase saves use the loaded
+values tracked on the instance, so saving a case that never was completed
+costs no feed query.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from assistance.models import AssistanceCase, Attachment
+from finance.models import VoluntaryDonation
+from .models import Announcement
+from .publishing import (
+    CASE_SNAPSHOT_FIELDS,
+    publish_announcement,
+    publish_cases,
+    publish_donations,
+    refresh_case,
+    retract,
+)
+
+
+@receiver(post_save, sender=AssistanceCase)
+def publish_completed_case(sender, instance, created, **kwargs):
+    """
+    Publish a case when it reaches `completed`, refresh the snapshot when
+    its public fields change, retract it when it leaves `completed`.
+
+    Runs before TrackedFieldsMixin records the saved values, so the loaded
+    status is still the previous one.
+    """
+    tracked = instance.is_tracked('status')
+    old_status = instance.get_loaded_value('status')
+
+    if instance.status == 'completed':
+        dirty = instance.get_dirty_fields()
+        if created or not tracked or old_status != 'completed' or any(
+            field in dirty for field in CASE_SNAPSHOT_FIELDS
+        ):
+            publish_cases([instance])
+    elif not created and (not tracked or old_status == 'completed'):
+        retract('assistance_case', [instance.pk])
+
+
+@receiver(post_delete, sender=AssistanceCase)
+def retract_deleted_case(sender, instance, **kwargs):
+    retract('assistance_case', [instance.pk])
+
+
+@receiver(post_save, sender=Attachment)
+def refresh_case_on_new_photo(sender, instance, created, **kwargs):
+    """Photo evidence added to a published case (direct donations)"""
+    if created and instance.attachment_type == 'photo_evidence':
+        refresh_case(instance.case_id)
+
+
+@receiver(post_delete, sender=Attachment)
+def refresh_case_on_deleted_photo(sender, instance, **kwargs):
+    if instance.attachment_type == 'photo_evidence':
+        refresh_case(instance.case_id)
+
+
+@receiver(post_save, sender=VoluntaryDonation)
+def publish_verified_donation(sender, instance, created, **kwargs):
+    """Publish verified, non-anonymous donations; retract the others"""
+    if created and not instance.is_verified:
+        return
+    publish_donations([instance])
+
+
+@receiver(post_delete, sender=VoluntaryDonation)
+def retract_deleted_donation(sender, instance, **kwargs):
+    retract('donation', [instance.pk])
+
+
+@receiver(post_save, sender=Announcement)
+def publish_saved_announcement(sender, instance, created, **kwargs):
+    if created and not instance.is_published:
+        return
+    publish_announcement(instance)
+
+
+@receiver(post_delete, sender=Announcement)
+def retract_deleted_announcement(sender, instance, **kwargs):
+    retract('announcement', [instance.pk])
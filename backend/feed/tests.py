@@ -1,3 +1,214 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from assistance.models import AssistanceCase, Attachment
+from finance.models import VoluntaryDonation
+from users.models import User
+
+from .models import Announcement, FeedEntry, FeedLike
+
+
+class FeedPublishingTests(TestCase):
+    """FeedEntry rows are written when sources become (or stop being) public"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = User.objects.create_user(
+            email='membro@orbe.org', username='membro', password='x',
+            first_name='Maria', last_name='Silva'
+        )
+        cls.admin = User.objects.create_user(
+            email='admin@orbe.org', username='admin', password='x',
+            first_name='Ana', last_name='Souza', role='SUPER_ADMIN'
+        )
+
+    def create_case(self, status='pending_validation'):
+        return AssistanceCase.objects.create(
+            title='Cesta básica', public_description='Alimentação', internal_description='Notas',
+            total_value=100, created_by=self.member, status=status,
+            payment_proof_count=1, photo_evidence_count=1
+        )
+
+    def entries(self, entry_type):
+        return FeedEntry.objects.filter(entry_type=entry_type)
+
+    def test_completed_case_is_published_with_snapshot(self):
+        case = self.create_case()
+        Attachment.objects.create(
+            case=case, attachment_type='photo_evidence', file='foto.jpg',
+            file_name='foto.jpg', file_type='JPG', file_size=10
+        )
+        self.assertFalse(self.entries('assistance_case').exists())
+
+        case.complete(reviewer_user=self.admin)
+
+        entry = self.entries('assistance_case').get()
+        self.assertEqual(entry.source_id, case.pk)
+        self.assertEqual(entry.published_at, case.completed_at)
+        self.assertEqual(entry.payload['title'], 'Cesta básica')
+        self.assertEqual(entry.payload['description'], 'Alimentação')
+        self.assertNotIn('Notas', str(entry.payload))
+        self.assertEqual(len(entry.payload['photos']), 1)
+
+    def test_editing_published_case_refreshes_snapshot_and_keeps_likes(self):
+        case = self.create_case()
+        case.complete(reviewer_user=self.admin)
+        entry = self.entries('assistance_case').get()
+        FeedLike.objects.create(entry=entry, user=self.member)
+
+        case.title = 'Cesta básica (atualizado)'
+        case.save()
+
+        entry = self.entries('assistance_case').get()
+        self.assertEqual(entry.payload['title'], 'Cesta básica (atualizado)')
+        self.assertEqual(entry.likes.count(), 1)
+
+    def test_case_leaving_completed_is_retracted(self):
+        case = self.create_case()
+        case.complete(reviewer_user=self.admin)
+
+        case.status = 'pending_validation'
+        case.save()
+
+        self.assertFalse(self.entries('assistance_case').exists())
+
+    def test_bulk_complete_publishes_cases(self):
+        cases = [self.create_case() for _ in range(2)]
+        client = APIClient()
+        client.force_authenticate(self.admin)
+
+        response = client.post('/api/assistance/cases/bulk_action/', {
+            'action': 'complete', 'case_ids': [case.pk for case in cases]
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            set(self.entries('assistance_case').values_list('source_id', flat=True)),
+            {case.pk for case in cases}
+        )
+
+    def test_only_verified_public_donations_are_published(self):
+        public = VoluntaryDonation.objects.create(donor=self.member, amount=50, message='Força!')
+        anonymous = VoluntaryDonation.objects.create(donor=self.member, amount=20, is_anonymous=True)
+        self.assertFalse(self.entries('donation').exists())
+
+        for donation in (public, anonymous):
+            donation.verified_by = self.admin
+            donation.verified_at = timezone.now()
+            donation.save()
+
+        entry = self.entries('donation').get()
+        self.assertEqual(entry.source_id, public.pk)
+        self.assertEqual(entry.payload['donor_name'], 'Maria Silva')
+
+        public.is_anonymous = True
+        public.save()
+        self.assertFalse(self.entries('donation').exists())
+
+    def test_announcement_publish_and_unpublish(self):
+        announcement = Announcement.objects.create(title='Assembleia', content='Dia 10', author=self.admin)
+        self.assertFalse(self.entries('announcement').exists())
+
+        announcement.is_published = True
+        announcement.save()
+        self.assertEqual(self.entries('announcement').get().payload['author_name'], 'Ana Souza')
+
+        announcement.is_published = False
+        announcement.save()
+        self.assertFalse(self.entries('announcement').exists())
+
+    def test_rebuild_command_restores_entries(self):
+        case = self.create_case()
+        case.complete(reviewer_user=self.admin)
+        FeedEntry.objects.all().delete()
+        FeedEntry.objects.create(entry_type='donation', source_id=9999)
+
+        call_command('rebuild_feed', stdout=StringIO())
+
+        self.assertEqual(
+            list(FeedEntry.objects.values_list('entry_type', 'source_id')),
+            [('assistance_case', case.pk)]
+        )
+
+
+class TimelineTests(TestCase):
+    """GET /api/feed/timeline/ and likes"""
+
+    url = '/api/feed/timeline/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = User.objects.create_user(email='membro@orbe.org', username='membro', password='x')
+        cls.other = User.objects.create_user(email='outro@orbe.org', username='outro', password='x')
+        now = timezone.now()
+        cls.entries = FeedEntry.objects.bulk_create([
+            FeedEntry(
+                entry_type='announcement', source_id=index, payload={'title': f'Comunicado {index}'},
+                published_at=now - timezone.timedelta(minutes=index % 3)
+            )
+            for index in range(25)
+        ])
+        FeedLike.objects.create(entry=cls.entries[0], user=cls.member)
+        FeedLike.objects.create(entry=cls.entries[1], user=cls.other)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.member)
+
+    def test_pages_walk_every_entry_once_in_order(self):
+        seen = []
+        url = self.url
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen += [(entry['published_at'], entry['id']) for entry in response.data['results']]
+            url = response.data['next']
+
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(len(set(seen)), 25)
+        self.assertEqual(seen, sorted(seen, reverse=True))
+
+    def test_page_query_count_does_not_grow_with_page_size(self):
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(self.url, {'page_size': 5})
+        with CaptureQueriesContext(connection) as large:
+            self.client.get(self.url, {'page_size': 25})
+
+        self.assertEqual(len(small), len(large))
+
+    def test_liked_flag_is_per_user(self):
+        response = self.client.get(self.url, {'page_size': 50})
+
+        liked = {entry['id'] for entry in response.data['results'] if entry['liked']}
+        self.assertEqual(liked, {self.entries[0].pk})
+
+    def test_like_and_unlike_keep_the_counter(self):
+        entry = self.entries[2]
+        url = f'/api/feed/posts/{entry.pk}/like/'
+
+        for _ in range(2):
+            response = self.client.post(url)
+            self.assertEqual(response.data, {'liked': True, 'like_count': 1})
+
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self.client.post(url).data['like_count'], 2)
+
+        for _ in range(2):
+            response = self.client.delete(url)
+            self.assertEqual(response.data, {'liked': False, 'like_count': 1})
+
+    def test_members_only_see_and_cannot_write_published_announcements(self):
+        Announcement.objects.create(title='Rascunho', content='...')
+        Announcement.objects.create(title='Assembleia', content='Dia 10', is_published=True)
+
+        response = self.client.get('/api/feed/announcements/')
+        self.assertEqual([item['title'] for item in response.data['results']], ['Assembleia'])
 
-# Create your tests here.
+        response = self.client.post('/api/feed/announcements/', {'title': 'X', 'content': 'Y'})
+        self.assertEqual(response.status_code, 403)
@@ -1,3 +1,149 @@
-from django.shortcuts import render
+"""
+Views for the feed module.
 
-# Create your views here.
+The transparency feed is read from precomputed FeedEntry rows (see
+feed.publishing): a page is one keyset-paginated query on FeedEntry plus
+one lookup of the user's likes among the page's entries; nothing is joined
+back to cases, donations or announcements.
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from rest_framework import generics, permissions, status, viewsets
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .models import Announcement, FeedEntry, FeedLike
+from .pagination import FeedCursorPagination
+from .serializers import AnnouncementSerializer, FeedEntrySerializer
+
+
+class IsBoardOrAdminOrReadOnly(permissions.BasePermission):
+    """Anyone authenticated reads; Board members and Super Admins write"""
+    def has_permission(self, request, view):
+        if not (request.user and request.user.is_authenticated):
+            return False
+        if request.method in permissions.SAFE_METHODS:
+            return True
+        return request.user.role in ['SUPER_ADMIN', 'BOARD']
+
+
+class FeedEntryListMixin:
+    """
+    Cursor-paginated feed entries, optionally of one type (?type=).
+    """
+
+    queryset = FeedEntry.objects.all()
+    serializer_class = FeedEntrySerializer
+    pagination_class = FeedCursorPagination
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        entry_type = self.request.query_params.get('type')
+        if entry_type:
+            queryset = queryset.filter(entry_type=entry_type)
+        return queryset
+
+    def liked_ids(self, entries):
+        return set(FeedLike.objects.filter(
+            user=self.request.user, entry_id__in=[entry.pk for entry in entries]
+        ).values_list('entry_id', flat=True))
+
+    def list(self, request, *args, **kwargs):
+        page = self.paginate_queryset(self.get_queryset())
+        serializer = self.get_serializer(page, many=True, context={
+            'request': request, 'liked_ids': self.liked_ids(page)
+        })
+        return self.get_paginated_response(serializer.data)
+
+
+class TimelineView(FeedEntryListMixin, generics.ListAPIView):
+    """
+    The transparency feed: completed cases, public donations, announcements.
+
+    Request: GET /api/feed/timeline/
+    Query params:
+    - type: assistance_case | donation | announcement
+    - page_size: Entries per page (default: 20, max: 50)
+    Response: { next, previous, results }
+    """
+
+
+class PostViewSet(FeedEntryListMixin, viewsets.ReadOnlyModelViewSet):
+    """
+    Feed entries ("posts").
+
+    Endpoints:
+    - GET /api/feed/posts/ - Same listing as the timeline
+    - GET /api/feed/posts/{id}/ - One entry
+    - POST/DELETE /api/feed/posts/{id}/like/ - Like / unlike (LikePostView)
+    """
+
+    def retrieve(self, request, *args, **kwargs):
+        entry = self.get_object()
+        serializer = self.get_serializer(entry, context={
+            'request': request, 'liked_ids': self.liked_ids([entry])
+        })
+        return Response(serializer.data)
+
+
+class AnnouncementViewSet(viewsets.ModelViewSet):
+    """
+    Announcements from the Board.
+
+    Members see published announcements; Board and Admin see and manage
+    all of them. Setting is_published adds the announcement to the feed,
+    clearing it (or deleting the announcement) removes it.
+    """
+
+    queryset = Announcement.objects.all().select_related('author')
+    serializer_class = AnnouncementSerializer
+    permission_classes = [IsBoardOrAdminOrReadOnly]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.user.role in ['SUPER_ADMIN', 'BOARD']:
+            return queryset
+        return queryset.filter(is_published=True)
+
+    def perform_create(self, serializer):
+        serializer.save(author=self.request.user)
+
+
+class LikePostView(APIView):
+    """
+    Like (POST) or unlike (DELETE) a feed entry.
+
+    FeedEntry.like_count is adjusted with an atomic F() update, only when a
+    like was actually added or removed (repeating a request is a no-op).
+
+    Response: { liked, like_count }
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def _response(self, post_id, liked):
+        like_count = FeedEntry.objects.filter(pk=post_id).values_list('like_count', flat=True).first()
+        return Response({'liked': liked, 'like_count': like_count or 0}, status=status.HTTP_200_OK)
+
+    def post(self, request, post_id):
+        entry = generics.get_object_or_404(FeedEntry.objects.only('pk'), pk=post_id)
+        try:
+            with transaction.atomic():
+                FeedLike.objects.create(entry=entry, user=request.user)
+                FeedEntry.objects.filter(pk=entry.pk).update(like_count=F('like_count') + 1)
+        except IntegrityError:
+            pass  # Already liked
+        return self._response(entry.pk, True)
+
+    def delete(self, request, post_id):
+        entry = generics.get_object_or_404(FeedEntry.objects.only('pk'), pk=post_id)
+        with transaction.atomic():
+            deleted, _ = FeedLike.objects.filter(entry=entry, user=request.user).delete()
+            if deleted:
+                FeedEntry.objects.filter(pk=entry.pk).update(
+                    like_count=Greatest(F('like_count') - 1, Value(0))
+                )
+        return self._response(entry.pk, False)
@@ -1,6 +1,8 @@
 from django.contrib import admin
 from django.utils.html import format_html
 from django.utils import timezone
+from orbe_platform.paginators import EstimatedCountPaginator
+from users.stats import invalidate_member_stats
 from .models import MembershipFee, DonationRequest, VoluntaryDonation
 
 
@@ -58,6 +60,10 @@ class MembershipFeeAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+    list_select_related = ['user']
+    autocomplete_fields = ['user']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     date_hierarchy = 'competency_month'
     ordering = ['-competency_month', '-created_at']
     actions = ['mark_as_paid', 'mark_as_overdue']
@@ -96,11 +102,13 @@ class MembershipFeeAdmin(admin.ModelAdmin):
     @admin.action(description='Mark selected fees as paid')
     def mark_as_paid(self, request, queryset):
         updated = queryset.update(status='paid', paid_at=timezone.now())
+        invalidate_member_stats()
         self.message_user(request, f'{updated} fees marked as paid.')
 
     @admin.action(description='Mark selected fees as overdue')
     def mark_as_overdue(self, request, queryset):
         updated = queryset.update(status='overdue')
+        invalidate_member_stats()
         self.message_user(request, f'{updated} fees marked as overdue.')
 
 
@@ -145,13 +153,17 @@ class VoluntaryDonationAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+    list_select_related = ['donor']
+    autocomplete_fields = ['donor', 'verified_by']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     date_hierarchy = 'donated_at'
     ordering = ['-donated_at']
     actions = ['verify_donations']
 
     @admin.display(description='Donor')
     def donor_display(self, obj):
-        if obj.is_anonymous or not obj.donor:
+        if obj.is_anonymous or not obj.donor_id:
             return format_html('<em style="color: gray;">Anônimo</em>')
         return f"{obj.donor.first_name} {obj.donor.last_name}".strip() or obj.donor.email
 
@@ -174,10 +186,16 @@ class VoluntaryDonationAdmin(admin.ModelAdmin):
 
     @admin.action(description='Mark as verified')
     def verify_donations(self, request, queryset):
-        updated = queryset.filter(verified_by__isnull=True).update(
+        from feed.publishing import publish_donations
+
+        pending = list(queryset.filter(verified_by__isnull=True).values_list('pk', flat=True))
+        updated = VoluntaryDonation.objects.filter(pk__in=pending, verified_by__isnull=True).update(
             verified_by=request.user,
             verified_at=timezone.now()
         )
+        # update() sends no post_save: publish the public ones here
+        publish_donations(VoluntaryDonation.objects.filter(pk__in=pending).select_related('donor'))
+        invalidate_member_stats()
         self.message_user(request, f'{updated} donations verified.')
 
 
@@ -229,6 +247,10 @@ class DonationRequestAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         }),
     )
+    list_select_related = ['requested_by', 'reviewed_by']
+    autocomplete_fields = ['requested_by', 'reviewed_by']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     date_hierarchy = 'created_at'
     ordering = ['-created_at']
     actions = ['approve_requests', 'reject_requests']
@@ -239,7 +261,7 @@ class DonationRequestAdmin(admin.ModelAdmin):
 
     @admin.display(description='Reviewed By')
     def reviewed_by_name(self, obj):
-        if obj.reviewed_by:
+        if obj.reviewed_by_id:
             return f"{obj.reviewed_by.first_name} {obj.reviewed_by.last_name}".strip() or obj.reviewed_by.email
         return '-'
 
@@ -120,6 +120,9 @@ class VoluntaryDonation(models.Model):
     Example: "I want to contribute R$100 extra this month to help ORBE"
     """
 
+    # Largest payment proof accepted through direct uploads
+    MAX_PAYMENT_PROOF_SIZE = 5 * 1024 * 1024  # 5MB
+
     # Donor (can be null for anonymous donations)
     donor = models.ForeignKey(
         User,
@@ -207,7 +210,7 @@ class VoluntaryDonation(models.Model):
     @property
     def is_verified(self):
         """Check if donation was verified by admin"""
-        return self.verified_by is not None
+        return self.verified_by_id is not None
 
 
 class DonationRequest(models.Model):
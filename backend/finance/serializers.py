@@ -68,6 +68,12 @@ class VoluntaryDonationSerializer(serializers.ModelSerializer):
     verified_by_name = serializers.SerializerMethodField()
     display_name = serializers.CharField(read_only=True)
     is_verified = serializers.BooleanField(read_only=True)
+    payment_proof_url = serializers.SerializerMethodField()
+    payment_proof_token = serializers.CharField(
+        write_only=True,
+        required=False,
+        help_text='Token de envio direto (presign_payment_proof), em vez do arquivo'
+    )
 
     class Meta:
         model = VoluntaryDonation
@@ -80,17 +86,62 @@ class VoluntaryDonationSerializer(serializers.ModelSerializer):
             'message',
             'is_anonymous',
             'payment_proof',
+            'payment_proof_url',
             'donated_at',
             'verified_by',
             'verified_by_name',
             'verified_at',
             'display_name',
             'is_verified',
+            'payment_proof_token',
         ]
         read_only_fields = [
             'id', 'donor', 'donor_name', 'donor_email', 'donated_at',
             'verified_by', 'verified_by_name', 'verified_at', 'display_name', 'is_verified'
         ]
+        extra_kwargs = {'payment_proof': {'write_only': True}}
+
+    def validate(self, attrs):
+        """
+        Resolve a direct-upload token into the stored payment proof.
+        Each token (uploaded object) proves one donation only.
+        """
+        token = attrs.pop('payment_proof_token', None)
+        if token:
+            from assistance.direct_uploads import DirectUploadError, load_token, verify_uploaded_object
+
+            request = self.context['request']
+            try:
+                data = load_token(token, 'donation_payment_proof', request.user)
+            except DirectUploadError as e:
+                raise serializers.ValidationError({'payment_proof_token': str(e)})
+
+            used = VoluntaryDonation.objects.filter(payment_proof=data['name'])
+            if self.instance is not None:
+                used = used.exclude(pk=self.instance.pk)
+            if used.exists():
+                raise serializers.ValidationError(
+                    {'payment_proof_token': 'Este comprovante já foi usado em outra doação.'}
+                )
+
+            try:
+                verify_uploaded_object(data)
+            except DirectUploadError as e:
+                raise serializers.ValidationError({'payment_proof_token': str(e)})
+            attrs['payment_proof'] = data['name']
+        return attrs
+
+    def get_payment_proof_url(self, obj):
+        """Protected download link, signed for the request user (see assistance.downloads)"""
+        from django.urls import reverse
+        from assistance.downloads import download_url
+
+        if not obj.payment_proof:
+            return None
+        return download_url(
+            reverse('voluntary-donation-payment-proof', args=[obj.pk]),
+            'donation_payment_proof', obj.pk, self.context.get('request')
+        )
 
     def get_donor_name(self, obj):
         """Get donor full name (respecting anonymity)"""
@@ -3,23 +3,35 @@ Celery tasks for finance module
 Handles automated membership fee reminders and financial operations
 """
 
-from celery import shared_task
+from celery import shared_task, chord
+from django.db import transaction
 from django.utils import timezone
 from django.db.models import Q
 from datetime import date, timedelta
+from decimal import Decimal
 import logging
-import requests
+import time
 
 from .models import MembershipFee
 
 logger = logging.getLogger(__name__)
 
+# Members streamed and inserted per round trip by generate_monthly_fees
+FEE_GENERATION_CHUNK_SIZE = 1000
+
+# Reminder fan-out: fees per subtask
+REMINDER_CHUNK_SIZE = 200
+
 
 @shared_task(name='finance.send_membership_reminders')
 def send_membership_reminders():
     """
     Send D-0 reminders for membership fees due today.
     Runs daily at 9:00 AM via Celery Beat.
+
+    Due fees are split into chunks queued in the webhook outbox by parallel
+    send_reminder_chunk subtasks; summarize_reminders reports the totals
+    once all chunks finish.
     """
     today = date.today()
     logger.info(f"Running D-0 membership reminders for {today}")
@@ -29,37 +41,9 @@ def send_membership_reminders():
         due_date=today,
         status='pending',
         reminder_sent_at__isnull=True
-    ).select_related('user', 'user__profile')
+    )
 
-    reminder_count = 0
-
-    for fee in fees_due_today:
-        try:
-            # Send reminder via n8n webhook
-            success = _send_reminder_webhook(
-                user=fee.user,
-                fee=fee,
-                reminder_type='due_today'
-            )
-
-            if success:
-                # Update reminder timestamp
-                fee.reminder_sent_at = timezone.now()
-                fee.save(update_fields=['reminder_sent_at'])
-                reminder_count += 1
-                logger.info(f"Sent D-0 reminder to {fee.user.email} for {fee.competency_month}")
-            else:
-                logger.error(f"Failed to send D-0 reminder to {fee.user.email}")
-
-        except Exception as e:
-            logger.error(f"Error sending D-0 reminder to {fee.user.email}: {str(e)}")
-
-    logger.info(f"Sent {reminder_count} D-0 reminders")
-    return {
-        'reminder_type': 'D-0',
-        'date': today.isoformat(),
-        'reminders_sent': reminder_count
-    }
+    return _dispatch_reminders(fees_due_today, reminder_type='due_today', label='D-0', today=today)
 
 
 @shared_task(name='finance.send_overdue_reminders')
@@ -67,6 +51,8 @@ def send_overdue_reminders():
     """
     Send D+3 reminders for membership fees that are 3 days overdue.
     Runs daily at 9:00 AM via Celery Beat.
+
+    Uses the same chunked fan-out as send_membership_reminders.
     """
     today = date.today()
     three_days_ago = today - timedelta(days=3)
@@ -77,40 +63,143 @@ def send_overdue_reminders():
         due_date=three_days_ago,
         status__in=['pending', 'overdue'],
         overdue_reminder_sent_at__isnull=True
-    ).select_related('user', 'user__profile')
+    )
 
-    reminder_count = 0
+    return _dispatch_reminders(overdue_fees, reminder_type='overdue', label='D+3', today=today)
 
-    for fee in overdue_fees:
-        try:
-            # Mark as overdue if still pending
-            if fee.status == 'pending':
-                fee.status = 'overdue'
-
-            # Send overdue reminder via n8n webhook
-            success = _send_reminder_webhook(
-                user=fee.user,
-                fee=fee,
-                reminder_type='overdue'
-            )
 
-            if success:
-                # Update overdue reminder timestamp
-                fee.overdue_reminder_sent_at = timezone.now()
-                fee.save(update_fields=['status', 'overdue_reminder_sent_at'])
-                reminder_count += 1
-                logger.info(f"Sent D+3 overdue reminder to {fee.user.email} for {fee.competency_month}")
-            else:
-                logger.error(f"Failed to send D+3 overdue reminder to {fee.user.email}")
+@shared_task(name='finance.send_reminder_chunk')
+def send_reminder_chunk(fee_ids, reminder_type):
+    """
+    Queue reminders for a chunk of fees in the webhook outbox.
 
-        except Exception as e:
-            logger.error(f"Error sending D+3 overdue reminder to {fee.user.email}: {str(e)}")
+    Outbox entries and the reminder timestamps/status are written in one
+    transaction (one bulk INSERT plus one bulk_update), so a reminder is
+    recorded if and only if it will be delivered. Delivery, retries and
+    connection pooling are handled by webhooks.deliver_webhooks.
+    Fees already reminded since dispatch are skipped.
+
+    Args:
+        fee_ids: MembershipFee ids in this chunk
+        reminder_type: 'due_today' or 'overdue'
+    Returns:
+        dict: queued and failed counts for the chunk
+    """
+    from webhooks.services import enqueue_webhooks
+
+    is_overdue = reminder_type == 'overdue'
+
+    with transaction.atomic():
+        fees = MembershipFee.objects.filter(id__in=fee_ids).select_related('user', 'user__profile')
+        if is_overdue:
+            fees = fees.filter(status__in=['pending', 'overdue'], overdue_reminder_sent_at__isnull=True)
+            update_fields = ['status', 'overdue_reminder_sent_at']
+        else:
+            fees = fees.filter(status='pending', reminder_sent_at__isnull=True)
+            update_fields = ['reminder_sent_at']
+
+        sent_at = timezone.now()
+        queued = []
+        webhooks = []
+        failed = 0
+
+        for fee in fees.select_for_update(of=('self',)):
+            try:
+                # Mark as overdue if still pending
+                if is_overdue and fee.status == 'pending':
+                    fee.status = 'overdue'
+
+                webhooks.append(_build_reminder_webhook(
+                    user=fee.user,
+                    fee=fee,
+                    reminder_type=reminder_type
+                ))
+
+                if is_overdue:
+                    fee.overdue_reminder_sent_at = sent_at
+                else:
+                    fee.reminder_sent_at = sent_at
+                queued.append(fee)
+            except Exception as e:
+                failed += 1
+                logger.error(f"Error queuing {reminder_type} reminder for fee {fee.pk}: {str(e)}")
+
+        if queued:
+            enqueue_webhooks(webhooks)
+            MembershipFee.objects.bulk_update(queued, update_fields)
+
+    if is_overdue and queued:
+        # bulk_update bypasses model signals
+        from users.stats import invalidate_member_stats
+        invalidate_member_stats()
+
+    return {
+        'queued': len(queued),
+        'failed': failed
+    }
+
+
+@shared_task(name='finance.summarize_reminders')
+def summarize_reminders(chunk_results, reminder_type, run_date, started_at):
+    """
+    Chord callback aggregating the results of all reminder chunks.
 
-    logger.info(f"Sent {reminder_count} D+3 overdue reminders")
+    Args:
+        chunk_results: List of send_reminder_chunk results
+        reminder_type: 'D-0' or 'D+3'
+        run_date: ISO date of the run
+        started_at: Epoch seconds when the run was dispatched
+    """
+    queued = sum(result['queued'] for result in chunk_results)
+    failed = sum(result['failed'] for result in chunk_results)
+    elapsed = max(time.time() - started_at, 0.001)
+    throughput = round((queued + failed) / elapsed, 2)
+
+    logger.info(
+        f"Queued {queued} {reminder_type} reminders ({failed} failed) "
+        f"in {elapsed:.1f}s - {throughput} reminders/s"
+    )
     return {
-        'reminder_type': 'D+3',
+        'reminder_type': reminder_type,
+        'date': run_date,
+        'reminders_queued': queued,
+        'failed_count': failed,
+        'chunks': len(chunk_results),
+        'duration_seconds': round(elapsed, 3),
+        'throughput_per_second': throughput
+    }
+
+
+def _dispatch_reminders(fees, reminder_type, label, today):
+    """
+    Split due fees into chunks and fan them out as a Celery chord.
+
+    Args:
+        fees: MembershipFee queryset selecting the fees to remind
+        reminder_type: 'due_today' or 'overdue'
+        label: Human readable run label ('D-0' or 'D+3')
+        today: Run date
+    Returns:
+        dict: Dispatch summary (totals are reported by summarize_reminders)
+    """
+    fee_ids = list(fees.order_by('id').values_list('id', flat=True))
+    chunks = [
+        fee_ids[i:i + REMINDER_CHUNK_SIZE]
+        for i in range(0, len(fee_ids), REMINDER_CHUNK_SIZE)
+    ]
+
+    if chunks:
+        chord(
+            [send_reminder_chunk.s(chunk, reminder_type) for chunk in chunks]
+        )(summarize_reminders.s(label, today.isoformat(), time.time()))
+    else:
+        logger.info(f"No {label} reminders to send")
+
+    return {
+        'reminder_type': label,
         'date': today.isoformat(),
-        'reminders_sent': reminder_count
+        'fees_queued': len(fee_ids),
+        'chunks': len(chunks)
     }
 
 
@@ -129,6 +218,11 @@ def update_overdue_status():
         status='pending'
     ).update(status='overdue')
 
+    if updated_count:
+        # Bulk updates bypass model signals
+        from users.stats import invalidate_member_stats
+        invalidate_member_stats()
+
     logger.info(f"Updated {updated_count} fees to overdue status")
     return {
         'date': today.isoformat(),
@@ -137,15 +231,27 @@ def update_overdue_status():
 
 
 @shared_task(name='finance.generate_monthly_fees')
-def generate_monthly_fees(year=None, month=None):
+def generate_monthly_fees(year=None, month=None, chunk_size=FEE_GENERATION_CHUNK_SIZE):
     """
     Generate membership fees for all active members for a specific month.
+
+    Members are streamed with a server-side cursor and fees are inserted in
+    chunks with bulk_create, so a run costs a couple of queries per chunk
+    instead of several per member. Members that already have a fee for the
+    month are skipped (unique on user + competency_month).
+
     Args:
         year: Year to generate fees for (default: current year)
         month: Month to generate fees for (default: current month)
+        chunk_size: Members fetched and inserted per round trip
+
+    Returns:
+        dict: competency_month, created_count and skipped_count; when another
+        run races this one, created_count may include fees it inserted
     """
     from users.models import User
     from calendar import monthrange
+    from itertools import islice
 
     today = date.today()
     year = year or today.year
@@ -153,46 +259,40 @@ def generate_monthly_fees(year=None, month=None):
 
     logger.info(f"Generating membership fees for {year}-{month:02d}")
 
-    # Get all members (exclude super admins)
+    # Get all members (exclude super admins), streamed as (id, due_day) rows
     active_members = User.objects.filter(
         is_active=True,
         profile__is_onboarding_completed=True
     ).exclude(
         role='SUPER_ADMIN'
-    ).select_related('profile')
+    ).order_by().values_list(
+        'id', 'profile__membership_due_day'
+    ).iterator(chunk_size=chunk_size)
 
     competency_month = date(year, month, 1)
+    _, last_day = monthrange(year, month)
     created_count = 0
     skipped_count = 0
 
-    for user in active_members:
+    while True:
+        chunk = list(islice(active_members, chunk_size))
+        if not chunk:
+            break
+
         try:
-            # Calculate due date based on user's preferred day
-            due_day = user.profile.membership_due_day
-            _, last_day = monthrange(year, month)
-            # Ensure due_day doesn't exceed month's last day
-            due_day = min(due_day, last_day)
-            due_date = date(year, month, due_day)
-
-            # Create fee if it doesn't exist
-            fee, created = MembershipFee.objects.get_or_create(
-                user=user,
-                competency_month=competency_month,
-                defaults={
-                    'amount': 60.00,
-                    'due_date': due_date,
-                    'status': 'pending'
-                }
+            created, skipped = _create_fee_chunk(chunk, competency_month, last_day)
+            created_count += created
+            skipped_count += skipped
+        except Exception as e:
+            logger.error(
+                f"Error creating fees for {len(chunk)} members "
+                f"(ids {chunk[0][0]}..{chunk[-1][0]}): {str(e)}"
             )
 
-            if created:
-                created_count += 1
-                logger.info(f"Created fee for {user.email} - {competency_month}")
-            else:
-                skipped_count += 1
-
-        except Exception as e:
-            logger.error(f"Error creating fee for {user.email}: {str(e)}")
+    if created_count:
+        # bulk_create bypasses model signals
+        from users.stats import invalidate_member_stats
+        invalidate_member_stats()
 
     logger.info(f"Fee generation complete: {created_count} created, {skipped_count} skipped")
     return {
@@ -202,16 +302,58 @@ def generate_monthly_fees(year=None, month=None):
     }
 
 
-def _send_reminder_webhook(user, fee, reminder_type):
+def _create_fee_chunk(members, competency_month, last_day):
+    """
+    Insert the missing fees for a chunk of members.
+
+    Args:
+        members: List of (user_id, membership_due_day) tuples
+        competency_month: First day of the month being generated
+        last_day: Last day of that month
+    Returns:
+        tuple: (created, skipped) counts for the chunk. `created` is an
+        upper bound: fees inserted concurrently after the lookup are
+        dropped by ignore_conflicts but still counted.
+    """
+    user_ids = [user_id for user_id, _ in members]
+    existing = set(
+        MembershipFee.objects.filter(
+            competency_month=competency_month,
+            user_id__in=user_ids
+        ).values_list('user_id', flat=True)
+    )
+
+    new_fees = [
+        MembershipFee(
+            user_id=user_id,
+            competency_month=competency_month,
+            amount=Decimal('60.00'),
+            # Ensure due_day doesn't exceed month's last day
+            due_date=competency_month.replace(day=min(max(due_day or 1, 1), last_day)),
+            status='pending'
+        )
+        for user_id, due_day in members
+        if user_id not in existing
+    ]
+
+    # ignore_conflicts covers fees created concurrently since the lookup above
+    MembershipFee.objects.bulk_create(new_fees, ignore_conflicts=True)
+
+    return len(new_fees), len(existing)
+
+
+def _build_reminder_webhook(user, fee, reminder_type):
     """
-    Internal helper to send reminder via n8n webhook.
+    Internal helper to build the n8n reminder webhook for the outbox.
     Args:
         user: User object
         fee: MembershipFee object
         reminder_type: 'due_today' or 'overdue'
     Returns:
-        bool: True if successful, False otherwise
+        WebhookOutbox: Unsaved outbox entry
     """
+    from webhooks.services import build_webhook
+
     webhook_url = "https://n8n.texts.com.br/webhook-test/orbe_membership_reminder"
 
     payload = {
@@ -226,13 +368,4 @@ def _send_reminder_webhook(user, fee, reminder_type):
         "days_overdue": fee.days_overdue if reminder_type == 'overdue' else 0,
     }
 
-    try:
-        response = requests.post(
-            webhook_url,
-            json=payload,
-            timeout=10
-        )
-        return response.status_code == 200
-    except Exception as e:
-        logger.error(f"Webhook error for {user.email}: {str(e)}")
-        return False
\ No newline at end of file
+    return build_webhook(event='membership_reminder', url=webhook_url, payload=payload)
@@ -1,3 +1,241 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from users.models import User
+
+try:
+    from moto import mock_s3
+except ImportError:  # optional test dependency
+    mock_s3 = None
+from .models import MembershipFee, VoluntaryDonation
+from .tasks import generate_monthly_fees, send_membership_reminders, send_overdue_reminders
+
+
+class GenerateMonthlyFeesTests(TestCase):
+    """finance.generate_monthly_fees: chunked bulk inserts"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.members = []
+        for index, due_day in enumerate([5, 31, None, 10, 15]):
+            member = User.objects.create_user(
+                email=f'membro{index}@orbe.org', username=f'membro{index}', password='x'
+            )
+            member.profile.is_onboarding_completed = True
+            member.profile.membership_due_day = due_day or 0
+            member.profile.save()
+            cls.members.append(member)
+
+        # Not billed: super admins, inactive members, unfinished onboarding
+        admin = User.objects.create_user(
+            email='admin@orbe.org', username='admin', password='x', role='SUPER_ADMIN'
+        )
+        admin.profile.is_onboarding_completed = True
+        admin.profile.save()
+        inactive = User.objects.create_user(
+            email='inativo@orbe.org', username='inativo', password='x', is_active=False
+        )
+        inactive.profile.is_onboarding_completed = True
+        inactive.profile.save()
+        User.objects.create_user(email='novo@orbe.org', username='novo', password='x')
+
+    def test_fees_are_created_for_billable_members(self):
+        result = generate_monthly_fees(2026, 2, chunk_size=2)
+
+        self.assertEqual((result['created_count'], result['skipped_count']), (5, 0))
+        fees = MembershipFee.objects.filter(competency_month=date(2026, 2, 1))
+        self.assertEqual(
+            set(fees.values_list('user_id', flat=True)), {member.pk for member in self.members}
+        )
+        self.assertEqual(set(fees.values_list('status', flat=True)), {'pending'})
+
+    def test_due_day_is_clamped_to_the_month(self):
+        generate_monthly_fees(2026, 2)
+
+        due_dates = dict(
+            MembershipFee.objects.filter(competency_month=date(2026, 2, 1)).values_list('user_id', 'due_date')
+        )
+        self.assertEqual(due_dates[self.members[0].pk], date(2026, 2, 5))
+        self.assertEqual(due_dates[self.members[1].pk], date(2026, 2, 28))
+        self.assertEqual(due_dates[self.members[2].pk], date(2026, 2, 1))
+
+    def test_rerun_is_idempotent(self):
+        first = generate_monthly_fees(2026, 3, chunk_size=2)
+        fees = list(MembershipFee.objects.order_by('pk').values_list('pk', 'user_id', 'due_date'))
+
+        second = generate_monthly_fees(2026, 3, chunk_size=2)
+
+        self.assertEqual(first['created_count'], 5)
+        self.assertEqual((second['created_count'], second['skipped_count']), (0, 5))
+        self.assertEqual(list(MembershipFee.objects.order_by('pk').values_list('pk', 'user_id', 'due_date')), fees)
+
+    def test_partial_month_only_fills_the_gaps(self):
+        MembershipFee.objects.create(
+            user=self.members[0], competency_month=date(2026, 4, 1), amount=60,
+            due_date=date(2026, 4, 5), status='paid'
+        )
+
+        result = generate_monthly_fees(2026, 4, chunk_size=2)
+
+        self.assertEqual((result['created_count'], result['skipped_count']), (4, 1))
+        self.assertEqual(MembershipFee.objects.get(user=self.members[0]).status, 'paid')
+
+
+@mock.patch('finance.tasks.REMINDER_CHUNK_SIZE', 2)
+class ReminderFanOutTests(TestCase):
+    """Reminder runs fan out as a chord of chunks (eager Celery in tests)"""
+
+    @classmethod
+    def setUpTestData(cls):
+        today = date.today()
+        for index in range(5):
+            member = User.objects.create_user(
+                email=f'membro{index}@orbe.org', username=f'membro{index}', password='x'
+            )
+            MembershipFee.objects.create(
+                user=member, competency_month=date(2026, 1, 1), amount=60, due_date=today, status='pending'
+            )
+            MembershipFee.objects.create(
+                user=member, competency_month=date(2025, 12, 1), amount=60,
+                due_date=today - timedelta(days=3), status='pending'
+            )
+        # Already reminded: skipped
+        MembershipFee.objects.filter(user=member, due_date=today).update(reminder_sent_at=timezone.now())
+
+    def test_due_today_run_queues_every_chunk_and_reports_totals(self):
+        from webhooks.models import WebhookOutbox
+
+        with self.assertLogs('finance.tasks', 'INFO') as logs:
+            result = send_membership_reminders()
+
+        self.assertEqual(result['fees_queued'], 4)
+        self.assertEqual(result['chunks'], 2)
+        self.assertTrue(any('Queued 4 D-0 reminders (0 failed)' in line for line in logs.output))
+        self.assertEqual(WebhookOutbox.objects.filter(payload__reminder_type='due_today').count(), 4)
+        self.assertFalse(
+            MembershipFee.objects.filter(due_date=date.today(), reminder_sent_at__isnull=True).exists()
+        )
+
+    def test_second_run_queues_nothing(self):
+        from webhooks.models import WebhookOutbox
+
+        send_membership_reminders()
+        result = send_membership_reminders()
+
+        self.assertEqual(result['fees_queued'], 0)
+        self.assertEqual(WebhookOutbox.objects.count(), 4)
+
+    def test_overdue_run_marks_fees_overdue(self):
+        with self.assertLogs('finance.tasks', 'INFO') as logs:
+            result = send_overdue_reminders()
+
+        self.assertEqual((result['fees_queued'], result['chunks']), (5, 3))
+        self.assertTrue(any('Queued 5 D+3 reminders (0 failed)' in line for line in logs.output))
+        overdue = MembershipFee.objects.filter(due_date=date.today() - timedelta(days=3))
+        self.assertEqual(set(overdue.values_list('status', flat=True)), {'overdue'})
+        self.assertFalse(overdue.filter(overdue_reminder_sent_at__isnull=True).exists())
+
+
+@skipUnless(mock_s3, 'moto não instalado')
+@override_settings(
+    USE_S3=True,
+    STORAGES={
+        'default': {'BACKEND': 'storages.backends.s3boto3.S3Boto3Storage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    },
+    AWS_ACCESS_KEY_ID='testing',
+    AWS_SECRET_ACCESS_KEY='testing',
+    AWS_STORAGE_BUCKET_NAME='orbe-test',
+    AWS_S3_REGION_NAME='us-east-1',
+    AWS_S3_CUSTOM_DOMAIN=None,
+)
+class DonationDirectUploadTests(TestCase):
+    """Payment proofs sent with presigned POST uploads, against a moto S3 stand-in"""
+
+    url = '/api/finance/voluntary-donations/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = User.objects.create_user(email='membro@orbe.org', username='membro', password='x')
+
+    def setUp(self):
+        import boto3
+
+        s3 = mock_s3()
+        s3.start()
+        self.addCleanup(s3.stop)
+        boto3.client('s3', region_name='us-east-1').create_bucket(Bucket='orbe-test')
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.member)
+
+    def presign(self, file_name='comprovante.pdf'):
+        response = self.client.post(f'{self.url}presign_payment_proof/', {'file_name': file_name}, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def upload(self, policy, content=b'%PDF-1.4 pix'):
+        import requests
+
+        response = requests.post(
+            policy['url'], data=policy['fields'], files={'file': ('comprovante.pdf', content)}
+        )
+        self.assertLess(response.status_code, 300)
+
+    def donate(self, token, amount='50.00'):
+        return self.client.post(self.url, {'amount': amount, 'payment_proof_token': token}, format='json')
+
+    def test_presign_upload_and_create(self):
+        policy = self.presign()
+        self.assertEqual(policy['fields']['Content-Type'], 'application/pdf')
+        self.upload(policy)
+
+        response = self.donate(policy['token'])
+
+        self.assertEqual(response.status_code, 201, response.data)
+        self.assertIsNotNone(response.data['payment_proof_url'])
+        donation = VoluntaryDonation.objects.get(pk=response.data['id'])
+        self.assertEqual(donation.donor, self.member)
+        self.assertTrue(donation.payment_proof.name.startswith('voluntary_donations/'))
+        self.assertEqual(donation.payment_proof.read(), b'%PDF-1.4 pix')
+
+    def test_file_type_is_checked_on_presign(self):
+        response = self.client.post(f'{self.url}presign_payment_proof/', {'file_name': 'script.exe'}, format='json')
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_token_is_bound_to_user(self):
+        policy = self.presign()
+        self.upload(policy)
+        other = User.objects.create_user(email='outro@orbe.org', username='outro', password='x')
+        self.client.force_authenticate(other)
+
+        response = self.donate(policy['token'])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('payment_proof_token', response.data)
+        self.assertFalse(VoluntaryDonation.objects.exists())
+
+    def test_create_requires_uploaded_object(self):
+        policy = self.presign()
+
+        response = self.donate(policy['token'])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('payment_proof_token', response.data)
+        self.assertFalse(VoluntaryDonation.objects.exists())
+
+    def test_token_proves_one_donation_only(self):
+        policy = self.presign()
+        self.upload(policy)
+        self.assertEqual(self.donate(policy['token']).status_code, 201)
+
+        response = self.donate(policy['token'], amount='80.00')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('payment_proof_token', response.data)
+        self.assertEqual(VoluntaryDonation.objects.count(), 1)
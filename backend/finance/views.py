@@ -1,8 +1,11 @@
+import os
+
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from django.utils import timezone
 from django.db import models
+from django.http import Http404
 from assistance.models import AssistanceCase
 from .models import MembershipFee, DonationRequest, VoluntaryDonation
 from .serializers import (
@@ -91,6 +94,16 @@ class MembershipFeeViewSet(viewsets.ModelViewSet):
         return Response(serializer.data)
 
 
+def visible_voluntary_donations(user):
+    """Voluntary donations `user` can see"""
+    # Board/Admin see all donations
+    if user.role in ['SUPER_ADMIN', 'BOARD', 'FISCAL_COUNCIL']:
+        return VoluntaryDonation.objects.all().select_related('donor', 'verified_by')
+
+    # Members see only their own (non-anonymous)
+    return VoluntaryDonation.objects.filter(donor=user, is_anonymous=False)
+
+
 class VoluntaryDonationViewSet(viewsets.ModelViewSet):
     """
     ViewSet for voluntary donations (TO ORBE).
@@ -104,14 +117,7 @@ class VoluntaryDonationViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Filter based on user role"""
-        user = self.request.user
-
-        # Board/Admin see all donations
-        if user.role in ['SUPER_ADMIN', 'BOARD', 'FISCAL_COUNCIL']:
-            return VoluntaryDonation.objects.all().select_related('donor', 'verified_by')
-
-        # Members see only their own (non-anonymous)
-        return VoluntaryDonation.objects.filter(donor=user, is_anonymous=False)
+        return visible_voluntary_donations(self.request.user)
 
     def perform_create(self, serializer):
         """Set donor as current user if not anonymous"""
@@ -121,6 +127,59 @@ class VoluntaryDonationViewSet(viewsets.ModelViewSet):
         else:
             serializer.save(donor=None)
 
+    @action(detail=False, methods=['post'])
+    def presign_payment_proof(self, request):
+        """
+        Upload policy for sending the payment proof straight to the bucket
+        (USE_S3). Send the returned token as `payment_proof_token` when
+        creating the donation.
+
+        Body: {file_name}
+        Response: {url, fields, token, expires_in}
+        """
+        from assistance.direct_uploads import DirectUploadError, issue_upload
+
+        file_name = request.data.get('file_name')
+        if not file_name:
+            return Response(
+                {'error': 'file_name é obrigatório.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            policy = issue_upload(
+                VoluntaryDonation._meta.get_field('payment_proof'),
+                file_name,
+                VoluntaryDonation.MAX_PAYMENT_PROOF_SIZE,
+                {'kind': 'donation_payment_proof', 'user': request.user.pk}
+            )
+        except DirectUploadError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(policy)
+
+    @action(detail=True, methods=['get'], permission_classes=[permissions.AllowAny])
+    def payment_proof(self, request, pk=None):
+        """
+        Protected download of the payment proof (see assistance.downloads).
+        Authenticate normally or with the signed `token` from
+        payment_proof_url.
+
+        Query: token, download=1 (save instead of display)
+        """
+        from rest_framework.generics import get_object_or_404
+        from assistance.downloads import download_user, serve_file
+
+        user = download_user(request, 'donation_payment_proof', pk)
+        donation = get_object_or_404(visible_voluntary_donations(user), pk=pk)
+        if not donation.payment_proof:
+            raise Http404
+
+        return serve_file(
+            request, donation.payment_proof.name, os.path.basename(donation.payment_proof.name),
+            as_attachment=request.query_params.get('download') == '1'
+        )
+
     @action(detail=False, methods=['get'])
     def my_donations(self, request):
         """Get current user's donations"""
@@ -42,6 +42,21 @@ app.conf.beat_schedule = {
         'task': 'finance.generate_monthly_fees',
         'schedule': crontab(day_of_month=1, hour=1, minute=0),
     },
+    # Webhook Outbox: Retry due webhooks every minute
+    'deliver-webhooks': {
+        'task': 'webhooks.deliver_webhooks',
+        'schedule': crontab(minute='*'),
+    },
+    # Resumable uploads: Remove abandoned sessions and chunks hourly
+    'cleanup-expired-uploads': {
+        'task': 'assistance.cleanup_expired_uploads',
+        'schedule': crontab(minute=30),
+    },
+    # Case dossiers: Render last month's completed cases on the 1st at 3:00 AM
+    'generate-monthly-dossiers': {
+        'task': 'assistance.generate_monthly_dossiers',
+        'schedule': crontab(day_of_month=1, hour=3, minute=0),
+    },
 }
 
 app.conf.timezone = 'America/Sao_Paulo'
@@ -0,0 +1,46 @@
+"""
+Paginator for admin changelists of high-volume tables.
+
+COUNT(*) over a whole PostgreSQL table scans every row. The unfiltered
+changelist uses the planner's row estimate (pg_class.reltuples, kept up to
+date by autovacuum/ANALYZE) once the table is large enough for the exact
+number not to matter; filtered changelists and small tables are counted
+exactly.
+"""
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+# Below this estimate the table is counted exactly
+ESTIMATE_THRESHOLD = 10000
+
+
+class EstimatedCountPaginator(Paginator):
+
+    @cached_property
+    def count(self):
+        estimate = self._estimated_count()
+        if estimate is not None and estimate >= ESTIMATE_THRESHOLD:
+            return estimate
+        return super().count
+
+    def _estimated_count(self):
+        """Planner estimate of the table size, for unfiltered querysets only"""
+        queryset = self.object_list
+        query = getattr(queryset, 'query', None)
+        if query is None or query.where or query.distinct or query.combinator:
+            return None
+
+        connection = connections[queryset.db]
+        if connection.vendor != 'postgresql':
+            return None
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                [queryset.model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        # reltuples is -1 for tables never vacuumed/analyzed
+        return row[0] if row and row[0] >= 0 else None
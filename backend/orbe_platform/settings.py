@@ -57,6 +57,7 @@ LOCAL_APPS = [
     'finance',
     'assistance',
     'feed',
+    'webhooks',
 ]
 
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
@@ -159,7 +160,7 @@ AUTH_USER_MODEL = 'users.User'
 # REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'users.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
@@ -288,6 +289,13 @@ except:
         import sys
         sys.exit(1)
 
+# Member statistics cache (seconds). Entries are also invalidated on writes.
+MEMBER_STATS_CACHE_TIMEOUT = config('MEMBER_STATS_CACHE_TIMEOUT', default=3600, cast=int)
+
+# Token authentication cache (seconds). Entries are also invalidated on
+# logout, role/activation changes and profile updates.
+AUTH_TOKEN_CACHE_TIMEOUT = config('AUTH_TOKEN_CACHE_TIMEOUT', default=300, cast=int)
+
 # Session Configuration
 # Always try to use cache sessions, will fallback automatically if cache backend changes
 SESSION_ENGINE = 'django.contrib.sessions.backends.cache'
@@ -318,6 +326,13 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# Image/PDF processing runs on its own queue so large photos do not delay
+# reminders and webhooks (worker: celery -A orbe_platform worker -Q media)
+CELERY_TASK_ROUTES = {
+    'assistance.generate_attachment_renditions': {'queue': 'media'},
+    'assistance.generate_case_dossier': {'queue': 'media'},
+}
+
 # File Storage Configuration
 USE_S3 = config('USE_S3', default=False, cast=bool)
 
@@ -329,7 +344,11 @@ if USE_S3:
     AWS_S3_REGION_NAME = config('AWS_S3_REGION_NAME', default='us-east-1')
     AWS_S3_ENDPOINT_URL = config('AWS_S3_ENDPOINT_URL', default=None)
     AWS_DEFAULT_ACL = None
-    AWS_S3_CUSTOM_DOMAIN = f'{AWS_STORAGE_BUCKET_NAME}.s3.amazonaws.com'
+    # S3-compatible endpoints (MinIO, ...) serve files from the endpoint itself
+    AWS_S3_CUSTOM_DOMAIN = config(
+        'AWS_S3_CUSTOM_DOMAIN',
+        default=None if AWS_S3_ENDPOINT_URL else f'{AWS_STORAGE_BUCKET_NAME}.s3.amazonaws.com'
+    )
     AWS_S3_OBJECT_PARAMETERS = {
         'CacheControl': 'max-age=86400',
     }
@@ -340,6 +359,28 @@ if USE_S3:
     # Media files
     DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
 
+# Resumable attachment uploads (assistance.uploads)
+# Largest chunk accepted per PUT, in bytes
+ATTACHMENT_UPLOAD_CHUNK_SIZE = config('ATTACHMENT_UPLOAD_CHUNK_SIZE', default=1024 * 1024, cast=int)
+# Unfinished upload sessions (and their stored chunks) are removed after this
+ATTACHMENT_UPLOAD_EXPIRATION_HOURS = config('ATTACHMENT_UPLOAD_EXPIRATION_HOURS', default=24, cast=int)
+
+# Direct-to-bucket uploads (assistance.direct_uploads, requires USE_S3)
+# Presigned POST policies expire after this many seconds
+DIRECT_UPLOAD_EXPIRATION_SECONDS = config('DIRECT_UPLOAD_EXPIRATION_SECONDS', default=900, cast=int)
+
+# Protected downloads (assistance.downloads): Django checks permissions and
+# hands the transfer to the web server (or to S3, with USE_S3)
+# 'x-accel-redirect' (nginx), 'x-sendfile' (Apache/lighttpd) or
+# 'django' (the worker streams the file; development only)
+PROTECTED_MEDIA_BACKEND = config(
+    'PROTECTED_MEDIA_BACKEND', default='django' if DEBUG else 'x-accel-redirect'
+)
+# nginx `internal` location aliased to MEDIA_ROOT (x-accel-redirect)
+PROTECTED_MEDIA_INTERNAL_URL = config('PROTECTED_MEDIA_INTERNAL_URL', default='/protected-media/')
+# Signed download links in API responses (usable in <img>/<a>) expire after this
+DOWNLOAD_LINK_EXPIRATION_SECONDS = config('DOWNLOAD_LINK_EXPIRATION_SECONDS', default=3600, cast=int)
+
 # Security Settings
 if not DEBUG:
     SECURE_BROWSER_XSS_FILTER = True
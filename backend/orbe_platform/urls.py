@@ -29,11 +29,11 @@ urlpatterns = [
     path('api/users/', include('users.urls')),
     path('api/finance/', include('finance.urls')),
     path('api/assistance/', include('assistance.urls')),
-    # TODO: Uncomment as features are implemented
-    # path('api/feed/', include('feed.urls')),
+    path('api/feed/', include('feed.urls')),
 ]
 
-# Serve media files during development
+# Serve media files during development (attachments and payment proofs go
+# through their protected download endpoints, see assistance.downloads)
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
\ No newline at end of file
@@ -0,0 +1,119 @@
+"""
+Cached token authentication.
+
+TokenAuthentication resolves the token with a Token + User join on every
+request, and most views then load request.user.profile separately. This
+backend keeps the token, the user (role included) and the profile fields
+in the configured cache, so an authenticated request usually costs no
+queries at all.
+
+Entries expire after settings.AUTH_TOKEN_CACHE_TIMEOUT seconds and are
+dropped when the token is deleted (logout included) and whenever the user
+or their profile is saved (see users.signals).
+"""
+
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = 'users:auth_token'
+
+# Never cached: password hashes stay in the database. The field is left
+# deferred on cached users, so user.save() does not overwrite it.
+EXCLUDED_USER_FIELDS = {'password'}
+
+
+def token_cache_key(key):
+    """Cache key for a token (hashed, the raw token never leaves the DB)"""
+    digest = hashlib.sha256(key.encode()).hexdigest()
+    return f'{CACHE_KEY_PREFIX}:{digest}'
+
+
+def invalidate_token_cache(user):
+    """Drop cached authentication entries for a user"""
+    from rest_framework.authtoken.models import Token
+
+    keys = Token.objects.filter(user=user).values_list('key', flat=True)
+    cache.delete_many([token_cache_key(key) for key in keys])
+
+
+def _field_values(instance, exclude=()):
+    return {
+        field.attname: getattr(instance, field.attname)
+        for field in instance._meta.concrete_fields
+        if field.attname not in exclude
+    }
+
+
+def _from_values(model, values):
+    """Rebuild a model instance as if it had been loaded from the database"""
+    return model.from_db(DEFAULT_DB_ALIAS, list(values), list(values.values()))
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Drop-in replacement for TokenAuthentication backed by the cache.
+
+    On a cache miss the token, user and profile are loaded in a single
+    query and stored; on a hit the instances are rebuilt from the cached
+    values without touching the database.
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = token_cache_key(key)
+        entry = cache.get(cache_key)
+
+        if entry is None:
+            token = self._load_token(key)
+            entry = self._build_entry(token)
+            if token.user.is_active:
+                cache.set(cache_key, entry, timeout=settings.AUTH_TOKEN_CACHE_TIMEOUT)
+        else:
+            token = self._rebuild_token(entry)
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        return (token.user, token)
+
+    def _load_token(self, key):
+        model = self.get_model()
+        try:
+            return model.objects.select_related('user', 'user__profile').get(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+
+    def _build_entry(self, token):
+        user = token.user
+        profile = getattr(user, 'profile', None)
+        return {
+            'token': _field_values(token),
+            'user': _field_values(user, exclude=EXCLUDED_USER_FIELDS),
+            'profile': _field_values(profile) if profile is not None else None,
+        }
+
+    def _rebuild_token(self, entry):
+        from .models import User, UserProfile
+
+        model = self.get_model()
+        user = _from_values(User, entry['user'])
+
+        profile = None
+        if entry['profile'] is not None:
+            profile = _from_values(UserProfile, entry['profile'])
+            UserProfile.user.field.set_cached_value(profile, user)
+        # A cached None makes user.profile raise DoesNotExist without a query
+        User.profile.related.set_cached_value(user, profile)
+
+        token = _from_values(model, entry['token'])
+        model.user.field.set_cached_value(token, user)
+        User.auth_token.related.set_cached_value(user, token)
+        return token
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:42
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+from users.utils.search import build_user_search_key
+
+BATCH_SIZE = 1000
+
+
+def populate_search_key(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    batch = []
+    for user in User.objects.only('id', 'first_name', 'last_name', 'email').iterator(chunk_size=BATCH_SIZE):
+        user.search_key = build_user_search_key(user.first_name, user.last_name, user.email)
+        batch.append(user)
+        if len(batch) >= BATCH_SIZE:
+            User.objects.bulk_update(batch, ['search_key'])
+            batch = []
+    if batch:
+        User.objects.bulk_update(batch, ['search_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_user_registration_method_alter_invitationtoken_role_and_more'),
+    ]
+
+    operations = [
+        # No-op outside PostgreSQL
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='user',
+            name='search_key',
+            field=models.CharField(blank=True, editable=False, help_text='Normalised name and email used by member autocomplete', max_length=600, verbose_name='search key'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['search_key'], name='users_user_search_key_like', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_key'], name='users_user_search_key_trgm', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.RunPython(populate_search_key, migrations.RunPython.noop),
+    ]
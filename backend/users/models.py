@@ -3,12 +3,15 @@ User models for ORBE Platform
 """
 
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 from datetime import timedelta
 import secrets
 
+from .utils.search import build_user_search_key
+
 
 class User(AbstractUser):
     """
@@ -40,17 +43,49 @@ class User(AbstractUser):
         help_text=_('How this user was registered')
     )
 
+    search_key = models.CharField(
+        _('search key'),
+        max_length=600,
+        blank=True,
+        editable=False,
+        help_text=_('Normalised name and email used by member autocomplete')
+    )
+
     # Override username field to use email
     USERNAME_FIELD = 'email'
     REQUIRED_FIELDS = ['username']
 
+    SEARCH_KEY_SOURCE_FIELDS = {'first_name', 'last_name', 'email'}
+
     class Meta:
         verbose_name = _('User')
         verbose_name_plural = _('Users')
+        indexes = [
+            # Prefix lookups (LIKE 'abc%') regardless of database collation
+            models.Index(
+                fields=['search_key'],
+                name='users_user_search_key_like',
+                opclasses=['varchar_pattern_ops']
+            ),
+            # Infix lookups (LIKE '%abc%') through pg_trgm
+            GinIndex(
+                fields=['search_key'],
+                name='users_user_search_key_trgm',
+                opclasses=['gin_trgm_ops']
+            ),
+        ]
 
     def __str__(self):
         return self.email
 
+    def save(self, *args, **kwargs):
+        """Keep search_key in sync with name and email"""
+        self.search_key = build_user_search_key(self.first_name, self.last_name, self.email)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and self.SEARCH_KEY_SOURCE_FIELDS.intersection(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'search_key'}
+        super().save(*args, **kwargs)
+
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}".strip()
@@ -216,7 +251,10 @@ def create_user_profile(sender, instance, created, **kwargs):
 
 @receiver(post_save, sender=User)
 def save_user_profile(sender, instance, **kwargs):
-    """Save user profile when user is saved"""
+    """Save user profile when user is saved (not for login timestamps)"""
+    update_fields = kwargs.get('update_fields')
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
     if hasattr(instance, 'profile'):
         instance.profile.save()
 
@@ -5,9 +5,9 @@ Serializers for users app
 from rest_framework import serializers
 from dj_rest_auth.registration.serializers import RegisterSerializer
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
+from webhooks.services import enqueue_webhook
 from .models import UserProfile
-import requests
 import logging
 
 User = get_user_model()
@@ -47,8 +47,61 @@ class UserAutocompleteSerializer(serializers.ModelSerializer):
         fields = ['id', 'email', 'first_name', 'last_name', 'full_name']
 
 
+def annotate_financial_summary(queryset):
+    """
+    Annotate a User queryset with the aggregates used by financial_summary.
+
+    Every aggregate is a correlated subquery over MembershipFee or
+    VoluntaryDonation, so a whole page of members is loaded in a single
+    query regardless of the page size.
+    """
+    from finance.models import MembershipFee, VoluntaryDonation
+    from django.db.models import (
+        Count, Sum, Max, Q, OuterRef, Subquery, Value,
+        IntegerField, DecimalField, DateTimeField
+    )
+    from django.db.models.functions import Coalesce
+
+    money = DecimalField(max_digits=12, decimal_places=2)
+
+    fees = MembershipFee.objects.filter(user=OuterRef('pk')).order_by().values('user')
+    donations = VoluntaryDonation.objects.filter(donor=OuterRef('pk')).order_by().values('donor')
+
+    def aggregate_of(related, aggregate, output_field, default):
+        subquery = Subquery(
+            related.annotate(value=aggregate).values('value'),
+            output_field=output_field
+        )
+        if default is None:
+            return subquery
+        return Coalesce(subquery, Value(default), output_field=output_field)
+
+    paid = Q(status='paid')
+
+    return queryset.annotate(
+        fees_total=aggregate_of(fees, Count('id'), IntegerField(), 0),
+        fees_paid=aggregate_of(fees, Count('id', filter=paid), IntegerField(), 0),
+        fees_pending=aggregate_of(fees, Count('id', filter=Q(status='pending')), IntegerField(), 0),
+        fees_overdue=aggregate_of(fees, Count('id', filter=Q(status='overdue')), IntegerField(), 0),
+        fees_paid_amount=aggregate_of(fees, Sum('amount', filter=paid), money, 0),
+        fees_last_paid_at=aggregate_of(fees, Max('paid_at', filter=paid), DateTimeField(), None),
+        donations_total=aggregate_of(donations, Count('id'), IntegerField(), 0),
+        donations_amount=aggregate_of(donations, Sum('amount'), money, 0),
+    )
+
+
+def _with_financial_summary(obj):
+    """Return obj carrying the financial annotations, loading them if missing"""
+    if hasattr(obj, 'fees_total'):
+        return obj
+    return annotate_financial_summary(User.objects.filter(pk=obj.pk)).get()
+
+
 class MemberListSerializer(serializers.ModelSerializer):
-    """Serializer for member list with financial summary"""
+    """
+    Serializer for member list with financial summary.
+    Expects a queryset prepared with annotate_financial_summary().
+    """
 
     profile = UserProfileSerializer(read_only=True)
     full_name = serializers.ReadOnlyField()
@@ -65,41 +118,21 @@ class MemberListSerializer(serializers.ModelSerializer):
 
     def get_financial_summary(self, obj):
         """Get financial summary for member"""
-        from finance.models import MembershipFee, VoluntaryDonation
-        from django.db.models import Sum, Count, Q
-
-        # Membership fees summary
-        fees = MembershipFee.objects.filter(user=obj)
-        total_fees = fees.count()
-        paid_fees = fees.filter(status='paid').count()
-        pending_fees = fees.filter(status='pending').count()
-        overdue_fees = fees.filter(status='overdue').count()
-        total_fees_amount = fees.filter(status='paid').aggregate(
-            total=Sum('amount')
-        )['total'] or 0
-
-        # Voluntary donations summary
-        donations = VoluntaryDonation.objects.filter(donor=obj)
-        total_donations = donations.count()
-        total_donations_amount = donations.aggregate(
-            total=Sum('amount')
-        )['total'] or 0
-
-        # Last payment date
-        last_payment = fees.filter(status='paid').order_by('-paid_at').first()
-        last_payment_date = last_payment.paid_at if last_payment else None
+        totals = _with_financial_summary(obj)
+        total_fees_amount = totals.fees_paid_amount or 0
+        total_donations_amount = totals.donations_amount or 0
 
         return {
             'membership': {
-                'total_fees': total_fees,
-                'paid': paid_fees,
-                'pending': pending_fees,
-                'overdue': overdue_fees,
+                'total_fees': totals.fees_total,
+                'paid': totals.fees_paid,
+                'pending': totals.fees_pending,
+                'overdue': totals.fees_overdue,
                 'total_amount_paid': float(total_fees_amount),
-                'last_payment_date': last_payment_date
+                'last_payment_date': totals.fees_last_paid_at
             },
             'donations': {
-                'total_count': total_donations,
+                'total_count': totals.donations_total,
                 'total_amount': float(total_donations_amount)
             },
             'total_contributed': float(total_fees_amount + total_donations_amount)
@@ -107,7 +140,10 @@ class MemberListSerializer(serializers.ModelSerializer):
 
 
 class MemberDetailSerializer(serializers.ModelSerializer):
-    """Detailed serializer for individual member"""
+    """
+    Detailed serializer for individual member.
+    Expects a queryset prepared with annotate_financial_summary().
+    """
 
     profile = UserProfileSerializer(read_only=True)
     full_name = serializers.ReadOnlyField()
@@ -128,25 +164,17 @@ class MemberDetailSerializer(serializers.ModelSerializer):
 
     def get_financial_summary(self, obj):
         """Get complete financial summary"""
-        from finance.models import MembershipFee, VoluntaryDonation
-        from django.db.models import Sum
-
-        # Membership fees
-        fees = MembershipFee.objects.filter(user=obj)
-        fees_paid = fees.filter(status='paid')
-        total_fees_amount = fees_paid.aggregate(total=Sum('amount'))['total'] or 0
-
-        # Donations
-        donations = VoluntaryDonation.objects.filter(donor=obj)
-        total_donations_amount = donations.aggregate(total=Sum('amount'))['total'] or 0
+        totals = _with_financial_summary(obj)
+        total_fees_amount = totals.fees_paid_amount or 0
+        total_donations_amount = totals.donations_amount or 0
 
         return {
-            'total_fees': fees.count(),
-            'paid_fees': fees_paid.count(),
-            'pending_fees': fees.filter(status='pending').count(),
-            'overdue_fees': fees.filter(status='overdue').count(),
+            'total_fees': totals.fees_total,
+            'paid_fees': totals.fees_paid,
+            'pending_fees': totals.fees_pending,
+            'overdue_fees': totals.fees_overdue,
             'total_fees_amount': float(total_fees_amount),
-            'total_donations': donations.count(),
+            'total_donations': totals.donations_total,
             'total_donations_amount': float(total_donations_amount),
             'total_contributed': float(total_fees_amount + total_donations_amount)
         }
@@ -298,6 +326,7 @@ class OnboardingSerializer(serializers.Serializer):
             )
         return value
 
+    @transaction.atomic
     def create(self, validated_data):
         """Create user with profile during onboarding"""
         # Create user (email uniqueness already validated)
@@ -342,7 +371,7 @@ class OnboardingSerializer(serializers.Serializer):
         return user
 
     def _send_webhook_notification(self, user):
-        """Send webhook notification to Kestra for new member email"""
+        """Queue new member email webhook in the outbox (same transaction as the user)"""
         webhook_url = "https://n8n.texts.com.br/webhook-test/orbe_newmember_email"
 
         # Get language from user profile
@@ -356,21 +385,8 @@ class OnboardingSerializer(serializers.Serializer):
             "registration_date": user.date_joined.isoformat() if user.date_joined else None,
         }
 
-        try:
-            response = requests.post(
-                webhook_url,
-                json=payload,
-                headers={
-                    'Content-Type': 'application/json',
-                    'User-Agent': 'ORBE-Platform/1.0'
-                },
-                timeout=10  # 10 second timeout
-            )
-            response.raise_for_status()
-            logger.info(f"Webhook notification sent successfully for user {user.email}")
-        except requests.RequestException as e:
-            logger.error(f"Failed to send webhook notification for user {user.email}: {str(e)}")
-            # Don't raise the exception to avoid breaking user registration
+        enqueue_webhook(event='new_member', url=webhook_url, payload=payload)
+        logger.info(f"Webhook notification queued for user {user.email}")
 
     def save(self, user=None):
         """Save onboarding data to user and profile (for existing users)"""
@@ -456,8 +472,9 @@ class InvitationCreateSerializer(serializers.Serializer):
 
         return value
 
+    @transaction.atomic
     def create(self, validated_data):
-        """Create invitation and send email"""
+        """Create invitation and queue the invitation email"""
         from .models import InvitationToken
         from .utils.email_service import EmailService
 
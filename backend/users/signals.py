@@ -0,0 +1,65 @@
+"""
+Signals for the users app.
+
+Keeps cached member statistics consistent with the tables they are
+computed from, and drops cached token authentication entries when the
+token is deleted or the user or profile fields they carry change.
+"""
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from finance.models import MembershipFee, VoluntaryDonation
+from .authentication import invalidate_token_cache, token_cache_key
+from .models import User, UserProfile
+from .stats import invalidate_member_stats
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_stats_on_user_change(sender, instance, **kwargs):
+    """Invalidate member stats when a user changes (login timestamps excluded)"""
+    update_fields = kwargs.get('update_fields')
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    invalidate_member_stats()
+
+
+@receiver([post_save, post_delete], sender=MembershipFee)
+@receiver([post_save, post_delete], sender=VoluntaryDonation)
+def invalidate_stats_on_finance_change(sender, instance, **kwargs):
+    """Invalidate member stats when fees or donations change"""
+    invalidate_member_stats()
+
+
+def _invalidate_token_cache_on_commit(user_id):
+    transaction.on_commit(lambda: invalidate_token_cache(user_id))
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_token_cache_on_user_change(sender, instance, **kwargs):
+    """
+    Cached authentication entries embed the user (is_active, role, names).
+
+    Dropped once the change is committed, so entries cached meanwhile by
+    requests still reading the old values go too. Saves of the login timestamp alone
+    (every login) keep the entries.
+    """
+    update_fields = kwargs.get('update_fields')
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    _invalidate_token_cache_on_commit(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=UserProfile)
+def invalidate_token_cache_on_profile_change(sender, instance, **kwargs):
+    """Cached authentication entries embed the profile"""
+    _invalidate_token_cache_on_commit(instance.user_id)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_token_cache_on_token_delete(sender, instance, **kwargs):
+    """Revoked tokens (admin, user deletion) stop authenticating right away"""
+    cache.delete(token_cache_key(instance.key))
@@ -0,0 +1,175 @@
+"""
+Member statistics for the admin dashboard.
+
+Statistics are computed from three grouped aggregates (users, membership
+fees and voluntary donations) and kept in the configured Django cache.
+Cached snapshots are keyed by a generation counter that is bumped whenever
+User, MembershipFee or VoluntaryDonation rows change, so a single cache
+write invalidates every snapshot at once.
+"""
+
+import logging
+import time as time_module
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, CharField, Count, F, Q, Sum, Value, When
+from django.utils import timezone
+
+from .models import User
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = 'users:member_stats'
+GENERATION_KEY = f'{CACHE_KEY_PREFIX}:generation'
+
+
+def _new_generation():
+    """Generation seed that never collides with a previously evicted counter"""
+    return time_module.time_ns()
+
+
+def _current_generation():
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, _new_generation(), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+def invalidate_member_stats():
+    """Drop every cached statistics snapshot"""
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        # Counter evicted or never created: start a fresh generation
+        cache.set(GENERATION_KEY, _new_generation(), timeout=None)
+
+
+def get_member_stats(as_of=None):
+    """
+    Return member statistics, served from cache when available.
+
+    Args:
+        as_of: Optional date for a historical snapshot (default: live data)
+
+    Returns:
+        dict: Same payload as MemberViewSet.stats
+    """
+    if as_of is None:
+        snapshot = f'live:{timezone.localdate().isoformat()}'
+    else:
+        snapshot = as_of.isoformat()
+
+    key = f'{CACHE_KEY_PREFIX}:{_current_generation()}:{snapshot}'
+    stats = cache.get(key)
+
+    if stats is None:
+        stats = compute_member_stats(as_of)
+        cache.set(key, stats, timeout=settings.MEMBER_STATS_CACHE_TIMEOUT)
+    else:
+        logger.debug(f"Member stats served from cache ({snapshot})")
+
+    return stats
+
+
+def compute_member_stats(as_of=None):
+    """
+    Compute member statistics with grouped aggregates.
+
+    Live statistics use the stored fee status. Historical snapshots only
+    count rows that existed at the end of `as_of` and derive each fee's
+    status at that date from paid_at and due_date.
+    """
+    from finance.models import MembershipFee, VoluntaryDonation
+
+    users = User.objects.all()
+    fees = MembershipFee.objects.all()
+    donations = VoluntaryDonation.objects.all()
+
+    if as_of is None:
+        reference_day = timezone.localdate()
+        fee_status = F('status')
+    else:
+        reference_day = as_of
+        cutoff = timezone.make_aware(datetime.combine(as_of + timedelta(days=1), time.min))
+        users = users.filter(date_joined__lt=cutoff)
+        fees = fees.filter(created_at__lt=cutoff)
+        donations = donations.filter(donated_at__lt=cutoff)
+        fee_status = Case(
+            When(status='paid', paid_at__lt=cutoff, then=Value('paid')),
+            When(due_date__lt=as_of, then=Value('overdue')),
+            default=Value('pending'),
+            output_field=CharField()
+        )
+
+    recent_since = timezone.make_aware(
+        datetime.combine(reference_day - timedelta(days=30), time.min)
+    )
+
+    # Query 1: users grouped by role, registration method and active flag
+    user_rows = users.order_by().values(
+        'role', 'registration_method', 'is_active'
+    ).annotate(
+        count=Count('id'),
+        recent=Count('id', filter=Q(date_joined__gte=recent_since))
+    )
+
+    members_by_role = {
+        role_value: {'label': role_label, 'count': 0}
+        for role_value, role_label in User.Role.choices
+    }
+    registration_methods = {
+        method_value: {'label': method_label, 'count': 0}
+        for method_value, method_label in User.RegistrationMethod.choices
+    }
+    total_members = active_members = recent_registrations = 0
+
+    for row in user_rows:
+        total_members += row['count']
+        recent_registrations += row['recent']
+        if row['is_active']:
+            active_members += row['count']
+        if row['role'] in members_by_role:
+            members_by_role[row['role']]['count'] += row['count']
+        if row['registration_method'] in registration_methods:
+            registration_methods[row['registration_method']]['count'] += row['count']
+
+    # Query 2: fees grouped by (snapshot) status
+    fee_rows = fees.order_by().annotate(
+        snapshot_status=fee_status
+    ).values('snapshot_status').annotate(
+        count=Count('id'),
+        amount=Sum('amount'),
+        members=Count('user', distinct=True)
+    )
+    fees_by_status = {row['snapshot_status']: row for row in fee_rows}
+
+    def fee_value(status, field):
+        row = fees_by_status.get(status)
+        return (row[field] or 0) if row else 0
+
+    # Query 3: donations total
+    total_fees_collected = fee_value('paid', 'amount')
+    total_donations_collected = donations.aggregate(total=Sum('amount'))['total'] or 0
+
+    return {
+        'as_of': as_of.isoformat() if as_of else None,
+        'overview': {
+            'total_members': total_members,
+            'active_members': active_members,
+            'inactive_members': total_members - active_members,
+            'recent_registrations_30d': recent_registrations
+        },
+        'by_role': members_by_role,
+        'financial': {
+            'total_fees_collected': float(total_fees_collected),
+            'total_donations_collected': float(total_donations_collected),
+            'total_revenue': float(total_fees_collected + total_donations_collected),
+            'pending_fees_count': fee_value('pending', 'count'),
+            'overdue_fees_count': fee_value('overdue', 'count'),
+            'members_with_overdue': fee_value('overdue', 'members')
+        },
+        'registration_methods': registration_methods
+    }
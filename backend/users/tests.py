@@ -1,3 +1,364 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from .authentication import CachedTokenAuthentication, token_cache_key
+from .models import User
+from .serializers import MemberListSerializer
+from .stats import compute_member_stats, get_member_stats
+from .utils.search import build_user_search_key, normalize_search_text
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Cached token entries never outlive a revoked token or a changed user"""
+
+    members_url = '/api/users/members/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            email='admin@orbe.org', username='admin', password='x', role='SUPER_ADMIN'
+        )
+        cls.member = User.objects.create_user(email='membro@orbe.org', username='membro', password='x')
+
+    def setUp(self):
+        cache.clear()
+        self.token = Token.objects.create(user=self.member)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.admin_client = APIClient()
+        self.admin_client.force_authenticate(self.admin)
+
+    def test_cached_request_costs_no_query(self):
+        self.assertEqual(self.client.get(self.members_url).status_code, 403)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.members_url).status_code, 403)
+
+    def test_cache_entry_has_no_password_hash(self):
+        self.client.get(self.members_url)
+
+        entry = cache.get(token_cache_key(self.token.key))
+        self.assertIsNotNone(entry)
+        self.assertNotIn('password', entry['user'])
+        self.assertNotIn(self.member.password, repr(entry))
+        self.assertNotIn(self.token.key, token_cache_key(self.token.key))
+
+    def test_deleted_token_is_rejected(self):
+        self.client.get(self.members_url)
+
+        self.token.delete()
+
+        self.assertEqual(self.client.get(self.members_url).status_code, 401)
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get(self.members_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.admin_client.patch(f'{self.members_url}{self.member.pk}/toggle_active/')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.client.get(self.members_url).status_code, 401)
+
+    def test_role_change_is_seen_on_next_request(self):
+        self.assertEqual(self.client.get(self.members_url).status_code, 403)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.admin_client.patch(
+                f'{self.members_url}{self.member.pk}/update_role/', {'role': 'SUPER_ADMIN'}, format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.client.get(self.members_url).status_code, 200)
+
+    def test_user_saved_elsewhere_is_refreshed(self):
+        # Admin edits and scripts go through User.save() only
+        self.assertEqual(self.client.get(self.members_url).status_code, 403)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.member.role = 'SUPER_ADMIN'
+            self.member.save()
+        self.assertEqual(self.client.get(self.members_url).status_code, 200)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.member.is_active = False
+            self.member.save(update_fields=['is_active'])
+        self.assertEqual(self.client.get(self.members_url).status_code, 401)
+
+    def test_entry_is_dropped_only_after_commit(self):
+        self.client.get(self.members_url)
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.member.first_name = 'Maria'
+            self.member.save()
+            self.assertIsNotNone(cache.get(token_cache_key(self.token.key)))
+
+        for callback in callbacks:
+            callback()
+        self.assertIsNone(cache.get(token_cache_key(self.token.key)))
+
+    def test_login_timestamp_keeps_the_entry(self):
+        self.client.get(self.members_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.member.last_login = timezone.now()
+            self.member.save(update_fields=['last_login'])
+
+        self.assertIsNotNone(cache.get(token_cache_key(self.token.key)))
+
+    def test_logout_revokes_the_cached_token(self):
+        self.client.get(self.members_url)
+
+        self.assertEqual(self.client.post('/api/auth/logout/').status_code, 200)
+
+        self.assertIsNone(cache.get(token_cache_key(self.token.key)))
+        self.assertEqual(self.client.get(self.members_url).status_code, 401)
+
+    def test_saving_cached_user_keeps_the_password(self):
+        self.client.get(self.members_url)
+        cached_user, _ = CachedTokenAuthentication().authenticate_credentials(self.token.key)
+
+        cached_user.first_name = 'Maria'
+        cached_user.save()
+
+        self.member.refresh_from_db()
+        self.assertEqual(self.member.first_name, 'Maria')
+        self.assertTrue(self.member.check_password('x'))
+
+
+class MemberListTests(TestCase):
+    """GET /api/users/members/ with annotated financial summaries"""
+
+    url = '/api/users/members/'
+
+    @classmethod
+    def setUpTestData(cls):
+        from finance.models import MembershipFee, VoluntaryDonation
+
+        cls.admin = User.objects.create_user(
+            email='admin@orbe.org', username='admin', password='x', role='SUPER_ADMIN'
+        )
+        cls.member = User.objects.create_user(email='membro@orbe.org', username='membro', password='x')
+        for month, status in ((1, 'paid'), (2, 'paid'), (3, 'pending'), (4, 'overdue')):
+            MembershipFee.objects.create(
+                user=cls.member, competency_month=date(2026, month, 1), amount=Decimal('50.00'),
+                due_date=date(2026, month, 10), status=status,
+                paid_at=timezone.now() if status == 'paid' else None
+            )
+        VoluntaryDonation.objects.create(donor=cls.member, amount=Decimal('25.50'))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def add_members(self, count):
+        for index in range(count):
+            User.objects.create_user(email=f'extra{index}@orbe.org', username=f'extra{index}', password='x')
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        # COUNT for the paginator, then the annotated page
+        with self.assertNumQueries(2):
+            small = self.client.get(self.url)
+        self.add_members(15)
+        with self.assertNumQueries(2):
+            large = self.client.get(self.url)
+
+        self.assertEqual(len(small.data['results']), 2)
+        self.assertEqual(len(large.data['results']), 17)
+
+    def test_annotated_summary_matches_per_member_lookup(self):
+        response = self.client.get(self.url)
+
+        for item in response.data['results']:
+            # A plain instance makes the serializer load the aggregates itself
+            user = User.objects.get(pk=item['id'])
+            self.assertEqual(item['financial_summary'], MemberListSerializer(user).data['financial_summary'])
+
+        summary = next(item for item in response.data['results'] if item['id'] == self.member.pk)['financial_summary']
+        self.assertEqual(
+            (summary['membership']['total_fees'], summary['membership']['paid'],
+             summary['membership']['pending'], summary['membership']['overdue']),
+            (4, 2, 1, 1)
+        )
+        self.assertEqual(summary['membership']['total_amount_paid'], 100.0)
+        self.assertEqual(summary['donations'], {'total_count': 1, 'total_amount': 25.5})
+        self.assertEqual(summary['total_contributed'], 125.5)
+
+
+class MemberStatsTests(TestCase):
+    """users.stats: grouped aggregates, cached until the source rows change"""
+
+    @classmethod
+    def setUpTestData(cls):
+        from finance.models import MembershipFee, VoluntaryDonation
+
+        cls.admin = User.objects.create_user(
+            email='admin@orbe.org', username='admin', password='x', role='SUPER_ADMIN'
+        )
+        cls.member = User.objects.create_user(email='membro@orbe.org', username='membro', password='x')
+        User.objects.create_user(email='inativo@orbe.org', username='inativo', password='x', is_active=False)
+
+        today = timezone.localdate()
+        cls.paid = MembershipFee.objects.create(
+            user=cls.member, competency_month=date(2026, 1, 1), amount=Decimal('50.00'),
+            due_date=today - timedelta(days=40), status='paid', paid_at=timezone.now()
+        )
+        cls.overdue = MembershipFee.objects.create(
+            user=cls.member, competency_month=date(2026, 2, 1), amount=Decimal('50.00'),
+            due_date=today - timedelta(days=10), status='overdue'
+        )
+        cls.pending = MembershipFee.objects.create(
+            user=cls.admin, competency_month=date(2026, 2, 1), amount=Decimal('50.00'),
+            due_date=today - timedelta(days=1), status='pending'
+        )
+        VoluntaryDonation.objects.create(donor=cls.member, amount=Decimal('30.00'))
+
+    def setUp(self):
+        cache.clear()
+
+    def test_live_stats(self):
+        stats = compute_member_stats()
+
+        self.assertEqual(stats['overview'], {
+            'total_members': 3, 'active_members': 2, 'inactive_members': 1, 'recent_registrations_30d': 3
+        })
+        self.assertEqual(stats['by_role']['SUPER_ADMIN']['count'], 1)
+        self.assertEqual(stats['by_role']['MEMBER']['count'], 2)
+        self.assertEqual(stats['financial'], {
+            'total_fees_collected': 50.0,
+            'total_donations_collected': 30.0,
+            'total_revenue': 80.0,
+            'pending_fees_count': 1,
+            'overdue_fees_count': 1,
+            'members_with_overdue': 1,
+        })
+
+    def test_historical_snapshot_derives_fee_status(self):
+        from finance.models import MembershipFee
+
+        MembershipFee.objects.update(created_at=timezone.now() - timedelta(days=60))
+        # Both fees were paid today: still overdue at the end of yesterday
+        MembershipFee.objects.filter(pk=self.overdue.pk).update(status='paid', paid_at=timezone.now())
+
+        stats = compute_member_stats(timezone.localdate() - timedelta(days=1))
+
+        self.assertEqual(stats['financial']['total_fees_collected'], 0.0)
+        # Due yesterday: overdue only from today on
+        self.assertEqual(stats['financial']['overdue_fees_count'], 2)
+        self.assertEqual(stats['financial']['pending_fees_count'], 1)
+
+    def test_snapshot_ignores_rows_created_later(self):
+        stats = compute_member_stats(timezone.localdate() - timedelta(days=1))
+
+        self.assertEqual(stats['overview']['total_members'], 0)
+        self.assertEqual(stats['financial']['total_donations_collected'], 0.0)
+
+    def test_stats_are_served_from_cache(self):
+        stats = get_member_stats()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_member_stats(), stats)
+
+    def test_fee_donation_and_user_changes_invalidate(self):
+        from finance.models import VoluntaryDonation
+
+        get_member_stats()
+        self.pending.status = 'paid'
+        self.pending.paid_at = timezone.now()
+        self.pending.save()
+        self.assertEqual(get_member_stats()['financial']['total_fees_collected'], 100.0)
+
+        VoluntaryDonation.objects.create(donor=self.admin, amount=Decimal('20.00'))
+        self.assertEqual(get_member_stats()['financial']['total_donations_collected'], 50.0)
+
+        self.member.is_active = False
+        self.member.save()
+        self.assertEqual(get_member_stats()['overview']['active_members'], 1)
+
+    def test_login_does_not_invalidate(self):
+        stats = get_member_stats()
+
+        self.member.last_login = timezone.now()
+        self.member.save(update_fields=['last_login'])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_member_stats(), stats)
+
+    def test_bulk_overdue_update_invalidates(self):
+        from finance.tasks import update_overdue_status
+
+        get_member_stats()
+        update_overdue_status()
+
+        self.assertEqual(get_member_stats()['financial']['overdue_fees_count'], 2)
+
+    def test_endpoint_rejects_future_as_of(self):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        future = (timezone.localdate() + timedelta(days=1)).isoformat()
+
+        self.assertEqual(client.get('/api/users/members/stats/', {'as_of': future}).status_code, 400)
+        self.assertEqual(client.get('/api/users/members/stats/').data['overview']['total_members'], 3)
+
+
+class MemberAutocompleteTests(TestCase):
+    """GET /api/users/members/autocomplete/ on the normalised search_key"""
+
+    url = '/api/users/members/autocomplete/'
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.joao = User.objects.create_user(
+            email='joao@orbe.org', username='joao', password='x', first_name='João', last_name='da Silva'
+        )
+        cls.maria = User.objects.create_user(
+            email='maria.joaquina@orbe.org', username='maria', password='x', first_name='Maria', last_name='Joaquina'
+        )
+        cls.ana = User.objects.create_user(
+            email='ana@orbe.org', username='ana', password='x', first_name='Ana', last_name='Conceição'
+        )
+        for index in range(60):
+            User.objects.create_user(email=f'membro{index}@orbe.org', username=f'membro{index}', password='x')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.joao)
+
+    def search(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return [item['id'] for item in response.data]
+
+    def test_search_key_normalisation(self):
+        self.assertEqual(normalize_search_text('  JOÃO\tda   Silva '), 'joao da silva')
+        self.assertEqual(normalize_search_text(None), '')
+        self.assertEqual(
+            build_user_search_key('Ana', 'Conceição', 'Ana@Orbe.org'), 'ana conceicao ana@orbe.org'
+        )
+
+    def test_search_key_follows_partial_saves(self):
+        self.ana.last_name = 'Núñez'
+        self.ana.save(update_fields=['last_name'])
+
+        self.assertEqual(User.objects.get(pk=self.ana.pk).search_key, 'ana nunez ana@orbe.org')
+
+    def test_matches_are_accent_insensitive_and_ranked(self):
+        # Name prefix, then word prefix (last name and email of Maria)
+        self.assertEqual(self.search(search='JOA'), [self.joao.pk, self.maria.pk])
+        self.assertEqual(self.search(search='conceicao'), [self.ana.pk])
+
+    def test_short_queries_only_match_word_starts(self):
+        self.assertEqual(self.search(search='si'), [self.joao.pk])
+        self.assertEqual(self.search(search='il'), [])
 
-# Create your tests here.
+    def test_limit_is_clamped(self):
+        self.assertEqual(len(self.search()), 20)
+        self.assertEqual(len(self.search(limit=5)), 5)
+        self.assertEqual(len(self.search(limit=500)), 50)
+        self.assertEqual(len(self.search(limit=0)), 1)
+        self.assertEqual(len(self.search(limit='abc')), 20)
@@ -4,11 +4,12 @@ Sends emails via n8n webhook with RabbitMQ backing for reliability
 """
 
 import logging
-import requests
 from django.conf import settings
 from django.template.loader import render_to_string
 from typing import Dict, Optional
 
+from webhooks.services import enqueue_webhook
+
 logger = logging.getLogger(__name__)
 
 
@@ -17,13 +18,15 @@ class EmailService:
     Professional email service with n8n webhook integration.
 
     Architecture:
-    - Django sends payload to n8n webhook
+    - Django writes the payload to the webhook outbox (same transaction)
+    - Celery delivery worker posts it to the n8n webhook, with retries
     - n8n queues email in RabbitMQ (handles excess requests)
     - RabbitMQ ensures delivery even during high load
     - Email sent asynchronously without blocking Django
     """
 
     N8N_WEBHOOK_URL = "https://n8n.texts.com.br/webhook/orbe_member_invitation"
+    N8N_WELCOME_WEBHOOK_URL = "https://n8n.texts.com.br/webhook-test/orbe_welcome_email"
 
     @classmethod
     def send_invitation_email(
@@ -47,7 +50,7 @@ class EmailService:
             language: Email language (default: "pt-BR")
 
         Returns:
-            bool: True if webhook accepted the request, False otherwise
+            bool: True if the email was queued in the webhook outbox, False otherwise
         """
         try:
             # Generate activation link
@@ -62,63 +65,41 @@ class EmailService:
                 'activation_link': activation_link,
                 'expires_in': expires_in,
             })
-
-            # Prepare payload for n8n webhook
-            payload = {
-                "type": "invitation",
-                "to": email,
-                "recipient": {
-                    "email": email,
-                    "first_name": first_name,
-                    "last_name": last_name
-                },
-                "data": {
-                    "activation_link": activation_link,
-                    "token": token,
-                    "expires_in": expires_in,
-                    "language": language
-                },
-                "html_content": html_content,
-                "subject": f"Bem-vindo à ORBE, {first_name}! 🎉",
-                "priority": "high"  # RabbitMQ priority queue
-            }
-
-            logger.info(f"Sending invitation email to {email} via n8n webhook")
-
-            # Send to n8n webhook (with RabbitMQ backing)
-            response = requests.post(
-                cls.N8N_WEBHOOK_URL,
-                json=payload,
-                headers={
-                    'Content-Type': 'application/json',
-                    'User-Agent': 'ORBE-Platform/1.0',
-                    'X-Source': 'django-invitation-system'
-                },
-                timeout=10  # 10 second timeout
-            )
-
-            if response.status_code in [200, 201, 202]:
-                logger.info(f"✅ Invitation email queued successfully for {email} (Status: {response.status_code})")
-                return True
-            else:
-                logger.error(
-                    f"❌ n8n webhook returned error for {email}: "
-                    f"Status {response.status_code}, Response: {response.text}"
-                )
-                return False
-
-        except requests.exceptions.Timeout:
-            logger.error(f"⏱️ Timeout sending invitation email to {email} (n8n webhook)")
-            return False
-
-        except requests.exceptions.RequestException as e:
-            logger.error(f"❌ Network error sending invitation email to {email}: {str(e)}")
-            return False
-
         except Exception as e:
-            logger.error(f"❌ Unexpected error sending invitation email to {email}: {str(e)}")
+            logger.error(f"❌ Unexpected error preparing invitation email to {email}: {str(e)}")
             return False
 
+        # Prepare payload for n8n webhook
+        payload = {
+            "type": "invitation",
+            "to": email,
+            "recipient": {
+                "email": email,
+                "first_name": first_name,
+                "last_name": last_name
+            },
+            "data": {
+                "activation_link": activation_link,
+                "token": token,
+                "expires_in": expires_in,
+                "language": language
+            },
+            "html_content": html_content,
+            "subject": f"Bem-vindo à ORBE, {first_name}! 🎉",
+            "priority": "high"  # RabbitMQ priority queue
+        }
+
+        # Written in the caller's transaction, delivered after commit
+        enqueue_webhook(
+            event='member_invitation',
+            url=cls.N8N_WEBHOOK_URL,
+            payload=payload,
+            headers={'X-Source': 'django-invitation-system'}
+        )
+
+        logger.info(f"✅ Invitation email queued for {email}")
+        return True
+
     @classmethod
     def send_welcome_email(
         cls,
@@ -135,38 +116,28 @@ class EmailService:
             language: Email language (default: "pt-BR")
 
         Returns:
-            bool: True if webhook accepted the request, False otherwise
+            bool: True if the email was queued in the webhook outbox
         """
-        try:
-            payload = {
-                "type": "welcome",
-                "to": email,
-                "recipient": {
-                    "email": email,
-                    "first_name": first_name
-                },
-                "data": {
-                    "language": language,
-                    "dashboard_link": f"{getattr(settings, 'FRONTEND_URL', 'http://localhost:3000')}/dashboard"
-                },
-                "subject": f"Bem-vindo à comunidade ORBE, {first_name}! 🌟",
-                "priority": "normal"
-            }
-
-            logger.info(f"Sending welcome email to {email} via n8n webhook")
-
-            response = requests.post(
-                "https://n8n.texts.com.br/webhook-test/orbe_welcome_email",
-                json=payload,
-                headers={
-                    'Content-Type': 'application/json',
-                    'User-Agent': 'ORBE-Platform/1.0'
-                },
-                timeout=10
-            )
-
-            return response.status_code in [200, 201, 202]
-
-        except Exception as e:
-            logger.error(f"Error sending welcome email to {email}: {str(e)}")
-            return False
\ No newline at end of file
+        payload = {
+            "type": "welcome",
+            "to": email,
+            "recipient": {
+                "email": email,
+                "first_name": first_name
+            },
+            "data": {
+                "language": language,
+                "dashboard_link": f"{getattr(settings, 'FRONTEND_URL', 'http://localhost:3000')}/dashboard"
+            },
+            "subject": f"Bem-vindo à comunidade ORBE, {first_name}! 🌟",
+            "priority": "normal"
+        }
+
+        enqueue_webhook(
+            event='welcome_email',
+            url=cls.N8N_WELCOME_WEBHOOK_URL,
+            payload=payload
+        )
+
+        logger.info(f"Welcome email queued for {email}")
+        return True
@@ -0,0 +1,64 @@
+"""
+Search key helpers for member lookups.
+
+User.search_key stores the member's name and email lowercased, accent-folded
+and whitespace-collapsed ("joao da silva joao@orbe.org"). Queries are
+normalised the same way so matching is a plain LIKE on an indexed column.
+"""
+
+import re
+import unicodedata
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_search_text(value):
+    """Lowercase, strip accents and collapse whitespace"""
+    if not value:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', value)
+    folded = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return _WHITESPACE.sub(' ', folded.lower()).strip()
+
+
+def build_user_search_key(first_name, last_name, email):
+    """Search key for a user: normalised full name followed by email"""
+    parts = [first_name, last_name, email]
+    return normalize_search_text(' '.join(part for part in parts if part))
+
+
+# pg_trgm needs at least three characters to use the trigram index;
+# shorter queries only match from the start of a word
+MIN_INFIX_LENGTH = 3
+
+
+def search_members(queryset, query):
+    """
+    Filter users by search_key and annotate `match_rank` (lower is better).
+
+    Ranks:
+        0 - full name starts with the query
+        1 - a later word (last name, email) starts with the query
+        2 - the query appears anywhere (queries of 3+ characters only)
+
+    Returns:
+        QuerySet ordered by match quality, then name
+    """
+    from django.db.models import Case, IntegerField, Q, Value, When
+
+    term = normalize_search_text(query)
+    if not term:
+        return queryset
+
+    condition = Q(search_key__startswith=term) | Q(search_key__contains=f' {term}')
+    if len(term) >= MIN_INFIX_LENGTH:
+        condition = Q(search_key__contains=term)
+
+    return queryset.filter(condition).annotate(
+        match_rank=Case(
+            When(search_key__startswith=term, then=Value(0)),
+            When(search_key__contains=f' {term}', then=Value(1)),
+            default=Value(2),
+            output_field=IntegerField()
+        )
+    ).order_by('match_rank', 'search_key')
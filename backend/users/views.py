@@ -21,11 +21,16 @@ from .serializers import (
     PasswordSetupSerializer,
     MemberListSerializer,
     MemberDetailSerializer,
-    UserAutocompleteSerializer
+    UserAutocompleteSerializer,
+    annotate_financial_summary
 )
+from .utils.search import search_members
 
 User = get_user_model()
 
+AUTOCOMPLETE_DEFAULT_LIMIT = 20
+AUTOCOMPLETE_MAX_LIMIT = 50
+
 
 class UserProfileViewSet(viewsets.ModelViewSet):
     """ViewSet for user profiles"""
@@ -357,8 +362,11 @@ class MemberViewSet(viewsets.ReadOnlyModelViewSet):
         - is_active: Filter by active status (true/false)
         - search: Search by name or email
         - has_overdue: Filter members with overdue fees (true/false)
+
+        Financial aggregates are annotated here so list and detail pages
+        are served by a single query instead of several per member.
         """
-        queryset = User.objects.select_related('profile').all()
+        queryset = annotate_financial_summary(User.objects.select_related('profile'))
 
         # Filter by role
         role = self.request.query_params.get('role')
@@ -402,81 +410,42 @@ class MemberViewSet(viewsets.ReadOnlyModelViewSet):
         """
         Get overall members statistics.
 
+        Query params:
+        - as_of: Optional date (YYYY-MM-DD) for a historical snapshot
+
         Returns:
         - Total members
         - Active/inactive members
         - Members by role
         - Financial overview
         - Recent registrations
-        """
-        from finance.models import MembershipFee, VoluntaryDonation
-        from django.db.models import Sum, Count, Q
-        from datetime import date, timedelta
-
-        # Total members
-        total_members = User.objects.count()
-        active_members = User.objects.filter(is_active=True).count()
-        inactive_members = total_members - active_members
-
-        # Members by role
-        members_by_role = {}
-        for role_value, role_label in User.Role.choices:
-            count = User.objects.filter(role=role_value).count()
-            members_by_role[role_value] = {
-                'label': role_label,
-                'count': count
-            }
 
-        # Financial overview
-        total_fees_collected = MembershipFee.objects.filter(
-            status='paid'
-        ).aggregate(total=Sum('amount'))['total'] or 0
-
-        total_donations_collected = VoluntaryDonation.objects.aggregate(
-            total=Sum('amount')
-        )['total'] or 0
-
-        pending_fees_count = MembershipFee.objects.filter(status='pending').count()
-        overdue_fees_count = MembershipFee.objects.filter(status='overdue').count()
-
-        # Members with financial issues
-        members_with_overdue = User.objects.filter(
-            membership_fees__status='overdue'
-        ).distinct().count()
-
-        # Recent registrations (last 30 days)
-        thirty_days_ago = date.today() - timedelta(days=30)
-        recent_registrations = User.objects.filter(
-            date_joined__gte=thirty_days_ago
-        ).count()
-
-        # Registration method breakdown
-        registration_methods = {}
-        for method_value, method_label in User.RegistrationMethod.choices:
-            count = User.objects.filter(registration_method=method_value).count()
-            registration_methods[method_value] = {
-                'label': method_label,
-                'count': count
-            }
-
-        return Response({
-            'overview': {
-                'total_members': total_members,
-                'active_members': active_members,
-                'inactive_members': inactive_members,
-                'recent_registrations_30d': recent_registrations
-            },
-            'by_role': members_by_role,
-            'financial': {
-                'total_fees_collected': float(total_fees_collected),
-                'total_donations_collected': float(total_donations_collected),
-                'total_revenue': float(total_fees_collected + total_donations_collected),
-                'pending_fees_count': pending_fees_count,
-                'overdue_fees_count': overdue_fees_count,
-                'members_with_overdue': members_with_overdue
-            },
-            'registration_methods': registration_methods
-        })
+        Results are cached and invalidated whenever users, fees or
+        donations change (see users.stats).
+        """
+        from django.utils.dateparse import parse_date
+        from django.utils import timezone
+        from .stats import get_member_stats
+
+        as_of = None
+        as_of_param = request.query_params.get('as_of')
+        if as_of_param:
+            try:
+                as_of = parse_date(as_of_param)
+            except ValueError:
+                as_of = None
+            if as_of is None:
+                return Response(
+                    {'error': 'Invalid as_of date. Use the YYYY-MM-DD format'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if as_of > timezone.localdate():
+                return Response(
+                    {'error': 'as_of cannot be in the future'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        return Response(get_member_stats(as_of))
 
     @action(detail=True, methods=['patch'])
     def update_role(self, request, pk=None):
@@ -549,11 +518,14 @@ class MemberViewSet(viewsets.ReadOnlyModelViewSet):
         Returns only id, email, and full_name for quick lookups.
 
         Query params:
-        - search: Search by name or email
+        - search: Search by name or email (accent and case insensitive)
         - is_active: Filter by active status (default: true)
-        - limit: Max results (default: 20)
+        - limit: Max results (default: 20, max: 50)
+
+        Results are ranked by match quality (name prefix, word prefix,
+        substring) using the indexed User.search_key column.
         """
-        queryset = User.objects.all()
+        queryset = User.objects.only('id', 'email', 'first_name', 'last_name')
 
         # Filter by active status (default to true)
         is_active = request.query_params.get('is_active', 'true')
@@ -562,15 +534,16 @@ class MemberViewSet(viewsets.ReadOnlyModelViewSet):
         # Search by name or email
         search = request.query_params.get('search', '')
         if search:
-            from django.db.models import Q
-            queryset = queryset.filter(
-                Q(first_name__icontains=search) |
-                Q(last_name__icontains=search) |
-                Q(email__icontains=search)
-            )
+            queryset = search_members(queryset, search)
+        else:
+            queryset = queryset.order_by('first_name', 'last_name')
 
         # Limit results
-        limit = int(request.query_params.get('limit', 20))
+        try:
+            limit = int(request.query_params.get('limit', AUTOCOMPLETE_DEFAULT_LIMIT))
+        except ValueError:
+            limit = AUTOCOMPLETE_DEFAULT_LIMIT
+        limit = max(1, min(limit, AUTOCOMPLETE_MAX_LIMIT))
         queryset = queryset[:limit]
 
         serializer = UserAutocompleteSerializer(queryset, many=True)
@@ -0,0 +1,97 @@
+"""
+Django admin configuration for the webhook outbox.
+"""
+
+from django.contrib import admin
+from django.utils import timezone
+from django.utils.html import format_html
+
+from .models import WebhookOutbox
+from .services import schedule_delivery
+
+
+@admin.register(WebhookOutbox)
+class WebhookOutboxAdmin(admin.ModelAdmin):
+    """Admin for inspecting and replaying outbound webhooks"""
+
+    list_display = [
+        'id',
+        'event',
+        'status_badge',
+        'attempts',
+        'last_status_code',
+        'next_attempt_at',
+        'created_at',
+        'delivered_at',
+    ]
+    list_filter = [
+        'status',
+        'event',
+        'created_at',
+    ]
+    search_fields = [
+        'url',
+        'last_error',
+    ]
+    readonly_fields = [
+        'event',
+        'url',
+        'payload',
+        'headers',
+        'status',
+        'attempts',
+        'max_attempts',
+        'next_attempt_at',
+        'last_status_code',
+        'last_error',
+        'created_at',
+        'delivered_at',
+    ]
+    fieldsets = (
+        ('Webhook', {
+            'fields': ('event', 'url', 'headers', 'payload')
+        }),
+        ('Delivery', {
+            'fields': ('status', 'attempts', 'max_attempts', 'next_attempt_at', 'delivered_at')
+        }),
+        ('Last Attempt', {
+            'fields': ('last_status_code', 'last_error')
+        }),
+        ('Timestamps', {
+            'fields': ('created_at',),
+            'classes': ('collapse',)
+        }),
+    )
+    date_hierarchy = 'created_at'
+    ordering = ['-created_at']
+    actions = ['replay_webhooks']
+
+    def has_add_permission(self, request):
+        """Entries are only written by the application"""
+        return False
+
+    @admin.display(description='Status')
+    def status_badge(self, obj):
+        colors = {
+            'pending': 'orange',
+            'processing': '#17a2b8',
+            'delivered': 'green',
+            'dead': 'red',
+        }
+        color = colors.get(obj.status, 'gray')
+        return format_html(
+            '<span style="background-color: {}; color: white; padding: 3px 10px; border-radius: 3px;">{}</span>',
+            color,
+            obj.get_status_display()
+        )
+
+    @admin.action(description='Replay selected webhooks')
+    def replay_webhooks(self, request, queryset):
+        updated = queryset.exclude(status='processing').update(
+            status='pending',
+            attempts=0,
+            next_attempt_at=timezone.now(),
+            last_error=''
+        )
+        schedule_delivery()
+        self.message_user(request, f'{updated} webhooks queued for delivery.')
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.7 on 2026-10-16 20:33
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WebhookOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.CharField(help_text='Logical event name (e.g. member_invitation, membership_reminder)', max_length=50, verbose_name='Event')),
+                ('url', models.URLField(max_length=500, verbose_name='URL')),
+                ('payload', models.JSONField(default=dict, verbose_name='Payload')),
+                ('headers', models.JSONField(blank=True, default=dict, help_text='Extra HTTP headers sent with the request', verbose_name='Headers')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('processing', 'Processing'), ('delivered', 'Delivered'), ('dead', 'Dead Letter')], default='pending', max_length=20, verbose_name='Status')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='Attempts')),
+                ('max_attempts', models.PositiveIntegerField(default=8, verbose_name='Max Attempts')),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now, help_text='Earliest time the entry can be (re)claimed by a worker', verbose_name='Next Attempt At')),
+                ('last_status_code', models.PositiveIntegerField(blank=True, null=True, verbose_name='Last Status Code')),
+                ('last_error', models.TextField(blank=True, verbose_name='Last Error')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Created At')),
+                ('delivered_at', models.DateTimeField(blank=True, null=True, verbose_name='Delivered At')),
+            ],
+            options={
+                'verbose_name': 'Webhook Outbox Entry',
+                'verbose_name_plural': 'Webhook Outbox',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'next_attempt_at'], name='webhooks_we_status_ca1ab7_idx'), models.Index(fields=['event', '-created_at'], name='webhooks_we_event_ea8da5_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,137 @@
+"""
+Transactional outbox for outbound webhooks (n8n).
+
+Call sites write a WebhookOutbox row in the same database transaction as
+the change that triggers it. The webhooks.deliver_webhooks Celery task
+drains the table in batches, retrying failures with exponential backoff
+until an entry is delivered or moved to the dead-letter state.
+"""
+
+import random
+from datetime import timedelta
+
+from django.db import models
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+
+class WebhookOutbox(models.Model):
+    """
+    A single outbound webhook call waiting for (or done with) delivery.
+
+    Lifecycle:
+    pending → processing → delivered
+                        ↘ pending (retry with backoff) → ... → dead
+    """
+
+    STATUS_CHOICES = [
+        ('pending', _('Pending')),
+        ('processing', _('Processing')),
+        ('delivered', _('Delivered')),
+        ('dead', _('Dead Letter')),
+    ]
+
+    # Retry schedule: 30s, 1m, 2m, 4m ... capped at 1h
+    BACKOFF_BASE_SECONDS = 30
+    BACKOFF_MAX_SECONDS = 60 * 60
+    DEFAULT_MAX_ATTEMPTS = 8
+
+    event = models.CharField(
+        max_length=50,
+        verbose_name=_('Event'),
+        help_text=_('Logical event name (e.g. member_invitation, membership_reminder)')
+    )
+    url = models.URLField(
+        max_length=500,
+        verbose_name=_('URL')
+    )
+    payload = models.JSONField(
+        default=dict,
+        verbose_name=_('Payload')
+    )
+    headers = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name=_('Headers'),
+        help_text=_('Extra HTTP headers sent with the request')
+    )
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default='pending',
+        verbose_name=_('Status')
+    )
+    attempts = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('Attempts')
+    )
+    max_attempts = models.PositiveIntegerField(
+        default=DEFAULT_MAX_ATTEMPTS,
+        verbose_name=_('Max Attempts')
+    )
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name=_('Next Attempt At'),
+        help_text=_('Earliest time the entry can be (re)claimed by a worker')
+    )
+    last_status_code = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name=_('Last Status Code')
+    )
+    last_error = models.TextField(
+        blank=True,
+        verbose_name=_('Last Error')
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_('Created At')
+    )
+    delivered_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_('Delivered At')
+    )
+
+    class Meta:
+        verbose_name = _('Webhook Outbox Entry')
+        verbose_name_plural = _('Webhook Outbox')
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+            models.Index(fields=['event', '-created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.event} #{self.pk} ({self.get_status_display()})"
+
+    def backoff_delay(self):
+        """Delay before the next attempt, with jitter to spread retries"""
+        seconds = min(
+            self.BACKOFF_BASE_SECONDS * (2 ** max(self.attempts - 1, 0)),
+            self.BACKOFF_MAX_SECONDS
+        )
+        return timedelta(seconds=seconds * random.uniform(0.8, 1.2))
+
+    def record_success(self, status_code):
+        """Mark as delivered (caller persists the change)"""
+        self.attempts += 1
+        self.status = 'delivered'
+        self.last_status_code = status_code
+        self.last_error = ''
+        self.delivered_at = timezone.now()
+
+    def record_failure(self, error, status_code=None):
+        """Schedule a retry or move to dead letter (caller persists the change)"""
+        self.attempts += 1
+        self.last_status_code = status_code
+        self.last_error = error
+        if self.attempts >= self.max_attempts:
+            self.status = 'dead'
+        else:
+            self.status = 'pending'
+            self.next_attempt_at = timezone.now() + self.backoff_delay()
+
+    @property
+    def is_dead(self):
+        return self.status == 'dead'
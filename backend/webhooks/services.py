@@ -0,0 +1,71 @@
+"""
+Helpers for writing to the webhook outbox.
+
+Use these instead of calling webhook endpoints inline: the entry is saved
+in the caller's transaction and delivery is kicked off only after commit.
+"""
+
+import logging
+
+from django.db import transaction
+
+from .models import WebhookOutbox
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    'Content-Type': 'application/json',
+    'User-Agent': 'ORBE-Platform/1.0',
+}
+
+
+def build_webhook(event, url, payload, headers=None):
+    """Build an unsaved outbox entry (for bulk inserts)"""
+    return WebhookOutbox(
+        event=event,
+        url=url,
+        payload=payload,
+        headers=headers or {}
+    )
+
+
+def enqueue_webhook(event, url, payload, headers=None):
+    """
+    Write a webhook to the outbox.
+
+    Args:
+        event: Logical event name
+        url: Endpoint URL
+        payload: JSON-serializable body
+        headers: Extra HTTP headers (optional)
+
+    Returns:
+        WebhookOutbox instance
+    """
+    entry = build_webhook(event, url, payload, headers)
+    entry.save()
+    schedule_delivery()
+    return entry
+
+
+def enqueue_webhooks(entries):
+    """Write several unsaved outbox entries with one INSERT"""
+    entries = WebhookOutbox.objects.bulk_create(entries)
+    if entries:
+        schedule_delivery()
+    return entries
+
+
+def schedule_delivery():
+    """Trigger the delivery worker once the current transaction commits"""
+    transaction.on_commit(_trigger_delivery)
+
+
+def _trigger_delivery():
+    from .tasks import deliver_webhooks
+
+    try:
+        deliver_webhooks.delay()
+    except Exception as e:
+        # The periodic beat run will pick the entries up
+        logger.warning(f"Could not trigger webhook delivery: {str(e)}")
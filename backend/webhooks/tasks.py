@@ -0,0 +1,143 @@
+"""
+Celery tasks for the webhook outbox.
+
+deliver_webhooks claims due entries in batches (row locks with SKIP LOCKED
+on PostgreSQL), posts them concurrently over a pooled HTTP session and
+records the outcome of every attempt with a single bulk_update per batch.
+"""
+
+from celery import shared_task
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.db import transaction
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+import logging
+import requests
+import time
+
+from .models import WebhookOutbox
+from .services import DEFAULT_HEADERS
+
+logger = logging.getLogger(__name__)
+
+# Entries claimed per batch, batches per run, concurrent requests per batch
+WEBHOOK_BATCH_SIZE = 100
+WEBHOOK_MAX_BATCHES = 50
+WEBHOOK_CONCURRENCY = 10
+WEBHOOK_TIMEOUT = 10
+
+# Claimed entries are re-claimable after this lease (worker crash recovery)
+WEBHOOK_CLAIM_LEASE = timedelta(minutes=5)
+
+# Per-worker pooled HTTP session (see _get_session)
+_session = None
+
+
+@shared_task(name='webhooks.deliver_webhooks')
+def deliver_webhooks(batch_size=WEBHOOK_BATCH_SIZE, max_batches=WEBHOOK_MAX_BATCHES):
+    """
+    Drain due outbox entries.
+    Triggered after commit by enqueue_webhook and every minute via Celery Beat.
+    """
+    started_at = time.time()
+    delivered = retried = dead = 0
+
+    for _ in range(max_batches):
+        entries = _claim_batch(batch_size)
+        if not entries:
+            break
+
+        session = _get_session()
+        with ThreadPoolExecutor(max_workers=WEBHOOK_CONCURRENCY) as executor:
+            results = list(executor.map(lambda entry: _post(entry, session), entries))
+
+        for entry, (status_code, error) in zip(entries, results):
+            if error is None:
+                entry.record_success(status_code)
+                delivered += 1
+            else:
+                entry.record_failure(error, status_code)
+                if entry.is_dead:
+                    dead += 1
+                    logger.error(
+                        f"Webhook {entry.event} #{entry.pk} moved to dead letter "
+                        f"after {entry.attempts} attempts: {error}"
+                    )
+                else:
+                    retried += 1
+
+        WebhookOutbox.objects.bulk_update(entries, [
+            'status', 'attempts', 'next_attempt_at', 'last_status_code',
+            'last_error', 'delivered_at'
+        ])
+
+    elapsed = max(time.time() - started_at, 0.001)
+    total = delivered + retried + dead
+    if total:
+        logger.info(
+            f"Webhook delivery: {delivered} delivered, {retried} to retry, {dead} dead "
+            f"in {elapsed:.1f}s - {round(total / elapsed, 2)} webhooks/s"
+        )
+
+    return {
+        'delivered': delivered,
+        'retried': retried,
+        'dead': dead,
+        'duration_seconds': round(elapsed, 3)
+    }
+
+
+def _claim_batch(batch_size):
+    """Lock and lease a batch of due entries so concurrent workers skip them"""
+    now = timezone.now()
+
+    with transaction.atomic():
+        entries = list(
+            WebhookOutbox.objects.select_for_update(skip_locked=True).filter(
+                status__in=['pending', 'processing'],
+                next_attempt_at__lte=now
+            ).order_by('next_attempt_at')[:batch_size]
+        )
+        if entries:
+            WebhookOutbox.objects.filter(
+                id__in=[entry.id for entry in entries]
+            ).update(status='processing', next_attempt_at=now + WEBHOOK_CLAIM_LEASE)
+
+    return entries
+
+
+def _post(entry, session):
+    """
+    Send one entry.
+    Returns:
+        tuple: (status_code or None, error message or None on success)
+    """
+    try:
+        response = session.post(
+            entry.url,
+            json=entry.payload,
+            headers={**DEFAULT_HEADERS, **(entry.headers or {})},
+            timeout=WEBHOOK_TIMEOUT
+        )
+    except requests.RequestException as e:
+        return None, str(e) or e.__class__.__name__
+
+    if 200 <= response.status_code < 300:
+        return response.status_code, None
+    return response.status_code, f"HTTP {response.status_code}: {response.text[:500]}"
+
+
+def _get_session():
+    """
+    Return the worker's shared HTTP session.
+    Keeps connections to n8n alive across entries and batches.
+    """
+    global _session
+    if _session is None:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=WEBHOOK_CONCURRENCY)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        _session = session
+    return _session
@@ -0,0 +1,185 @@
+from datetime import timedelta
+from unittest import mock
+
+import requests
+from django.db import transaction
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from users.models import User
+
+from .models import WebhookOutbox
+from .services import enqueue_webhook
+from .tasks import WEBHOOK_CLAIM_LEASE, _claim_batch, deliver_webhooks
+
+URL = 'https://n8n.example.org/webhook/teste'
+
+
+def http_response(status_code, text=''):
+    return mock.Mock(status_code=status_code, text=text)
+
+
+class OutboxTestCase(TestCase):
+    """Delivery with the pooled HTTP session mocked"""
+
+    def setUp(self):
+        self.session = mock.Mock()
+        self.session.post.return_value = http_response(200)
+        patcher = mock.patch('webhooks.tasks._get_session', return_value=self.session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def create_entry(self, **fields):
+        return WebhookOutbox.objects.create(event='member_invitation', url=URL, payload={'id': 1}, **fields)
+
+
+class OutboxEnqueueTests(OutboxTestCase):
+    """Entries are written in the caller's transaction, delivered after commit"""
+
+    def test_committed_entry_is_delivered_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            entry = enqueue_webhook('new_member', URL, {'email': 'membro@orbe.org'}, {'X-Token': 'abc'})
+            self.session.post.assert_not_called()
+
+        self.session.post.assert_called_once()
+        _, kwargs = self.session.post.call_args
+        self.assertEqual(kwargs['json'], {'email': 'membro@orbe.org'})
+        self.assertEqual(kwargs['headers']['X-Token'], 'abc')
+        self.assertEqual(kwargs['headers']['Content-Type'], 'application/json')
+
+        entry.refresh_from_db()
+        self.assertEqual((entry.status, entry.attempts, entry.last_status_code), ('delivered', 1, 200))
+        self.assertIsNotNone(entry.delivered_at)
+
+    def test_entry_from_rolled_back_transaction_is_never_delivered(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic():
+                    enqueue_webhook('new_member', URL, {'email': 'membro@orbe.org'})
+                    raise RuntimeError
+
+        self.assertEqual(callbacks, [])
+        self.assertFalse(WebhookOutbox.objects.exists())
+
+        deliver_webhooks()
+        self.session.post.assert_not_called()
+
+
+class OutboxDeliveryTests(OutboxTestCase):
+    """deliver_webhooks: claiming, retries and dead-lettering"""
+
+    def test_failure_is_retried_with_backoff(self):
+        entry = self.create_entry()
+        self.session.post.return_value = http_response(502, 'Bad Gateway')
+
+        with mock.patch('webhooks.models.random.uniform', return_value=1):
+            result = deliver_webhooks()
+
+        self.assertEqual((result['delivered'], result['retried'], result['dead']), (0, 1, 0))
+        entry.refresh_from_db()
+        self.assertEqual((entry.status, entry.attempts, entry.last_status_code), ('pending', 1, 502))
+        self.assertEqual(entry.last_error, 'HTTP 502: Bad Gateway')
+        delay = entry.next_attempt_at - timezone.now()
+        self.assertTrue(timedelta(seconds=25) < delay <= timedelta(seconds=30))
+
+        # Not due yet: the next run leaves it alone
+        deliver_webhooks()
+        self.assertEqual(self.session.post.call_count, 1)
+
+    def test_backoff_doubles_up_to_the_cap(self):
+        entry = WebhookOutbox()
+        with mock.patch('webhooks.models.random.uniform', return_value=1):
+            delays = []
+            for attempts in (1, 2, 3, 20):
+                entry.attempts = attempts
+                delays.append(entry.backoff_delay().total_seconds())
+
+        self.assertEqual(delays, [30, 60, 120, WebhookOutbox.BACKOFF_MAX_SECONDS])
+
+    def test_connection_error_is_recorded(self):
+        entry = self.create_entry()
+        self.session.post.side_effect = requests.ConnectionError('connection refused')
+
+        deliver_webhooks()
+
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, 'pending')
+        self.assertIsNone(entry.last_status_code)
+        self.assertEqual(entry.last_error, 'connection refused')
+
+    def test_last_attempt_moves_entry_to_dead_letter(self):
+        entry = self.create_entry(attempts=2, max_attempts=3)
+        self.session.post.return_value = http_response(500)
+
+        result = deliver_webhooks()
+
+        self.assertEqual(result['dead'], 1)
+        entry.refresh_from_db()
+        self.assertEqual((entry.status, entry.attempts), ('dead', 3))
+
+        deliver_webhooks()
+        self.assertEqual(self.session.post.call_count, 1)
+
+    def test_claimed_entry_is_skipped_until_its_lease_expires(self):
+        now = timezone.now()
+        leased = self.create_entry(status='processing', next_attempt_at=now + timedelta(minutes=1))
+        expired = self.create_entry(status='processing', next_attempt_at=now - timedelta(seconds=1))
+
+        deliver_webhooks()
+
+        self.assertEqual(self.session.post.call_count, 1)
+        leased.refresh_from_db()
+        expired.refresh_from_db()
+        self.assertEqual(leased.status, 'processing')
+        self.assertEqual(expired.status, 'delivered')
+
+    def test_claim_leases_the_batch(self):
+        entry = self.create_entry()
+
+        self.assertEqual(_claim_batch(10), [entry])
+
+        entry.refresh_from_db()
+        self.assertEqual(entry.status, 'processing')
+        self.assertGreater(entry.next_attempt_at, timezone.now() + WEBHOOK_CLAIM_LEASE - timedelta(seconds=5))
+        # Another worker claiming now gets nothing
+        self.assertEqual(_claim_batch(10), [])
+
+    def test_batches_drain_every_due_entry(self):
+        for _ in range(5):
+            self.create_entry()
+
+        result = deliver_webhooks(batch_size=2)
+
+        self.assertEqual(result['delivered'], 5)
+        self.assertFalse(WebhookOutbox.objects.exclude(status='delivered').exists())
+
+
+class OutboxAdminTests(OutboxTestCase):
+    """Replay action of the outbox admin"""
+
+    def setUp(self):
+        super().setUp()
+        admin = User.objects.create_superuser(email='admin@orbe.org', username='admin', password='x')
+        self.client.force_login(admin)
+
+    def test_replay_requeues_finished_entries_and_skips_claimed_ones(self):
+        dead = self.create_entry(status='dead', attempts=8, last_error='HTTP 500')
+        claimed = self.create_entry(status='processing', next_attempt_at=timezone.now() + timedelta(minutes=5))
+
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            response = self.client.post(reverse('admin:webhooks_webhookoutbox_changelist'), {
+                'action': 'replay_webhooks', '_selected_action': [dead.pk, claimed.pk]
+            })
+
+        self.assertEqual(response.status_code, 302)
+        dead.refresh_from_db()
+        claimed.refresh_from_db()
+        self.assertEqual((dead.status, dead.attempts, dead.last_error), ('pending', 0, ''))
+        self.assertEqual(claimed.status, 'processing')
+        self.assertEqual(len(callbacks), 1)
+
+        callbacks[0]()
+        dead.refresh_from_db()
+        self.assertEqual(dead.status, 'delivered')
+        self.assertEqual(self.session.post.call_count, 1)
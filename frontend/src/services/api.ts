@@ -117,7 +117,7 @@ export interface VoluntaryDonation {
   amount: number
   message: string
   is_anonymous: boolean
-  payment_proof: string | null
+  payment_proof_url: string | null
   donated_at: string
   verified_by: number | null
   verified_by_name: string